@@ -0,0 +1,212 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: asyncio SDDC Manager client, Utils is a blocking wrapper over it
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from Utils.transport import AsyncHttpTransport, DeadlineExceeded, TransportTimeout, TransportError
+from Utils.poller import Poller, PollTimeout
+from Utils.timing import RunTimer
+from Utils.metrics import RequestMetrics
+
+# Access tokens issued by SDDC Manager are valid for an hour; the JWT 'exp' claim wins when present
+TOKEN_DEFAULT_LIFETIME = 3600
+# Refresh the token this many seconds before it actually expires
+TOKEN_REFRESH_MARGIN = 60
+IN_PROGRESS_STATUSES = ['In Progress', 'IN_PROGRESS', 'Pending']
+# Status codes returned while a freshly created resource is not visible yet, or the server is busy
+NOT_READY_STATUS_CODES = [404, 503]
+BUSY_STATUS_CODES = [409, 503]
+# How long a resource may stay not ready before it is treated as an error
+READY_TIMEOUT = 120
+SERVER_ERROR = "Error reaching the server."
+
+
+class SddcRequestError(Exception):
+    def __init__(self, *messages):
+        super().__init__('\n'.join(messages))
+        self.messages = messages
+
+
+class AsyncSddcClient:
+    def __init__(self, hostname, username, password, transport=None, poller=None, timer=None, metrics=None,
+                 base_url=None):
+        self.hostname = hostname
+        # scheme://host:port every request goes to instead of the appliance ports, e.g. a stand-in server
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.username = username
+        self.password = password
+        self.transport = transport if transport is not None else AsyncHttpTransport()
+        self.timer = timer if timer is not None else RunTimer()
+        self.poller = poller if poller is not None else Poller(sleep=self.timer.sleep, asleep=self.timer.asleep)
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.header = {'Content-Type': 'application/json'}
+        self.token_url = self.url('/v1/tokens')
+        self.token_expiry = 0
+        self.token_lock = None
+
+    def url(self, path, secure=True):
+        if self.base_url:
+            return self.base_url + path
+        return ('https://' if secure else 'http://') + self.hostname + path
+
+    async def get_token(self):
+        payload = {"username": self.username, "password": self.password}
+        response = await self.__transmit('POST', self.token_url, {'Content-Type': 'application/json'}, payload)
+        if response.status_code not in [200, 202]:
+            raise SddcRequestError(SERVER_ERROR, response.text)
+        token = json.loads(response.text)['accessToken']
+        self.header['Authorization'] = 'Bearer ' + token
+        self.token_expiry = self.__token_expiry(token)
+
+    async def ensure_token(self):
+        if self.token_lock is None:
+            self.token_lock = asyncio.Lock()
+        async with self.token_lock:
+            if time.time() >= self.token_expiry - TOKEN_REFRESH_MARGIN:
+                await self.get_token()
+
+    def __token_expiry(self, token):
+        # The access token is a JWT, read its lifetime from the 'exp' claim of the payload segment
+        try:
+            segment = token.split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4)))
+            return float(claims['exp'])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return time.time() + TOKEN_DEFAULT_LIFETIME
+
+    async def __transmit(self, method, url, headers, payload=None, retries=0):
+        started = time.monotonic()
+        status, size = 'error', 0
+        try:
+            response = await self.transport.request(method, url, headers, payload)
+            status, size = response.status_code, len(response.text.encode('utf-8'))
+            return response
+        except DeadlineExceeded:
+            raise SddcRequestError('\033[91m Workflow deadline exceeded, aborting\033[00m')
+        except (TransportTimeout, TransportError) as e:
+            raise SddcRequestError(SERVER_ERROR, str(e))
+        finally:
+            self.timer.record_request(time.monotonic() - started)
+            self.metrics.record_request(method, url, status, size, time.monotonic() - started, retries)
+
+    async def send(self, method, url, payload=None, retries=0):
+        await self.ensure_token()
+        response = await self.__transmit(method, url, self.header, payload, retries)
+        if response.status_code == 401:
+            # Token was revoked or expired early, login again and retry once
+            self.token_expiry = 0
+            await self.ensure_token()
+            response = await self.__transmit(method, url, self.header, payload, retries + 1)
+        return response
+
+    async def get(self, url):
+        response = await self.send('GET', url)
+        if response.status_code not in [200, 202]:
+            raise SddcRequestError(SERVER_ERROR)
+        return json.loads(response.text)
+
+    async def post(self, payload, url):
+        response = await self.send('POST', url, payload)
+        if response.status_code not in [200, 202]:
+            raise SddcRequestError(SERVER_ERROR, response.text)
+        return json.loads(response.text)
+
+    async def post_raw(self, payload, url):
+        response = await self.send('POST', url, payload)
+        if response.status_code in BUSY_STATUS_CODES:
+            # Previous query on the same vCenter is still being served, retry once it is accepted
+            attempts = [0]
+
+            def resend():
+                attempts[0] += 1
+                return self.send('POST', url, payload, attempts[0])
+            try:
+                response = await self.poller.apoll(resend, lambda x: x.status_code not in BUSY_STATUS_CODES)
+            except PollTimeout:
+                raise SddcRequestError('\033[91m Timed out waiting for {}\033[00m'.format(url))
+        if response.status_code not in [200, 202]:
+            raise SddcRequestError(SERVER_ERROR, response.text)
+        return response
+
+    async def patch(self, payload, url):
+        response = await self.send('PATCH', url, payload)
+        if response.status_code == 202:
+            return json.loads(response.text)
+        elif response.status_code == 200:
+            return
+        raise SddcRequestError("Error reaching the server from patch.", response.text)
+
+    async def delete(self, payload, url):
+        response = await self.send('DELETE', url, payload)
+        if response.status_code != 202:
+            raise SddcRequestError(SERVER_ERROR, response.text)
+        return json.loads(response.text)
+
+    async def get_poll_request(self, url, expected_status):
+        response = await self.poll(url, lambda x: x['status'])
+        if response['status'] != expected_status:
+            raise SddcRequestError('\033[91m Operation failed \033[00m\n')
+        return response
+
+    async def poll_on_id(self, url, task):
+        if task:
+            return (await self.poll(url, lambda x: x['status']))['status']
+        return (await self.poll_validation(url))['resultStatus']
+
+    async def poll_validation(self, url):
+        response = await self.poll(url, lambda x: x['executionStatus'])
+        if response['executionStatus'] != 'COMPLETED':
+            raise SddcRequestError('Operation failed')
+        return response
+
+    async def poll_on_queries(self, url):
+        response = await self.poll(url, lambda x: x['queryInfo']['status'])
+        if response['queryInfo']['status'] != 'COMPLETED':
+            raise SddcRequestError('Operation failed')
+        return response['result']
+
+    async def poll(self, url, status_of):
+        # Returns the first response whose status is no longer in progress
+        started = time.monotonic()
+        polls = [0]
+
+        async def fetch():
+            polls[0] += 1
+            response = await self.send('GET', url)
+            not_ready = response.status_code in NOT_READY_STATUS_CODES
+            if response.status_code not in [200, 202] and not (not_ready and time.monotonic() - started < READY_TIMEOUT):
+                raise SddcRequestError(SERVER_ERROR, response.text)
+            return response
+
+        def is_done(response):
+            # A freshly created query or validation may not be visible yet
+            if response.status_code in NOT_READY_STATUS_CODES:
+                return False
+            return status_of(json.loads(response.text)) not in IN_PROGRESS_STATUSES
+
+        try:
+            response = await self.poller.apoll(fetch, is_done)
+        except PollTimeout:
+            raise SddcRequestError('\033[91m Timed out polling {}\033[00m'.format(url))
+        finally:
+            self.metrics.record_poll(url, polls[0], time.monotonic() - started)
+        return json.loads(response.text)
+
+    async def close(self):
+        await self.transport.close()
+
+
+class EventLoopThread:
+    # Runs one event loop on a daemon thread so blocking callers from any thread can share it
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
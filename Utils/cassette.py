@@ -0,0 +1,163 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Records the SDDC Manager requests and responses of a run to a cassette file and replays them
+
+__author__ = 'jradhakrishna'
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlparse
+from Utils import maskedjson
+from Utils.metrics import endpoint_template
+from Utils.poller import Poller
+from Utils.transport import HttpResponse, TransportError
+
+CASSETTE_VERSION = 1
+# Masked in the recorded responses, and in the request bodies before they are hashed
+SECRET_KEYS = ['password', 'rootPassword', 'adminPassword', 'nsxManagerAdminPassword', 'accessToken',
+               'refreshToken']
+# Response headers the client reads, the others are not recorded
+RECORDED_HEADERS = ['Location', 'Retry-After', 'Content-Type']
+
+"""
+    Cassette layout, gzip compressed when the file name ends with .gz:
+
+    {
+      "version": 1,
+      "interactions": [
+        {"method": "POST", "path": "/v1/domains/d1/clusters/queries", "endpoint": "/v1/domains/{id}/clusters/queries",
+         "bodyHash": "<sha256 of the masked request body>", "status": 202, "headers": {"Location": "..."},
+         "body": "<response text, secrets masked>"},
+        ...
+      ]
+    }
+
+    A request is answered by the interactions of the same method, endpoint and body hash, in recorded order,
+    preferring the ones of the same path. Once they are used up the last one answers again, so a replayed poll
+    that takes more rounds than the recorded one still completes.
+"""
+
+
+class Cassette:
+    def __init__(self, path, replay=False):
+        self.path = path
+        self.replay = replay
+        self.interactions = []
+        self.used = set()
+        self.lock = threading.Lock()
+        if replay:
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            print('\033[91m No cassette at {}, record one with --record first\033[00m'.format(self.path))
+            exit(1)
+        with open_cassette(self.path, 'rt') as cassette_file:
+            cassette = json.load(cassette_file)
+        if cassette.get('version') != CASSETTE_VERSION:
+            print('\033[91m Cassette {} was recorded by another version, record it again\033[00m'.format(self.path))
+            exit(1)
+        self.interactions = cassette['interactions']
+
+    def save(self):
+        if self.replay:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.lock:
+            cassette = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+        with open_cassette(self.path, 'wt') as cassette_file:
+            json.dump(cassette, cassette_file, separators=(',', ':'))
+
+    def transport(self, transport):
+        # The async transport the client sends through: the live one while recording, none while replaying
+        return ReplayTransport(self) if self.replay else RecordingTransport(transport, self)
+
+    def poller(self, poller):
+        # Replayed responses are final as soon as they are read, polls don't wait between rounds
+        return Poller(initial_delay=0, jitter=0, sleep=skip_sleep, asleep=skip_asleep) if self.replay else poller
+
+    def record(self, method, url, payload, response):
+        interaction = {
+            "method": method,
+            "path": request_path(url),
+            "endpoint": endpoint_template(url),
+            "bodyHash": body_hash(payload),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body": scrub(response.text)
+        }
+        with self.lock:
+            self.interactions.append(interaction)
+
+    def play(self, method, url, payload):
+        key = (method, endpoint_template(url), body_hash(payload))
+        path = request_path(url)
+        with self.lock:
+            candidates = [idx for idx, interaction in enumerate(self.interactions)
+                          if (interaction['method'], interaction['endpoint'], interaction['bodyHash']) == key]
+            if not candidates:
+                raise TransportError('No recorded response for {} {} in {}'.format(method, path, self.path))
+            unused = [idx for idx in candidates if idx not in self.used]
+            same_path = [idx for idx in unused if self.interactions[idx]['path'] == path]
+            idx = (same_path or unused or candidates[-1:])[0]
+            self.used.add(idx)
+            interaction = self.interactions[idx]
+        return HttpResponse(interaction['status'], interaction['body'], dict(interaction['headers']))
+
+
+class RecordingTransport:
+    def __init__(self, transport, cassette):
+        self.transport = transport
+        self.cassette = cassette
+
+    async def request(self, method, url, headers=None, payload=None):
+        response = await self.transport.request(method, url, headers, payload)
+        self.cassette.record(method, url, payload, response)
+        return response
+
+    async def close(self):
+        await self.transport.close()
+
+
+class ReplayTransport:
+    def __init__(self, cassette):
+        self.cassette = cassette
+
+    async def request(self, method, url, headers=None, payload=None):
+        return self.cassette.play(method, url, payload)
+
+    async def close(self):
+        pass
+
+
+def open_cassette(path, mode):
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+
+def request_path(url):
+    parsed = urlparse(url)
+    return parsed.path.rstrip() + ('?' + parsed.query if parsed.query else '')
+
+
+def body_hash(payload):
+    if payload is None:
+        return None
+    return hashlib.sha256(maskedjson.dumps(payload, SECRET_KEYS, indent=None).encode('utf-8')).hexdigest()
+
+
+def scrub(text):
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text
+    return maskedjson.dumps(body, SECRET_KEYS, indent=None, sort_keys=False)
+
+
+def skip_sleep(seconds):
+    pass
+
+
+async def skip_asleep(seconds):
+    pass
@@ -0,0 +1,93 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: On-disk cache of cluster discovery results shared by consecutive and parallel runs
+
+__author__ = 'jradhakrishna'
+
+import contextlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.vxrail-workload-automator', 'discovery.db')
+# Discovery results older than this are queried again
+DEFAULT_CACHE_TTL = 900
+# Seconds a run waits for another run holding the write lock
+LOCK_TIMEOUT = 30
+
+
+class DiscoveryCache:
+    # Keyed by (SDDC Manager host, domain id, cluster name, criterion), a disabled cache never hits.
+    # Every call opens its own connection so the cache can be used from any thread; WAL keeps readers
+    # of parallel runs from blocking each other and the writer.
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=DEFAULT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.enabled = bool(path) and bool(ttl)
+        if self.enabled:
+            try:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+                with self.__connect() as db:
+                    db.execute('PRAGMA journal_mode=WAL')
+                    db.execute('CREATE TABLE IF NOT EXISTS discovery (host TEXT, domain_id TEXT, cluster TEXT, '
+                               'criterion TEXT, created REAL, result TEXT, '
+                               'PRIMARY KEY (host, domain_id, cluster, criterion))')
+            except (OSError, sqlite3.Error) as e:
+                print('\033[93m Discovery cache {} is not usable, continuing without it: {}\033[00m'.format(path, e))
+                self.enabled = False
+
+    @contextlib.contextmanager
+    def __connect(self):
+        db = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, host, domain_id, cluster, criterion):
+        if not self.enabled:
+            return None
+        try:
+            with self.__connect() as db:
+                row = db.execute('SELECT created, result FROM discovery WHERE host=? AND domain_id=? AND cluster=? '
+                                 'AND criterion=?', (host, domain_id, cluster, criterion)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        # Parsed on every hit, callers are free to modify what they get
+        return json.loads(row[1])
+
+    def put(self, host, domain_id, cluster, criterion, result):
+        if not self.enabled:
+            return
+        try:
+            with self.__connect() as db:
+                db.execute('INSERT OR REPLACE INTO discovery VALUES (?, ?, ?, ?, ?, ?)',
+                           (host, domain_id, cluster, criterion, time.time(), json.dumps(result)))
+        except sqlite3.Error:
+            pass
+
+    def invalidate(self, host, domain_id=None):
+        # Drops everything discovered on the given SDDC Manager, or only in one of its domains, the next lookups
+        # query it again
+        if not self.enabled:
+            return
+        try:
+            with self.__connect() as db:
+                if domain_id is None:
+                    db.execute('DELETE FROM discovery WHERE host=?', (host,))
+                else:
+                    db.execute('DELETE FROM discovery WHERE host=? AND domain_id=?', (host, domain_id))
+        except sqlite3.Error:
+            pass
+
+    def cached(self, key, fn, *args):
+        # Result of fn(*args) from the cache, computed and stored on a miss
+        result = self.get(*key)
+        if result is None:
+            result = fn(*args)
+            self.put(*key, result)
+        return result
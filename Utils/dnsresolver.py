@@ -0,0 +1,209 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: In-process DNS lookups with a per-run cache, used to check the FQDNs entered for the import
+
+__author__ = 'jradhakrishna'
+
+import random
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DEFAULT_DNS_TIMEOUT = 3
+DEFAULT_DNS_RETRIES = 1
+DNS_PORT = 53
+MAX_WORKERS = 8
+TYPE_A = 1
+TYPE_PTR = 12
+CLASS_IN = 1
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+FLAG_QR = 0x8000
+FLAG_TC = 0x0200
+# Marks a name missing from the cache, None is a cached negative answer
+NOT_CACHED = object()
+
+
+class DnsResolver:
+    # Queries the given nameservers, HOST or HOST:PORT, over UDP, or the system resolver when there are none.
+    # Answers, including names that don't resolve, are cached for the whole run; lookups that time out or only
+    # get malformed replies are not.
+    def __init__(self, nameservers=None, timeout=DEFAULT_DNS_TIMEOUT, retries=DEFAULT_DNS_RETRIES):
+        self.nameservers = [parse_nameserver(nameserver) for nameserver in nameservers or []]
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        # The system resolver has no timeout of its own, its lookups run here so they can be given up on
+        self.system_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+    def resolve(self, fqdn):
+        # IPv4 address of the FQDN, None when it doesn't resolve
+        return self.__cached(('A', fqdn.lower()), self.__lookup_address, fqdn)
+
+    def reverse(self, address):
+        # FQDN the address points back to, None when there is no PTR record
+        return self.__cached(('PTR', address), self.__lookup_name, address)
+
+    def resolve_all(self, fqdns):
+        # Resolves all the FQDNs concurrently, returns {fqdn: address or None}
+        names = [fqdn for fqdn in dict.fromkeys(fqdns) if fqdn]
+        return dict(zip(names, self.pool.map(self.resolve, names)))
+
+    def reverse_all(self, addresses):
+        # Reverse lookups of all the addresses concurrently, returns {address: fqdn or None}
+        addresses = [address for address in dict.fromkeys(addresses) if address]
+        return dict(zip(addresses, self.pool.map(self.reverse, addresses)))
+
+    def __cached(self, key, lookup, name):
+        with self.lock:
+            value = self.cache.get(key, NOT_CACHED)
+        if value is not NOT_CACHED:
+            return value
+        try:
+            value = lookup(name)
+        except (socket.timeout, TimeoutError, OSError):
+            return None
+        with self.lock:
+            self.cache[key] = value
+        return value
+
+    def __lookup_address(self, fqdn):
+        if not self.nameservers:
+            future = self.system_pool.submit(socket.gethostbyname, fqdn)
+            try:
+                return future.result(timeout=self.timeout)
+            except socket.gaierror:
+                return None
+        answers = self.__query(fqdn, TYPE_A)
+        return answers[0] if answers else None
+
+    def __lookup_name(self, address):
+        if not self.nameservers:
+            future = self.system_pool.submit(socket.gethostbyaddr, address)
+            try:
+                return future.result(timeout=self.timeout)[0]
+            except (socket.herror, socket.gaierror):
+                return None
+        reverse_name = '.'.join(reversed(address.split('.'))) + '.in-addr.arpa'
+        answers = self.__query(reverse_name, TYPE_PTR)
+        return answers[0].rstrip('.') if answers else None
+
+    def __query(self, name, qtype):
+        # Answers of the given type, [] for a negative answer; raises socket.timeout when no nameserver replied and
+        # OSError when the only replies were truncated, malformed or failures
+        ident = random.randint(0, 0xffff)
+        question = encode_name(name) + struct.pack('>HH', qtype, CLASS_IN)
+        request = struct.pack('>HHHHHH', ident, 0x0100, 1, 0, 0, 0) + question
+        unusable = None
+        for _ in range(self.retries + 1):
+            for nameserver in self.nameservers:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    try:
+                        sock.sendto(request, nameserver)
+                        response = receive_reply(sock, ident, question, time.monotonic() + self.timeout)
+                    except socket.timeout:
+                        continue
+                if struct.unpack('>H', response[2:4])[0] & FLAG_TC:
+                    # A truncated answer section can't be trusted, ask again
+                    unusable = 'truncated reply'
+                    continue
+                try:
+                    return parse_answers(response, qtype)
+                except (struct.error, IndexError, ValueError):
+                    unusable = 'malformed reply'
+                except OSError as e:
+                    # A server failure or refusal of one nameserver says nothing about the name, ask the next one
+                    unusable = str(e)
+        servers = ', '.join('{}:{}'.format(*nameserver) for nameserver in self.nameservers)
+        if unusable:
+            raise OSError('No usable reply from {} for {}, last: {}'.format(servers, name, unusable))
+        raise socket.timeout('No reply from {} for {}'.format(servers, name))
+
+
+def parse_nameserver(value):
+    # (host, port) of HOST or HOST:PORT
+    host, _, port = value.partition(':')
+    if port and not port.isdigit():
+        raise ValueError('Nameserver {} is not HOST or HOST:PORT'.format(value))
+    return host, int(port) if port else DNS_PORT
+
+
+def encode_name(name):
+    labels = name.rstrip('.').split('.')
+    return b''.join(struct.pack('B', len(label)) + label.encode('ascii') for label in labels) + b'\0'
+
+
+def receive_reply(sock, ident, question, deadline):
+    # First datagram answering the query, stray datagrams, including queries and replies to other questions,
+    # are skipped; raises socket.timeout at the deadline however many of them arrive
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout('timed out')
+        sock.settimeout(remaining)
+        response = sock.recv(4096)
+        if is_reply(response, ident, question):
+            return response
+
+
+def is_reply(response, ident, question):
+    # True when the response answers the query with this id and question
+    if len(response) < 12 + len(question):
+        return False
+    response_ident, flags, qdcount = struct.unpack('>HHH', response[:6])
+    return (response_ident == ident and flags & FLAG_QR and qdcount == 1 and
+            response[12:12 + len(question)].lower() == question.lower())
+
+
+def read_name(data, offset):
+    # Returns the name at offset, following compression pointers, and the offset right after it; raises
+    # IndexError or ValueError when the data is cut short or malformed
+    labels = []
+    end = None
+    while True:
+        length = data[offset]
+        if length & 0xc0 == 0xc0:
+            if end is None:
+                end = offset + 2
+            pointer = ((length & 0x3f) << 8) | data[offset + 1]
+            # Pointers only go back to an earlier name, anything else could loop forever
+            if pointer >= offset:
+                raise ValueError('DNS name pointer at {} does not point backwards'.format(offset))
+            offset = pointer
+        elif length == 0:
+            return '.'.join(labels), end if end is not None else offset + 1
+        else:
+            if offset + 1 + length > len(data):
+                raise IndexError('DNS name at {} runs past the end of the data'.format(offset))
+            labels.append(data[offset + 1:offset + 1 + length].decode('ascii'))
+            offset += 1 + length
+
+
+def parse_answers(response, qtype):
+    # Raises struct.error, IndexError or ValueError when the response is cut short or malformed
+    _, flags, qdcount, ancount, _, _ = struct.unpack('>HHHHHH', response[:12])
+    if flags & 0xf == RCODE_NXDOMAIN:
+        return []
+    if flags & 0xf != RCODE_NOERROR:
+        # A server failure says nothing about the name, it is not cached
+        raise OSError('DNS query failed with rcode {}'.format(flags & 0xf))
+    offset = 12
+    for _ in range(qdcount):
+        offset = read_name(response, offset)[1] + 4
+    answers = []
+    for _ in range(ancount):
+        offset = read_name(response, offset)[1]
+        rtype, _, _, rdlength = struct.unpack('>HHIH', response[offset:offset + 10])
+        offset += 10
+        # CNAME records are followed by the records of their target in the same answer section
+        if offset + rdlength > len(response):
+            raise IndexError('DNS record at {} runs past the end of the response'.format(offset))
+        if rtype == qtype == TYPE_A and rdlength == 4:
+            answers.append(socket.inet_ntoa(response[offset:offset + 4]))
+        elif rtype == qtype == TYPE_PTR:
+            answers.append(read_name(response, offset)[0])
+        offset += rdlength
+    return answers
@@ -0,0 +1,154 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Journal of the completed import stages, lets a failed run be resumed where it stopped
+
+__author__ = 'jradhakrishna'
+
+import copy
+import json
+import os
+from Utils import metrics
+
+DEFAULT_JOURNAL_FILE = os.path.join(os.path.expanduser('~'), '.vxrail-workload-automator', 'journal.json')
+JOURNAL_VERSION = 1
+# Stages of one import in workflow order, each with the stages its result is derived from. The payload is not a
+# stage, it is assembled again from the stages it is built of, so the journal never copies it.
+STAGES = ['discovery', 'hosts', 'dvs', 'nsxt', 'vxrailManager', 'credentials', 'thumbprints', 'licenses',
+          'validation', 'submit']
+STAGE_INPUTS = {
+    'discovery': [],
+    'hosts': ['discovery'],
+    'dvs': ['discovery'],
+    'nsxt': ['discovery', 'dvs'],
+    'vxrailManager': [],
+    'credentials': ['discovery', 'hosts', 'vxrailManager'],
+    'thumbprints': ['discovery', 'vxrailManager', 'credentials'],
+    'licenses': ['discovery'],
+    'validation': ['hosts', 'dvs', 'nsxt', 'vxrailManager', 'credentials', 'thumbprints', 'licenses'],
+    'submit': ['validation']
+}
+SECRET_PLACEHOLDER = '*******'
+
+
+class StageJournal:
+    # Non-secret stage results go to the journal file, secrets are only kept in memory, so the stages holding them
+    # run again, prompting for the secrets, when the run is resumed. A journal without a path records nothing and
+    # every stage runs.
+    def __init__(self, path=None, host=None, secret_keys=()):
+        self.path = path
+        # Earlier versions kept the secrets next to the journal, whatever is left there is removed
+        self.secrets_path = path + '.secrets' if path else None
+        self.host = host
+        self.secret_keys = set(secret_keys)
+        self.stages = {}
+        self.secrets = {}
+
+    def start(self):
+        # A fresh run forgets whatever the previous one left behind
+        self.stages = {}
+        self.secrets = {}
+        self.__save()
+
+    def resume(self, redo=None):
+        if not self.path or not os.path.exists(self.path):
+            print('\033[93m No journal of a previous run at {}, starting over\033[00m'.format(self.path))
+            return self.start()
+        with open(self.path) as journal_file:
+            journal = json.load(journal_file)
+        if journal.get('version') != JOURNAL_VERSION or journal.get('host') != self.host:
+            print('\033[91m Journal {} is not from a run against {}, run without --resume\033[00m'
+                  .format(self.path, self.host))
+            exit(1)
+        self.stages = journal.get('stages', {})
+        self.secrets = {}
+        if redo is not None:
+            self.__forget(redo)
+        if 'submit' not in self.stages:
+            for name in list(self.stages):
+                # The secrets of a stage are not journaled, it can't be restored and runs again
+                if self.stages.get(name, {}).get('secrets'):
+                    self.__forget(name)
+        completed = [name for name in STAGES if name in self.stages]
+        print('\033[96m Resuming from the journal, completed stages: {}\033[00m'.format(', '.join(completed) or 'none'))
+        self.__save()
+
+    def stage(self, name, fn, *args, secret=False):
+        # Result of the stage from the journal when it completed before, otherwise runs it and records the result
+        if name in self.stages:
+            print('\033[96m Stage {} completed in a previous run, reusing its result\033[00m'.format(name))
+            return self.__restore(name)
+        with metrics.stage(name):
+            value = fn(*args)
+        if self.path:
+            if secret:
+                self.stages[name] = {'value': None, 'secrets': True}
+                self.secrets[name] = [[[], value]]
+            else:
+                secrets = []
+                self.stages[name] = {'value': self.__split(copy.deepcopy(value), [], secrets),
+                                     'secrets': bool(secrets)}
+                if secrets:
+                    self.secrets[name] = secrets
+            self.__save()
+        return value
+
+    def completed(self, name):
+        return name in self.stages
+
+    def result(self, name):
+        # Non-secret result of a completed stage
+        return copy.deepcopy(self.stages[name]['value'])
+
+    def finish(self):
+        # The import is submitted, the secrets are not needed anymore
+        self.secrets = {}
+
+    def __forget(self, name):
+        # Drops the stage and every stage derived from it
+        self.stages.pop(name, None)
+        self.secrets.pop(name, None)
+        for stage in STAGES:
+            if name in STAGE_INPUTS[stage]:
+                self.__forget(stage)
+
+    def __split(self, node, path, secrets):
+        # Replaces secret values by a placeholder, collecting them with their path
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in self.secret_keys and isinstance(value, str):
+                    secrets.append([path + [key], value])
+                    node[key] = SECRET_PLACEHOLDER
+                else:
+                    self.__split(value, path + [key], secrets)
+        elif isinstance(node, list):
+            for idx, value in enumerate(node):
+                self.__split(value, path + [idx], secrets)
+        return node
+
+    def __restore(self, name):
+        value = copy.deepcopy(self.stages[name]['value'])
+        for path, secret in self.secrets.get(name, []):
+            if not path:
+                return copy.deepcopy(secret)
+            node = value
+            for key in path[:-1]:
+                node = node[key]
+            node[path[-1]] = secret
+        return value
+
+    def __save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+        journal = {'version': JOURNAL_VERSION, 'host': self.host, 'stages': self.stages}
+        write_atomically(self.path, journal, 0o600)
+        if os.path.exists(self.secrets_path):
+            os.remove(self.secrets_path)
+
+
+def write_atomically(path, data, mode):
+    # Readers never see a half written file, and the file is created with its final permissions
+    tmp_path = path + '.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, 'w') as tmp_file:
+        json.dump(data, tmp_file)
+    os.replace(tmp_path, path)
@@ -0,0 +1,61 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: JSON writer that redacts secret values while it writes, without copying the document
+
+__author__ = 'jradhakrishna'
+
+import json
+
+MASK = '*******'
+
+
+def iter_masked(obj, masked_keys, indent=2, sort_keys=True):
+    # Chunks of the JSON text of obj, as json.dumps writes it, with every value under a masked key replaced,
+    # including the values in lists under it
+    return iter_value(obj, set(masked_keys), indent, sort_keys, 0, False)
+
+
+def dump(obj, fp, masked_keys, indent=2, sort_keys=True):
+    for chunk in iter_masked(obj, masked_keys, indent, sort_keys):
+        fp.write(chunk)
+
+
+def dumps(obj, masked_keys, indent=2, sort_keys=True):
+    return ''.join(iter_masked(obj, masked_keys, indent, sort_keys))
+
+
+def iter_value(value, masked_keys, indent, sort_keys, level, masked):
+    if isinstance(value, dict):
+        yield from iter_dict(value, masked_keys, indent, sort_keys, level, masked)
+    elif isinstance(value, (list, tuple)):
+        yield from iter_list(value, masked_keys, indent, sort_keys, level, masked)
+    elif masked and value is not None:
+        yield json.dumps(MASK)
+    else:
+        yield json.dumps(value)
+
+
+def iter_dict(value, masked_keys, indent, sort_keys, level, masked):
+    if not value:
+        yield '{}'
+        return
+    newline = '\n' + ' ' * (indent * (level + 1)) if indent is not None else ''
+    separator = ',' if indent is not None else ', '
+    yield '{'
+    keys = sorted(value) if sort_keys else list(value)
+    for idx, key in enumerate(keys):
+        yield (separator if idx else '') + newline + json.dumps(str(key)) + ': '
+        yield from iter_value(value[key], masked_keys, indent, sort_keys, level + 1, masked or key in masked_keys)
+    yield ('\n' + ' ' * (indent * level) if indent is not None else '') + '}'
+
+
+def iter_list(value, masked_keys, indent, sort_keys, level, masked):
+    if not value:
+        yield '[]'
+        return
+    newline = '\n' + ' ' * (indent * (level + 1)) if indent is not None else ''
+    separator = ',' if indent is not None else ', '
+    yield '['
+    for idx, item in enumerate(value):
+        yield (separator if idx else '') + newline
+        yield from iter_value(item, masked_keys, indent, sort_keys, level + 1, masked)
+    yield ('\n' + ' ' * (indent * level) if indent is not None else '') + ']'
@@ -0,0 +1,154 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Per-request metrics of the SDDC Manager calls, tagged with the workflow stage, written at exit
+
+__author__ = 'jradhakrishna'
+
+import contextlib
+import contextvars
+import json
+import math
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_METRICS_FILE = os.path.join(os.path.expanduser('~'), '.vxrail-workload-automator', 'metrics.json')
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+# Path segments naming a collection, the segment after one of them is the id of a member unless it is
+# a collection itself
+COLLECTIONS = {'domains', 'clusters', 'vidomains', 'nsxt-clusters', 'tasks', 'validations', 'requests', 'queries'}
+SUB_COLLECTIONS = {'clusters', 'validations', 'creations', 'queries', 'requests', 'cluster'}
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+CURRENT_STAGE = contextvars.ContextVar('stage', default='setup')
+
+
+@contextlib.contextmanager
+def stage(name):
+    # Requests made in the block, and in coroutines and prefetches started from it, are tagged with name
+    token = CURRENT_STAGE.set(name)
+    try:
+        yield
+    finally:
+        CURRENT_STAGE.reset(token)
+
+
+async def in_stage(name, coro):
+    # Runs coro on the event loop thread under the stage of the thread that scheduled it
+    CURRENT_STAGE.set(name)
+    return await coro
+
+
+def endpoint_template(url):
+    # /v1/domains/<id>/clusters/<name>/queries -> /v1/domains/{id}/clusters/{id}/queries, query string dropped
+    # The trailing space of some request urls is not part of the endpoint
+    segments = urlparse(url).path.rstrip().split('/')
+    template = []
+    for idx, segment in enumerate(segments):
+        after_collection = idx > 0 and segments[idx - 1] in COLLECTIONS and segment not in SUB_COLLECTIONS
+        template.append('{id}' if segment and (after_collection or UUID_PATTERN.match(segment)) else segment)
+    return '/'.join(template)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.requests = {}
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def record_request(self, method, url, status, size, seconds, retries=0):
+        key = (CURRENT_STAGE.get(), method, endpoint_template(url), str(status))
+        with self.lock:
+            entry = self.requests.setdefault(key, {"count": 0, "bytes": 0, "retries": 0, "latencies": []})
+            entry['count'] += 1
+            entry['bytes'] += size
+            entry['retries'] += retries
+            entry['latencies'].append(seconds)
+
+    def record_poll(self, url, polls, seconds):
+        # One poll loop: how many requests it took and how long it ran until the terminal status
+        key = (CURRENT_STAGE.get(), endpoint_template(url))
+        with self.lock:
+            entry = self.polls.setdefault(key, {"loops": 0, "polls": 0, "seconds": 0.0})
+            entry['loops'] += 1
+            entry['polls'] += polls
+            entry['seconds'] += seconds
+
+    def summary(self):
+        with self.lock:
+            requests = [dict(stage=key[0], method=key[1], endpoint=key[2], status=key[3], count=entry['count'],
+                             bytes=entry['bytes'], retries=entry['retries'], **latency_summary(entry['latencies']))
+                        for key, entry in sorted(self.requests.items())]
+            endpoints = {}
+            for key, entry in self.requests.items():
+                endpoints.setdefault((key[1], key[2]), []).extend(entry['latencies'])
+            polls = [dict(stage=key[0], endpoint=key[1], **entry) for key, entry in sorted(self.polls.items())]
+        return {
+            "requests": requests,
+            "endpoints": [dict(method=key[0], endpoint=key[1], count=len(latencies), **latency_summary(latencies))
+                          for key, latencies in sorted(endpoints.items())],
+            "polls": polls
+        }
+
+    def prometheus(self):
+        lines = ['# HELP sddc_request_duration_seconds Latency of the SDDC Manager API requests',
+                 '# TYPE sddc_request_duration_seconds histogram']
+        with self.lock:
+            requests = sorted(self.requests.items())
+            polls = sorted(self.polls.items())
+        for key, entry in requests:
+            labels = prometheus_labels(stage=key[0], method=key[1], endpoint=key[2], status=key[3])
+            for bound in LATENCY_BUCKETS:
+                count = len([latency for latency in entry['latencies'] if latency <= bound])
+                lines.append('sddc_request_duration_seconds_bucket{{{},le="{}"}} {}'.format(labels, bound, count))
+            lines.append('sddc_request_duration_seconds_bucket{{{},le="+Inf"}} {}'.format(labels, entry['count']))
+            lines.append('sddc_request_duration_seconds_sum{{{}}} {}'.format(labels, sum(entry['latencies'])))
+            lines.append('sddc_request_duration_seconds_count{{{}}} {}'.format(labels, entry['count']))
+        for name, field, description in [('sddc_response_bytes_total', 'bytes', 'Bytes of the response bodies'),
+                                         ('sddc_request_retries_total', 'retries', 'Requests sent again')]:
+            lines.extend(['# HELP {} {}'.format(name, description), '# TYPE {} counter'.format(name)])
+            for key, entry in requests:
+                labels = prometheus_labels(stage=key[0], method=key[1], endpoint=key[2], status=key[3])
+                lines.append('{}{{{}}} {}'.format(name, labels, entry[field]))
+        for name, field, description in [('sddc_poll_requests_total', 'polls', 'Requests of the poll loops'),
+                                         ('sddc_poll_seconds_total', 'seconds', 'Time spent in the poll loops')]:
+            lines.extend(['# HELP {} {}'.format(name, description), '# TYPE {} counter'.format(name)])
+            for key, entry in polls:
+                lines.append('{}{{{}}} {}'.format(name, prometheus_labels(stage=key[0], endpoint=key[1]), entry[field]))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        # JSON summary to path, the Prometheus text format next to it with a .prom extension
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+            with open(path, 'w') as json_file:
+                json.dump(self.summary(), json_file, indent=2)
+            with open(os.path.splitext(path)[0] + '.prom', 'w') as prom_file:
+                prom_file.write(self.prometheus())
+        except OSError as e:
+            print('\033[93m Unable to write the request metrics to {}: {}\033[00m'.format(path, e))
+
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "max": ordered[-1] if ordered else 0.0,
+        "total": sum(ordered)
+    }
+
+
+def percentile(ordered, pct):
+    # Nearest rank of the sorted values
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)]
+
+
+def prometheus_labels(**labels):
+    return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                    for name, value in labels.items())
@@ -0,0 +1,71 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Shared polling loop with exponential backoff used for queries, validations and tasks
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import random
+import time
+
+INITIAL_DELAY = 1
+BACKOFF_FACTOR = 2
+MAX_DELAY = 30
+JITTER = 0.2
+POLL_TIMEOUT = 3600
+
+
+class PollTimeout(Exception):
+    pass
+
+
+class Poller:
+    def __init__(self, initial_delay=INITIAL_DELAY, factor=BACKOFF_FACTOR, max_delay=MAX_DELAY, jitter=JITTER,
+                 timeout=POLL_TIMEOUT, sleep=time.sleep, asleep=asyncio.sleep):
+        self.initial_delay = initial_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.timeout = timeout
+        self.sleep = sleep
+        self.asleep = asleep
+
+    def poll(self, fetch, is_done):
+        # Probe right away, then back off exponentially until is_done accepts the response.
+        # The terminal response is returned so that callers don't need to fetch it again.
+        deadline = time.monotonic() + self.timeout
+        delay = self.initial_delay
+        while True:
+            response = fetch()
+            if is_done(response):
+                return response
+            self.sleep(self.__next_wait(response, delay, deadline))
+            delay = min(delay * self.factor, self.max_delay)
+
+    async def apoll(self, fetch, is_done):
+        # Same as poll, for a fetch coroutine function on an event loop
+        deadline = time.monotonic() + self.timeout
+        delay = self.initial_delay
+        while True:
+            response = await fetch()
+            if is_done(response):
+                return response
+            await self.asleep(self.__next_wait(response, delay, deadline))
+            delay = min(delay * self.factor, self.max_delay)
+
+    def __next_wait(self, response, delay, deadline):
+        wait = self.__retry_after(response)
+        if wait is None:
+            wait = delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if time.monotonic() + wait > deadline:
+            raise PollTimeout()
+        return wait
+
+    def __retry_after(self, response):
+        headers = getattr(response, 'headers', None)
+        if not headers or 'Retry-After' not in headers:
+            return None
+        try:
+            return min(float(headers['Retry-After']), self.max_delay)
+        except ValueError:
+            # HTTP-date form of Retry-After is not used by SDDC Manager
+            return None
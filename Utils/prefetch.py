@@ -0,0 +1,46 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Background fetches started early and awaited only where their result is used
+
+__author__ = 'jradhakrishna'
+
+import contextvars
+import threading
+from concurrent.futures import Future
+
+# True in the threads running a prefetch, whose failures belong to the caller that uses the result
+PREFETCHING = contextvars.ContextVar('prefetching', default=False)
+
+
+class Prefetcher:
+    def __init__(self):
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key, fn, *args):
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            PREFETCHING.set(True)
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                # Request errors and any other failure are re-raised when the result is awaited
+                future.set_exception(e)
+
+        with self.lock:
+            if key in self.futures:
+                return
+            self.futures[key] = future
+        # Daemon threads so that a speculative fetch never holds up the exit of the process. The fetch runs in the
+        # context of the caller, so its requests are tagged with the caller's stage
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+
+    def result(self, key, fn, *args):
+        # Consume the prefetched result, or compute it now when it was never launched
+        with self.lock:
+            future = self.futures.pop(key, None)
+        if future is None:
+            return fn(*args)
+        return future.result()
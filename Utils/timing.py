@@ -0,0 +1,70 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Per-run accounting of time spent waiting on SDDC Manager vs. doing requests
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import threading
+import time
+
+
+class RunTimer:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.waiting = 0.0
+        self.working = 0.0
+        self.requests = 0
+        # Waits of concurrent threads and coroutines overlap, waiting is the wall time while at least one is waiting
+        self.waiters = 0
+        self.wait_started = None
+        self.lock = threading.Lock()
+
+    def sleep(self, seconds):
+        self.__begin_wait()
+        try:
+            time.sleep(seconds)
+        finally:
+            self.__end_wait()
+
+    async def asleep(self, seconds):
+        self.__begin_wait()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.__end_wait()
+
+    def __begin_wait(self):
+        with self.lock:
+            if self.waiters == 0:
+                self.wait_started = time.monotonic()
+            self.waiters += 1
+
+    def __end_wait(self):
+        with self.lock:
+            self.waiters -= 1
+            if self.waiters == 0:
+                self.waiting += time.monotonic() - self.wait_started
+                self.wait_started = None
+
+    def record_request(self, seconds):
+        with self.lock:
+            self.working += seconds
+            self.requests += 1
+
+    def summary(self):
+        with self.lock:
+            now = time.monotonic()
+            waiting = self.waiting + (now - self.wait_started if self.waiters else 0.0)
+        total = now - self.started
+        return {
+            "total": total,
+            "waiting": waiting,
+            "working": self.working,
+            "other": max(total - waiting - self.working, 0),
+            "requests": self.requests
+        }
+
+    def report(self):
+        summary = self.summary()
+        print("\033[96m Run time {:.1f}s: waiting {:.1f}s, {} requests {:.1f}s, operator/local {:.1f}s\033[00m".format(
+            summary['total'], summary['waiting'], summary['requests'], summary['working'], summary['other']))
@@ -0,0 +1,113 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Pooled keep-alive HTTP transport used by Utils for every SDDC Manager call
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class TransportTimeout(Exception):
+    pass
+
+
+class TransportError(Exception):
+    pass
+
+
+class HttpResponse:
+    def __init__(self, status_code, text, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+
+class HttpTransport:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = None
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def set_deadline(self, seconds):
+        # End-to-end budget for the whole workflow, None disables it
+        self.deadline = time.monotonic() + seconds if seconds else None
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def timeout(self):
+        remaining = self.remaining()
+        if remaining is None:
+            return (self.connect_timeout, self.read_timeout)
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+    def request(self, method, url, headers=None, payload=None):
+        return self.session.request(method, url, headers=headers, json=payload, timeout=self.timeout())
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHttpTransport:
+    # Uses aiohttp when it is installed, otherwise runs the blocking transport on the loop's executor.
+    # Timeouts and the workflow deadline always come from the blocking transport so both stay in step.
+    def __init__(self, transport=None):
+        self.transport = transport if transport is not None else HttpTransport()
+        self.session = None
+
+    async def request(self, method, url, headers=None, payload=None):
+        timeout = self.transport.timeout()
+        try:
+            if aiohttp is None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.transport.request, method, url, headers, payload)
+            return await self.__aiohttp_request(method, url, headers, payload, timeout)
+        except (requests.exceptions.Timeout, asyncio.TimeoutError):
+            raise TransportTimeout('Request timed out: {} {}'.format(method, url))
+        except requests.exceptions.ConnectionError as e:
+            raise TransportError(str(e))
+        except Exception as e:
+            if aiohttp is not None and isinstance(e, aiohttp.ClientError):
+                raise TransportError(str(e))
+            raise
+
+    async def __aiohttp_request(self, method, url, headers, payload, timeout):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.transport.pool_size, ssl=False)
+            self.session = aiohttp.ClientSession(connector=connector)
+        # The workflow deadline bounds the whole request, not just each connect and read
+        client_timeout = aiohttp.ClientTimeout(total=self.transport.remaining(), sock_connect=timeout[0],
+                                               sock_read=timeout[1])
+        async with self.session.request(method, url, headers=headers, json=payload, timeout=client_timeout) as response:
+            return HttpResponse(response.status, await response.text(), response.headers)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -3,133 +3,120 @@
 __author__ = 'jradhakrishna'
 
 import json
-import time
-import requests
-import urllib3
 import getpass
+from Utils.transport import HttpTransport, AsyncHttpTransport
+from Utils.poller import Poller
+from Utils.timing import RunTimer
+from Utils.metrics import RequestMetrics, CURRENT_STAGE, in_stage
+from Utils.prefetch import Prefetcher, PREFETCHING
+from Utils.discoverycache import DiscoveryCache
+from Utils.dnsresolver import DnsResolver
+from Utils.asyncclient import AsyncSddcClient, EventLoopThread, SddcRequestError
+import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import re
 
 class Utils:
-    def __init__(self, args):
+    # Blocking facade over AsyncSddcClient, every call runs on one shared event loop thread
+    def __init__(self, args, transport=None, poller=None, cache=None, resolver=None, base_url=None, cassette=None):
         self.hostname = args[0]
         self.username = args[1]
         self.password = args[2]
-        self.header = {'Content-Type': 'application/json'}
-        self.token_url = 'https://'+ self.hostname +'/v1/tokens'
+        self.transport = transport if transport is not None else HttpTransport()
+        self.timer = RunTimer()
+        self.metrics = RequestMetrics()
+        self.prefetcher = Prefetcher()
+        self.cache = cache if cache is not None else DiscoveryCache(None)
+        self.resolver = resolver if resolver is not None else DnsResolver()
+        self.poller = poller if poller is not None else Poller(sleep=self.timer.sleep, asleep=self.timer.asleep)
+        async_transport = AsyncHttpTransport(self.transport)
+        # A cassette records every request of the run, or answers them from an earlier recording
+        self.cassette = cassette
+        if cassette is not None:
+            async_transport = cassette.transport(async_transport)
+            self.poller = cassette.poller(self.poller)
+        self.client = AsyncSddcClient(self.hostname, self.username, self.password, async_transport, self.poller,
+                                      self.timer, self.metrics, base_url)
+        self.loop = EventLoopThread()
         self.get_token()
-    
+
+    def run(self, coro):
+        try:
+            return self.loop.run(in_stage(CURRENT_STAGE.get(), coro))
+        except SddcRequestError as e:
+            if PREFETCHING.get():
+                # Reported by the thread that uses the result, not in the middle of the prompts it is answering
+                raise
+            self.fail(e)
+
+    def fail(self, error):
+        for message in error.messages:
+            print (message)
+        exit(1)
+
+    def prefetched(self, key, fn, *args):
+        # Result of the prefetch with this key, or fn(*args) when there is none; a failed prefetch is reported here
+        try:
+            return self.prefetcher.result(key, fn, *args)
+        except SddcRequestError as e:
+            self.fail(e)
+
     def get_token(self):
-        payload = {"username": self.username,"password": self.password}
-        response = self.post_request(payload=payload,url=self.token_url)
-        token = response['accessToken']
-        self.header['Authorization'] = 'Bearer ' + token
-    
+        self.run(self.client.get_token())
+
+    def url(self, path, secure=True):
+        return self.client.url(path, secure)
+
+    def set_deadline(self, seconds):
+        self.transport.set_deadline(seconds)
+
     def get_request(self,url):
-        self.get_token()
-        time.sleep(5)
-        response = requests.get(url, headers=self.header,verify=False)
-        if(response.status_code == 200 or response.status_code == 202):
-            data = json.loads(response.text)
-        else:
-            print ("Error reaching the server.")
-            exit(1)
-        return data
+        return self.prefetched(('GET', url), self.__get_request, url)
+
+    def prefetch_get(self, url, then=None):
+        # Start the GET in the background, the next get_request of the same url consumes it
+        def run():
+            data = self.__get_request(url)
+            if then is not None:
+                then(data)
+            return data
+        self.prefetcher.submit(('GET', url), run)
+
+    def __get_request(self, url):
+        return self.run(self.client.get(url))
 
     def post_request(self,payload,url):
-        response = requests.post(url, headers=self.header, json=payload,verify=False)
-        if(response.status_code == 200 or response.status_code == 202):
-            data = json.loads(response.text)
-            return data
-        else:
-            print ("Error reaching the server.")
-            print (response.text)
-            exit(1)
+        return self.run(self.client.post(payload, url))
 
     def post_request_raw(self,payload,url):
-        response = requests.post(url, headers=self.header, json=payload,verify=False)
-        if(response.status_code in [200, 202]):
-            return response
-        else:
-            print ("Error reaching the server.")
-            print (response.text)
-            exit(1)
-
-    
+        return self.run(self.client.post_raw(payload, url))
+
     def patch_request(self,payload,url):
-        response = requests.patch(url, headers=self.header, json=payload,verify=False)
-        if(response.status_code == 202):
-            data = json.loads(response.text)
-            return data
-        elif(response.status_code == 200):
-            return
-        else:
-            print ("Error reaching the server from patch.")
-            print (response.text)
-            exit(1)
+        return self.run(self.client.patch(payload, url))
 
     def get_poll_request(self, url, expected_status):
-        response = self.get_request(url)
-        while response['status'] in ['In Progress', 'IN_PROGRESS', 'Pending']:
-            time.sleep(5)
-            response = self.get_request(url)
-
-        if response['status'] == expected_status:
-            return response
-        else:
-            print('\033[91m Operation failed \033[00m', end='\n\n')
-            exit(1)
-
+        return self.run(self.client.get_poll_request(url, expected_status))
 
     def poll_on_id(self,url,task):
-        key = ''
-        if(task):
-            key = 'status'
-        else:
-            key = 'executionStatus'
-        status = self.get_request(url)[key]
-        while(status in ['In Progress','IN_PROGRESS','Pending']):
-            response = self.get_request(url)
-            status = response[key]
-            time.sleep(10)
-        if(task):
-            return status
-        if(status == 'COMPLETED'):
-            return response['resultStatus']
-        else:
-            print ('Operation failed')
-            exit(1)
+        return self.run(self.client.poll_on_id(url, task))
+
+    def poll_validation(self, url):
+        return self.run(self.client.poll_validation(url))
 
     def poll_on_queries(self,url):
-        response = self.get_request(url)
-        status = response['queryInfo']['status']
-        while(status in ['In Progress','IN_PROGRESS','Pending']):
-            response = self.get_request(url)
-            status = response['queryInfo']['status']
-            time.sleep(10)
-        if(status == 'COMPLETED'):
-            return response['result']
-        else:
-            print ('Operation failed')
-            exit(1)
-    
+        return self.run(self.client.poll_on_queries(url))
+
     def delete_request(self,payload,url):
-        response = requests.delete(url,json=payload,headers=self.header,verify=False)
-        if(response.status_code == 202):
-            data = json.loads(response.text)
-            return data
-        else:
-            print ("Error reaching the server.")
-            print (response.text)
-            exit(1)
-    
+        return self.run(self.client.delete(payload, url))
+
     def read_input(self, file):
         with open(file) as json_file:
             data = json.load(json_file)
         return data
 
-    def print_validation_errors(self, url):
-        validation_response = self.get_request(url)
+    def print_validation_errors(self, url, validation_response=None):
+        if validation_response is None:
+            validation_response = self.get_request(url)
         if "validationChecks" in validation_response:
             failed_tasks = list(
                 filter(lambda x: x["resultStatus"] == "FAILED", validation_response["validationChecks"]))
@@ -186,7 +173,14 @@ class Utils:
         head = RED + "Error:" + TAIL
         print("{}{}".format(head, msg))
 
-    def valid_input(self, inputinfo, defaultvalue = None, validfunc = None, ext_args = None, is_password = False):
+    def valid_input(self, inputinfo, defaultvalue = None, validfunc = None, ext_args = None, is_password = False,
+                    answer = None):
+        if answer is not None:
+            # Value from the answer file, prompt only when it doesn't validate
+            inputstr = str(answer)
+            if validfunc is None or (validfunc(inputstr) if ext_args is None else validfunc(inputstr, ext_args)):
+                return inputstr
+            self.printRed('Unable to validate the answer for:' + inputinfo)
         while(True):
             if is_password:
                 inputstr = getpass.getpass(inputinfo)
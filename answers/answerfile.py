@@ -0,0 +1,79 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Declarative answers for the interactive prompts of the import workflow
+
+__author__ = 'jradhakrishna'
+
+import json
+import os
+
+"""
+    Answer file layout (every field is optional, a missing field falls back to the interactive prompt):
+
+    {
+      "sddcManager": {"username": "administrator@vsphere.local", "password": {"env": "SSO_PASSWORD"}},
+      "domain": "vi-vxrail",
+      "cluster": "VxRail-Virtual-SAN-Cluster-WLD",
+      "hosts": {"password": {"env": "ESXI_ROOT_PASSWORD"},
+                "passwords": {"esxi-5.vrack.vsphere.local": {"file": "/root/esxi-5.pwd"}}},
+      "dvs": {"mode": "new", "name": "test-vds", "vmnics": ["vmnic2", "vmnic3"]},
+      "nsxt": {"mode": "new", "geneveVlanId": 0, "adminPassword": {"env": "NSXT_ADMIN_PASSWORD"},
+               "vipFqdn": "nsxt-manager.vrack.vsphere.local", "gateway": "10.0.0.250", "netmask": "255.255.255.0",
+               "managers": ["nsxt-manager-1.vrack.vsphere.local", "nsxt-manager-2.vrack.vsphere.local",
+                            "nsxt-manager-3.vrack.vsphere.local"],
+               "tepIpAllocation": "dhcp"},
+      "vxrailManager": {"rootPassword": {"env": "VXRM_ROOT_PASSWORD"}, "adminUsername": "mystic",
+                        "adminPassword": {"env": "VXRM_ADMIN_PASSWORD"}},
+      "licenses": {"VSAN": "<license key>", "NSX-T": "<license key>"},
+      "acceptThumbprints": true
+    }
+
+    "dvs" with "mode": "existing" takes "name" and "portGroup" instead of "vmnics".
+    Instead of "vmnics", "policy": "fastest" or "balance" assigns the vmnics of every host by the uplink solver.
+    "nsxt" with "mode": "existing" takes "vipFqdn" of the shared instance and "geneveVlanId".
+    "tepIpAllocation": "static" takes "ipAddressPool", either {"name": "<existing pool>"} or a new pool
+    {"name": ..., "description": ..., "subnets": [{"cidr": ..., "gateway": ..., "ipRanges": ["a-b", ...]}]}.
+    Subnets of a new pool must not overlap each other or the subnets of the existing pools of the NSX-T instance,
+    and their ranges must hold a TEP IP for every uplink of every host. An existing pool must have that many
+    addresses free, the run exits with the shortfall otherwise. When an existing DVS is used and its overlay port
+    group has no active uplinks, the count is estimated at 2 per host and a smaller pool is only warned about.
+    Secrets are references: {"env": "VARIABLE"} or {"file": "/path"}, plain strings are accepted as well.
+"""
+
+
+class AnswerFile:
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as answer_file:
+            return cls(json.load(answer_file))
+
+    def __bool__(self):
+        return bool(self.data)
+
+    def get(self, *keys, default=None):
+        node = self.data
+        for key in keys:
+            if not isinstance(node, dict) or key not in node:
+                return default
+            node = node[key]
+        return node
+
+    def section(self, *keys):
+        node = self.get(*keys)
+        return AnswerFile(node if isinstance(node, dict) else None)
+
+    def secret(self, *keys):
+        return resolve_secret(self.get(*keys))
+
+
+def resolve_secret(ref):
+    if ref is None or isinstance(ref, str):
+        return ref
+    if 'env' in ref:
+        return os.environ.get(ref['env'])
+    if 'file' in ref:
+        with open(ref['file']) as secret_file:
+            return secret_file.read().strip()
+    return None
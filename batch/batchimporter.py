@@ -0,0 +1,131 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Imports many unmanaged clusters across domains in one run
+
+__author__ = 'jradhakrishna'
+
+import copy
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from answers.answerfile import AnswerFile
+from Utils import metrics
+
+DEFAULT_CONCURRENCY = 2
+
+"""
+    Batch file layout:
+
+    {
+      "concurrency": 4,
+      "defaults": { <answer file fields shared by every import, e.g. sddcManager, hosts, vxrailManager, licenses> },
+      "imports": [
+        {"domain": "vi-1", "cluster": "cluster-a", "answers": { <answer file fields for this import> }},
+        {"domain": "vi-1", "cluster": "cluster-b", "answers": { ... }},
+        {"domain": "vi-2", "cluster": "cluster-c"}
+      ]
+    }
+
+    Imports of one domain run in file order. The first cluster imported into a domain without clusters is its
+    primary cluster; the next cluster of that domain is only built once the primary import task has finished,
+    because it attaches to the NSX-T instance the primary brings in. Otherwise the next cluster is built and
+    validated while the previous import is running. At most "concurrency" imports run, and at most as many clusters
+    are built and validated, at the same time.
+"""
+
+
+class BatchImporter:
+    def __init__(self, batch, automator_factory, concurrency=None):
+        self.defaults = batch.get('defaults', {})
+        self.entries = batch['imports']
+        self.automator_factory = automator_factory
+        self.concurrency = concurrency or batch.get('concurrency', DEFAULT_CONCURRENCY)
+        self.import_slots = threading.Semaphore(self.concurrency)
+        # Building a payload may prompt for answers missing from the batch file, one build at a time
+        self.build_lock = threading.Lock()
+        self.results_lock = threading.Lock()
+        self.results = []
+        self.prepare_pool = None
+
+    @staticmethod
+    def load(path):
+        with open(path) as batch_file:
+            return json.load(batch_file)
+
+    def run(self):
+        lanes = OrderedDict()
+        for entry in self.entries:
+            lanes.setdefault(entry['domain'], []).append(entry)
+        with ThreadPoolExecutor(max_workers=len(lanes)) as lane_pool, \
+                ThreadPoolExecutor(max_workers=min(len(lanes), self.concurrency)) as prepare_pool:
+            self.prepare_pool = prepare_pool
+            for future in [lane_pool.submit(self.run_lane, lane) for lane in lanes.values()]:
+                future.result()
+        order = [(entry['domain'], entry['cluster']) for entry in self.entries]
+        return sorted(self.results, key=lambda x: order.index((x['domain'], x['cluster'])))
+
+    def run_lane(self, lane):
+        pending = self.prepare_pool.submit(self.__attempt, lane[0], 'prepare', self.prepare, lane[0])
+        for idx, entry in enumerate(lane):
+            plan = pending.result()
+            pending = None
+            has_next = idx + 1 < len(lane)
+            if plan is not None and not plan['isPrimary'] and has_next:
+                # Nothing depends on this import, get the next one validated while it runs
+                pending = self.prepare_pool.submit(self.__attempt, lane[idx + 1], 'prepare', self.prepare,
+                                                   lane[idx + 1])
+            if plan is not None:
+                self.__attempt(entry, 'import', self.run_import, plan)
+            if pending is None and has_next:
+                pending = self.prepare_pool.submit(self.__attempt, lane[idx + 1], 'prepare', self.prepare,
+                                                   lane[idx + 1])
+
+    def prepare(self, entry):
+        automator = self.automator_factory(self.answers_for(entry))
+        with self.build_lock:
+            plan = automator.build_import()
+        with metrics.stage('validation'):
+            plan['validationId'] = automator.validate_import(plan)
+        plan['automator'] = automator
+        return plan
+
+    def run_import(self, plan):
+        automator = plan['automator']
+        with self.import_slots, metrics.stage('submit'):
+            task_id = automator.start_import(plan)
+            status = automator.domains.wait_for_task(task_id)
+        self.__record(plan, 'SUCCEEDED' if status == 'SUCCESSFUL' else 'FAILED', 'import',
+                      isPrimary=plan['isPrimary'], validationId=plan['validationId'], taskId=task_id, taskStatus=status)
+
+    def answers_for(self, entry):
+        answers = merge(copy.deepcopy(self.defaults), entry.get('answers', {}))
+        answers['domain'] = entry['domain']
+        answers['cluster'] = entry['cluster']
+        return AnswerFile(answers)
+
+    def __attempt(self, entry, stage, fn, *args):
+        # exit() on the error paths of the automators, a prompt with no input left, or any other error fails this
+        # import only
+        try:
+            return fn(*args)
+        except (SystemExit, EOFError):
+            self.__record(entry, 'FAILED', stage)
+            return None
+        except Exception as e:
+            self.__record(entry, 'FAILED', stage, error='{}: {}'.format(type(e).__name__, e))
+            return None
+
+    def __record(self, entry, status, stage, **details):
+        result = {"domain": entry['domain'], "cluster": entry['cluster'], "status": status, "stage": stage}
+        result.update(details)
+        with self.results_lock:
+            self.results.append(result)
+
+
+def merge(base, override):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge(base[key], value)
+        else:
+            base[key] = value
+    return base
@@ -0,0 +1,229 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Runs the headless import against the stand-in SDDC Manager over a sweep of inventory sizes
+
+__author__ = 'jradhakrishna'
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from standin.sddcstandin import Inventory, SddcStandin
+
+DEFAULT_HOSTS = [4, 16, 64, 256]
+DEFAULT_VMNICS = [4, 8]
+DEFAULT_DVS = [1, 2]
+DEFAULT_RESULTS_FILE = 'benchmark-results.json'
+# Relative change above which compare reports a metric as regressed
+DEFAULT_THRESHOLD = 10.0
+# Metrics compared against the baseline, lower is better for all of them
+COMPARED_METRICS = ['wallSeconds', 'sleepSeconds', 'requests', 'bytesSent', 'bytesReceived', 'peakRssKB']
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+"""
+    Usage: python3 -m benchmark.workflowbenchmark --hosts 4 16 64 256 --vmnics 4 8 --dvs 1 2 --output results.json
+           python3 -m benchmark.workflowbenchmark --hosts 4 16 --baseline results.json
+
+    Every scenario starts a stand-in SDDC Manager with domains vi-1 and vi-2, and runs the primary import of
+    cluster c1 into vi-1 from an answer file in its own process, so the peak RSS is the import's alone.
+    With --baseline the run is compared to a saved one and the exit code is 1 when a metric regressed by more
+    than --threshold percent. Scenarios whose import failed are marked as such, left out of the comparison and
+    make the exit code 1 as well.
+"""
+
+
+def scenario_name(hosts, vmnics, dvs):
+    return 'hosts={} vmnics={} dvs={}'.format(hosts, vmnics, dvs)
+
+
+def answers():
+    return {
+        "sddcManager": {"username": 'admin@local', "password": 'VMware123!'},
+        "domain": 'vi-1',
+        "cluster": 'c1',
+        "hosts": {"password": 'VMware123!'},
+        "dvs": {"mode": 'new', "name": 'overlay-dvs', "policy": 'fastest'},
+        "nsxt": {"mode": 'existing', "vipFqdn": 'nsx-vi-2.vrack.local', "geneveVlanId": 10,
+                 "tepIpAllocation": 'dhcp'},
+        "vxrailManager": {"rootPassword": 'VMware123!', "adminUsername": 'mystic', "adminPassword": 'VMware123!'},
+        "licenses": {"VSAN": 'VSAN-KEY', "NSX-T": 'NSX-KEY'},
+        "acceptThumbprints": True
+    }
+
+
+def run_scenario(hosts, vmnics, dvs, options, workdir):
+    standin = SddcStandin(Inventory(domains=2, clusters=1, hosts=hosts, vmnics=vmnics, dvs=dvs),
+                          latency=options.latency, progress_polls=options.progress_polls, seed=options.seed)
+    url = standin.start()
+    answers_path = os.path.join(workdir, 'answers.json')
+    result_path = os.path.join(workdir, 'result.json')
+    with open(answers_path, 'w') as answers_file:
+        json.dump(answers(), answers_file)
+    command = [sys.executable, '-m', 'benchmark.workflowbenchmark', '--child', result_path, '--',
+               '--sddc-url', url, '--answers', answers_path, '--skip-dns-check', '--cache-ttl', '0',
+               '--journal', '', '--metrics-file', '', '--known-thumbprints', '',
+               '--skip-credential-check']
+    started = time.monotonic()
+    try:
+        with open(os.path.join(workdir, 'output.txt'), 'w') as output:
+            process = subprocess.Popen(command, cwd=REPO_DIR, stdin=subprocess.DEVNULL, stdout=output,
+                                       stderr=subprocess.STDOUT)
+            # wait4 returns the resource usage of this child alone
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        standin.stop()
+    if not os.path.exists(result_path):
+        print('\033[91m {} crashed, see {}\033[00m'.format(scenario_name(hosts, vmnics, dvs),
+                                                           os.path.join(workdir, 'output.txt')))
+        exit(1)
+    with open(result_path) as result_file:
+        child = json.load(result_file)
+    by_endpoint = {'{} {}'.format(endpoint['method'], endpoint['endpoint']): endpoint['count']
+                   for endpoint in child['metrics']['endpoints']}
+    return {
+        "name": scenario_name(hosts, vmnics, dvs),
+        "hosts": hosts,
+        "vmnics": vmnics,
+        "dvs": dvs,
+        "exitCode": child['exitCode'],
+        "failed": child['exitCode'] != 0,
+        "wallSeconds": child['wallSeconds'],
+        "processSeconds": time.monotonic() - started,
+        "sleepSeconds": child['timer']['waiting'],
+        "requests": sum(by_endpoint.values()),
+        "requestsByEndpoint": by_endpoint,
+        "bytesSent": standin.bytes_received,
+        "bytesReceived": standin.bytes_sent,
+        "peakRssKB": peak_rss_kb(usage.ru_maxrss)
+    }
+
+
+def peak_rss_kb(ru_maxrss, platform=sys.platform):
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    return ru_maxrss // 1024 if platform == 'darwin' else ru_maxrss
+
+
+def run_child(result_path, argv):
+    # Runs in the scenario process: the import itself, then its timer and request metrics for the parent
+    sys.path.insert(0, REPO_DIR)
+    import vxrailworkloadautomator
+    automator = vxrailworkloadautomator.VxRaiWorkloadAutomator(vxrailworkloadautomator.parse_options(argv))
+    started = time.monotonic()
+    exit_code = 0
+    try:
+        automator.initApp()
+    except SystemExit as e:
+        exit_code = e.code or 0
+    with open(result_path, 'w') as result_file:
+        json.dump({"exitCode": exit_code, "wallSeconds": time.monotonic() - started,
+                   "timer": automator.utils.timer.summary(), "metrics": automator.utils.metrics.summary()},
+                  result_file)
+
+
+def run_sweep(options):
+    results = []
+    for hosts, vmnics, dvs in itertools.product(options.hosts, options.vmnics, options.dvs):
+        with tempfile.TemporaryDirectory(prefix='workflowbenchmark-') as workdir:
+            result = run_scenario(hosts, vmnics, dvs, options, workdir)
+        print('{} {name}: exit {exitCode}, {wallSeconds:.2f}s, asleep {sleepSeconds:.2f}s, {requests} requests, '
+              '{bytesReceived} bytes in, {bytesSent} bytes out, peak RSS {peakRssKB} KB\033[00m'
+              .format('\033[91m' if result['failed'] else '\033[92m', **result))
+        results.append(result)
+    return {
+        "created": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "latency": options.latency,
+        "progressPolls": options.progress_polls,
+        "scenarios": results
+    }
+
+
+def failed_scenarios(results):
+    # Older results have no failed flag, their exit code tells
+    return [scenario['name'] for scenario in results['scenarios']
+            if scenario.get('failed', scenario.get('exitCode') not in (0, None))]
+
+
+def compare(baseline, current, threshold):
+    # Prints every compared metric of the scenarios both runs have and completed, returns the regressions
+    baseline_scenarios = {scenario['name']: scenario for scenario in baseline['scenarios']}
+    baseline_failed = set(failed_scenarios(baseline))
+    current_failed = set(failed_scenarios(current))
+    regressions = []
+    print('\033[1m {:<32} {:<14} {:>14} {:>14} {:>9}\033[0m'.format('scenario', 'metric', 'baseline', 'current',
+                                                                      'change'))
+    for scenario in current['scenarios']:
+        before = baseline_scenarios.get(scenario['name'])
+        if before is None:
+            print('\033[93m {} is not in the baseline\033[00m'.format(scenario['name']))
+            continue
+        if scenario['name'] in baseline_failed | current_failed:
+            # A run that stopped early looks faster and leaner than it is
+            print('\033[93m {} failed in {} run, not compared\033[00m'.format(
+                scenario['name'], 'this' if scenario['name'] in current_failed else 'the baseline'))
+            continue
+        for metric in COMPARED_METRICS:
+            change = relative_change(before[metric], scenario[metric])
+            regressed = change > threshold
+            if regressed:
+                regressions.append((scenario['name'], metric, change))
+            print('{} {:<32} {:<14} {:>14} {:>14} {:>8.1f}%\033[00m'.format(
+                '\033[91m' if regressed else '\033[92m' if change < -threshold else '\033[00m', scenario['name'],
+                metric, format_metric(before[metric]), format_metric(scenario[metric]), change))
+    return regressions
+
+
+def relative_change(before, after):
+    if not before:
+        return 0.0 if not after else 100.0
+    return (after - before) * 100.0 / before
+
+
+def format_metric(value):
+    return '{:.2f}'.format(value) if isinstance(value, float) else str(value)
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description='Import benchmark against the stand-in SDDC Manager')
+    parser.add_argument('--hosts', type=int, nargs='+', default=DEFAULT_HOSTS, help='Hosts of the imported cluster')
+    parser.add_argument('--vmnics', type=int, nargs='+', default=DEFAULT_VMNICS, help='vmnics of every host')
+    parser.add_argument('--dvs', type=int, nargs='+', default=DEFAULT_DVS,
+                        help='DVSes of the imported cluster, sys-dvs included')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every stand-in response takes')
+    parser.add_argument('--progress-polls', type=int, default=1,
+                        help='Polls a stand-in query, validation or task stays in progress')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the stand-in')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help='JSON file the results are written to')
+    parser.add_argument('--baseline', default=None, help='Results of an earlier run to compare this one to')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Percent a metric may grow over the baseline before it counts as a regression')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('automator_args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    options = parse_options()
+    if options.child:
+        run_child(options.child, options.automator_args[1:] if options.automator_args[:1] == ['--'] else
+                  options.automator_args)
+        exit(0)
+    results = run_sweep(options)
+    with open(options.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    print('\033[96m Results written to {}\033[00m'.format(options.output))
+    exit_code = 0
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            regressions = compare(json.load(baseline_file), results, options.threshold)
+        if regressions:
+            print('\033[91m {} metrics regressed by more than {}%\033[00m'.format(len(regressions), options.threshold))
+            exit_code = 1
+    failed = failed_scenarios(results)
+    if failed:
+        print('\033[91m The import failed in {}\033[00m'.format(', '.join(failed)))
+        exit_code = 1
+    exit(exit_code)
@@ -2,64 +2,111 @@
 
 __author__ = 'jradhakrishna'
 
-import time
 from Utils.utils import Utils
 
+# Cache key of the VxRail Manager view of a cluster, next to the SDDC Manager query criteria
+VXRAIL_CLUSTER_CRITERION = 'VXRAIL_CLUSTER_WITH_HOST_DETAILS'
+
 
 class ClustersAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None):
+        self.utils = utils if utils is not None else Utils(args)
         self.hostname = args[0]
         self.utils.printGreen('Initializing Clusters Automator')
 
-    def create_cluster(self, data):
-        validations_url = 'https://'+self.hostname+'/v1/clusters/validations'
+    def create_cluster(self, data, confirm=True):
+        validation_id = self.validate_cluster(data)
+        if confirm:
+            input("\033[1m Enter to import cluster..\033[0m")
+        return {"validationId": validation_id, "taskId": self.import_cluster(data)}
+
+    def validate_cluster(self, data):
+        validations_url = self.utils.url('/v1/clusters/validations')
         response = self.utils.post_request(data, validations_url)
         self.utils.printGreen(
             'Validation started for import cluster operation. The validation id is: ' + response['id'])
-        validate_poll_url = 'https://'+self.hostname+'/v1/clusters/validations/' + response['id']
+        validation_id = response['id']
+        validate_poll_url = self.utils.url('/v1/clusters/validations/' + validation_id)
         self.utils.printGreen ('Polling on validation api ' + validate_poll_url)
-        time.sleep(10)
-        validation_status = self.utils.poll_on_id(validate_poll_url, False)
+        validation_response = self.utils.poll_validation(validate_poll_url)
+        validation_status = validation_response['resultStatus']
         self.utils.printGreen('Validate cluster ended with status: ' + validation_status)
         if validation_status != 'SUCCEEDED':
             self.utils.printRed ('Validation Failed.')
-            self.utils.print_validation_errors(validate_poll_url)
+            self.utils.print_validation_errors(validate_poll_url, validation_response)
             exit(1)
-        input("\033[1m Enter to import cluster..\033[0m")
+        return validation_id
 
-        create_cluster_url = 'https://' + self.hostname + '/v1/clusters'
+    def import_cluster(self, data):
+        create_cluster_url = self.utils.url('/v1/clusters')
         response = self.utils.post_request(data, create_cluster_url)
         self.utils.printGreen(
             'Importing cluster, monitor the status of the task(task-id:' + response['id'] + ') from sddc-manager ui')
         # task_url = 'https://'+self.hostname+'/v1/tasks/' + response['id']
         # self.utils.printGreen('Create cluster ended with status: ' + self.utils.poll_on_id(task_url,True))
+        return response['id']
 
     def get_unmanaged_clusters(self, payload, domain_id):
-        clusters_url = 'https://'+self.hostname+'/v1/domains/' + domain_id + '/clusters/queries'
+        clusters_url = self.utils.url('/v1/domains/' + domain_id + '/clusters/queries')
         # self.utils.printGreen('\nGet queries api: ' + clusters_url)
         response = self.utils.post_request_raw(payload, clusters_url)
         return response
 
+    def query_unmanaged_clusters(self, criterion, domain_id):
+        # Discovery results are reused from the on-disk cache of earlier runs while they are fresh
+        return self.utils.cache.cached((self.utils.hostname, domain_id, '', criterion),
+                                       self.__discover_unmanaged_clusters, criterion, domain_id)
+
+    def __discover_unmanaged_clusters(self, criterion, domain_id):
+        response = self.get_unmanaged_clusters({"name": criterion}, domain_id)
+        return self.poll_queries(self.utils.url(response.headers['Location']))
+
     def get_unmanaged_cluster(self, payload, domain_id, clustername):
-        cluster_url = 'https://'+ self.hostname +'/v1/domains/' + domain_id + '/clusters/' + clustername + '/queries'
+        cluster_url = self.utils.url('/v1/domains/' + domain_id + '/clusters/' + clustername + '/queries')
         # self.utils.printGreen('\nGet queries api: ' + cluster_url + ' payload:' + json.dumps(payload))
-        time.sleep(20)
         response = self.utils.post_request_raw(payload, cluster_url)
         return response
 
+    def prefetch_cluster(self, domain_id, clustername):
+        # Discovery that only depends on the selected cluster, run while the operator answers prompts
+        self.utils.prefetcher.submit(('vxrail-cluster', domain_id, clustername),
+                                     self.__fetch_cluster_with_host_details, domain_id, clustername)
+
+    def prefetch_unmanaged_cluster(self, criterion, domain_id, clustername):
+        self.utils.prefetcher.submit(('queries', domain_id, clustername, criterion),
+                                     self.__query_unmanaged_cluster, criterion, domain_id, clustername)
+
+    def query_unmanaged_cluster(self, criterion, domain_id, clustername):
+        return self.utils.prefetched(('queries', domain_id, clustername, criterion),
+                                     self.__query_unmanaged_cluster, criterion, domain_id, clustername)
+
+    def __query_unmanaged_cluster(self, criterion, domain_id, clustername):
+        return self.utils.cache.cached((self.utils.hostname, domain_id, clustername, criterion),
+                                       self.__discover_unmanaged_cluster, criterion, domain_id, clustername)
+
+    def __discover_unmanaged_cluster(self, criterion, domain_id, clustername):
+        response = self.get_unmanaged_cluster({"name": criterion}, domain_id, clustername)
+        return self.poll_queries(self.utils.url(response.headers['Location']))
+
     def get_cluster_with_host_details(self, domain_id, clusterName):
-        post_url = 'http://' + self.hostname + '/domainmanager/vxrail/vidomains/' + domain_id + '/cluster/queries'
+        return self.utils.prefetched(('vxrail-cluster', domain_id, clusterName),
+                                     self.__fetch_cluster_with_host_details, domain_id, clusterName)
+
+    def __fetch_cluster_with_host_details(self, domain_id, clusterName):
+        return self.utils.cache.cached((self.utils.hostname, domain_id, clusterName, VXRAIL_CLUSTER_CRITERION),
+                                       self.__discover_cluster_with_host_details, domain_id, clusterName)
+
+    def __discover_cluster_with_host_details(self, domain_id, clusterName):
+        post_url = self.utils.url('/domainmanager/vxrail/vidomains/' + domain_id + '/cluster/queries', secure=False)
         data = {"clusterName": clusterName}
         response = self.utils.post_request(data, post_url)
 
-        get_url = 'http://' + self.hostname + '/domainmanager/vxrail/vidomains/requests/' + response['id']
+        get_url = self.utils.url('/domainmanager/vxrail/vidomains/requests/' + response['id'], secure=False)
         get_response = self.utils.get_poll_request(get_url, 'MARKED_FOR_EVICTION')
         return get_response
 
     def poll_queries(self, url):
         queries_url = url
-        time.sleep(15)
         response = self.utils.poll_on_queries(queries_url)
         return response
 
@@ -0,0 +1,59 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Index of the discovered DVSes by name and transport type, and of their port groups and uplinks
+
+__author__ = 'jradhakrishna'
+
+# Traffic the system DVS has to carry for the primary datastore
+SYSTEM_TRANSPORT_TYPES = {
+    'VSAN': {'MANAGEMENT', 'VSAN', 'VMOTION'},
+    'FC': {'MANAGEMENT', 'VMOTION'}
+}
+
+
+class DvsIndex:
+    # Built in one pass over the vdsSpecs of the discovery, in discovery order, over the same spec objects
+    def __init__(self, vds_specs):
+        self.vds_specs = vds_specs or []
+        self.by_name = {}
+        self.by_transport = {}
+        self.port_groups = {}
+        self.by_port_group = {}
+        # Port groups discovered with "activeUplinks": null, which the import API doesn't accept
+        self.null_uplinks = []
+        for dvs in self.vds_specs:
+            self.by_name[dvs['name']] = dvs
+            self.port_groups[dvs['name']] = dvs.get('portGroupSpecs') or []
+            for pg in self.port_groups[dvs['name']]:
+                if 'transportType' in pg:
+                    self.by_transport.setdefault(pg['transportType'], []).append(dvs['name'])
+                if 'activeUplinks' in pg and pg['activeUplinks'] is None:
+                    self.null_uplinks.append(pg)
+                self.by_port_group[(dvs['name'], pg['name'])] = pg
+
+    def names(self):
+        return list(self.by_name)
+
+    def dvs(self, name):
+        return self.by_name.get(name)
+
+    def port_group_names(self, dvs_name):
+        return [pg['name'] for pg in self.port_groups.get(dvs_name, [])]
+
+    def port_group(self, dvs_name, pg_name):
+        return self.by_port_group.get((dvs_name, pg_name))
+
+    def system_dvs(self, datastore_type):
+        # First DVS carrying every transport type the datastore needs, None when no DVS carries them all
+        required = SYSTEM_TRANSPORT_TYPES.get(datastore_type)
+        if not required:
+            return None
+        candidates = None
+        for transport_type in required:
+            names = set(self.by_transport.get(transport_type, []))
+            candidates = names if candidates is None else candidates & names
+        return next((self.by_name[name] for name in self.by_name if name in candidates), None)
+
+    def strip_null_uplinks(self):
+        for pg in self.null_uplinks:
+            pg.pop('activeUplinks', None)
+        self.null_uplinks = []
@@ -0,0 +1,194 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Assigns the free pnics of every host to the DVSes of the import following a policy
+
+__author__ = 'jradhakrishna'
+
+import heapq
+import itertools
+
+# "fastest" gives the overlay DVS the fastest active pnics and leaves the rest where they are,
+# "balance" spreads the active pnics over all the DVSes so their total link speed is as even as possible
+POLICIES = ['fastest', 'balance']
+DEFAULT_POLICY = 'fastest'
+MAX_ALTERNATIVES = 5
+# Placements the balance search tries before it settles for the best alternatives found so far
+MAX_PLACEMENTS = 50000
+
+
+class UplinkSolver:
+    # The free pnics of a host fall into classes of equal speed and state, pnics of a class are interchangeable.
+    # An alternative says how many pnics of each class go to each DVS, so the search runs over the few classes
+    # instead of the pnic permutations, and one alternative applies to every host that has the pnics for it.
+    def __init__(self, dvs_names, policy=DEFAULT_POLICY, uplinks=2, exact=False):
+        # dvs_names starts with the overlay DVS, uplinks is the minimum per DVS or the exact count with exact
+        self.dvs_names = list(dvs_names)
+        self.policy = policy
+        self.uplinks = uplinks
+        self.exact = exact
+        self.fallbacks = []
+        # Alternatives already found per pnic shape, hosts of a cluster mostly share one
+        self.__solved = {}
+
+    def alternatives(self, vmnics, limit=MAX_ALTERNATIVES):
+        # Best alternatives for the pnics, each a list per DVS of {class: count}
+        classes = pnic_classes(vmnics)
+        shape = (tuple(sorted((key, len(names)) for key, names in classes.items())), limit)
+        if shape not in self.__solved:
+            if self.policy == 'balance' and len(self.dvs_names) > 1 and not self.exact:
+                scored = self.__balanced(classes, limit)
+            else:
+                scored = self.__fastest(classes)
+            self.__solved[shape] = [alternative for _, alternative in
+                                    sorted(scored, key=lambda item: item[0])[:limit]]
+        return self.__solved[shape]
+
+    def apply(self, alternative, vmnics):
+        # hostNetworkSpec.vmNics of the host for the alternative, None when the host lacks the pnics for it
+        classes = pnic_classes(vmnics)
+        assigned = []
+        for dvs_name, counts in zip(self.dvs_names, alternative):
+            for key, count in sorted(counts.items(), key=lambda item: class_order(item[0])):
+                if len(classes.get(key, [])) < count:
+                    return None
+                assigned.extend({'id': name, 'vdsName': dvs_name} for name in classes[key][:count])
+                classes[key] = classes[key][count:]
+        return assigned
+
+    def assign(self, hosts, alternative=None):
+        # {hostName: vmNics}, the given alternative where the host has the pnics for it, else its own best one
+        self.fallbacks = []
+        assignments = {}
+        for host in hosts:
+            vmnics = host.get('vmNics') or []
+            assigned = self.apply(alternative, vmnics) if alternative is not None else None
+            if assigned is None:
+                best = self.alternatives(vmnics, 1)
+                assigned = self.apply(best[0], vmnics) if best else []
+                if alternative is not None:
+                    self.fallbacks.append(host['hostName'])
+            assignments[host['hostName']] = assigned
+        return assignments
+
+    def describe(self, alternative):
+        return '; '.join('{}: {}'.format(dvs_name, ', '.join(
+            '{} x {}'.format(count, format_class(key))
+            for key, count in sorted(counts.items(), key=lambda item: class_order(item[0])) if count))
+            for dvs_name, counts in zip(self.dvs_names, alternative) if any(counts.values()))
+
+    def __fastest(self, classes):
+        # Every way of taking `uplinks` pnics for the overlay DVS out of the classes, fewest inactive and
+        # fastest first
+        keys = sorted(classes, key=class_order)
+        scored = []
+        for combination in itertools.combinations_with_replacement(keys, self.uplinks):
+            counts = {key: combination.count(key) for key in set(combination)}
+            if any(count > len(classes[key]) for key, count in counts.items()):
+                continue
+            inactive = sum(count for key, count in counts.items() if not key[1])
+            speed = sum(key[0] * count for key, count in counts.items())
+            scored.append(((inactive, -speed, [class_order(key) for key in combination]),
+                           [counts] + [{} for _ in self.dvs_names[1:]]))
+        return scored
+
+    def __balanced(self, classes, limit):
+        # Splits of the active pnics over the DVSes giving each at least `uplinks`, the smallest difference of
+        # total link speed between the DVSes first. The pnics are placed one at a time, fastest first and on the
+        # slowest DVS first so the first split found is the greedy one, DVSes holding the same pnics so far are
+        # tried only once, and a branch is dropped once even the best split it can still reach does not beat
+        # the worst of the `limit` best kept so far.
+        pnics = [key for key in sorted((key for key in classes if key[1]), key=class_order) for _ in classes[key]]
+        rest = [sum(key[0] for key in pnics[idx:]) for idx in range(len(pnics) + 1)]
+        dvs_count = len(self.dvs_names)
+        counts = [0] * dvs_count
+        speeds = [0] * dvs_count
+        parts = [{} for _ in range(dvs_count)]
+        best = []
+        budget = [MAX_PLACEMENTS]
+
+        def keep():
+            # Ties go to the alternative giving the overlay DVS the most speed
+            score = (max(speeds) - min(speeds), -speeds[0], [-count for count in counts])
+            entry = ((-score[0], -score[1], counts[:]), budget[0], [dict(part) for part in parts])
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry[0] > best[0][0]:
+                heapq.heapreplace(best, entry)
+
+        def place(idx):
+            if idx == len(pnics):
+                if min(counts) >= self.uplinks:
+                    keep()
+                return
+            if sum(max(0, self.uplinks - count) for count in counts) > len(pnics) - idx:
+                return
+            if len(best) == limit and (spread_bound(speeds, rest[idx]), -(speeds[0] + rest[idx])) > \
+                    (-best[0][0][0], -best[0][0][1]):
+                return
+            key = pnics[idx]
+            tried = set()
+            for dvs in sorted(range(dvs_count), key=lambda dvs: (speeds[dvs], dvs)):
+                state = tuple(sorted(parts[dvs].items()))
+                if dvs and state in tried:
+                    continue
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+                if dvs:
+                    tried.add(state)
+                counts[dvs] += 1
+                speeds[dvs] += key[0]
+                parts[dvs][key] = parts[dvs].get(key, 0) + 1
+                place(idx + 1)
+                counts[dvs] -= 1
+                speeds[dvs] -= key[0]
+                parts[dvs][key] -= 1
+                if not parts[dvs][key]:
+                    del parts[dvs][key]
+
+        place(0)
+        return [((-neg[0], -neg[1], [-count for count in neg[2]]), alternative) for neg, _, alternative in best]
+
+
+def host_vmnics(vmnics, host_name):
+    # vmNics of the host from the per host assignments, or from the list of older runs shared by all the hosts
+    return vmnics.get(host_name) or [] if isinstance(vmnics, dict) else vmnics or []
+
+
+def pnic_classes(vmnics):
+    # {(speed, active): [names]} of the pnics not already uplinks of a DVS
+    classes = {}
+    for vmnic in sorted(vmnics, key=lambda vmnic: vmnic_order(vmnic['name'])):
+        if vmnic.get('vdsName') or vmnic.get('isInUse'):
+            continue
+        key = (vmnic.get('linkSpeedMB') or 0, bool(vmnic.get('isActive')))
+        classes.setdefault(key, []).append(vmnic['name'])
+    return classes
+
+
+def spread_bound(speeds, rest):
+    # Smallest speed difference between the DVSes still reachable by adding `rest` more speed, pouring it
+    # into the slowest DVSes first
+    top = max(speeds)
+    ordered = sorted(speeds)
+    level = ordered[0]
+    for idx in range(1, len(ordered) + 1):
+        step = ((ordered[idx] if idx < len(ordered) else top) - level) * idx
+        if step >= rest:
+            return top - level - rest / idx
+        rest -= step
+        level = ordered[idx] if idx < len(ordered) else top
+    return 0
+
+
+def class_order(key):
+    return not key[1], -key[0]
+
+
+def vmnic_order(name):
+    # vmnic10 after vmnic9
+    digits = ''.join(char for char in name if char.isdigit())
+    return int(digits) if digits else -1, name
+
+
+def format_class(key):
+    return '{}MB-{}'.format(key[0], 'Active' if key[1] else 'Inactive')
@@ -0,0 +1,72 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: vmnics usable on every host of the discovered cluster, derived from the cluster discovery
+
+__author__ = 'jradhakrishna'
+
+
+class VmnicCompatibility:
+    # Every distinct (name, speed, state) vmnic gets a bit, a host is the int of the vmnics it has,
+    # so the vmnics common to all hosts are the AND of the hosts.
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.vmnics = []
+        self.bits = {}
+        self.bitsets = []
+        for host in hosts:
+            bitset = 0
+            for vmnic in host.get('vmNics') or []:
+                if vmnic.get('vdsName') or vmnic.get('isInUse'):
+                    # Already an uplink of a DVS, not free for overlay traffic
+                    continue
+                key = vmnic_key(vmnic)
+                if key not in self.bits:
+                    self.bits[key] = len(self.vmnics)
+                    self.vmnics.append(vmnic)
+                bitset |= 1 << self.bits[key]
+            self.bitsets.append(bitset)
+
+    @property
+    def discovered(self):
+        # The discovery of older releases has no vmnics for the hosts
+        return bool(self.hosts) and all(host.get('vmNics') for host in self.hosts)
+
+    def common(self):
+        # vmnics of every host, in the order of the first host that has them
+        return self.__vmnics(self.__and(self.bitsets))
+
+    def breaking_hosts(self):
+        # {hostName: [vmnics all the other hosts have]}, the hosts without which more vmnics would be common
+        if len(self.bitsets) < 2:
+            return {}
+        # AND of the hosts before and after each host, so every host is compared to all the others in one pass
+        prefix = [~0]
+        for bitset in self.bitsets[:-1]:
+            prefix.append(prefix[-1] & bitset)
+        suffix = [~0]
+        for bitset in reversed(self.bitsets[1:]):
+            suffix.append(suffix[-1] & bitset)
+        suffix.reverse()
+        breaking = {}
+        for idx, host in enumerate(self.hosts):
+            missing = prefix[idx] & suffix[idx] & ~self.bitsets[idx]
+            if missing:
+                breaking[host['hostName']] = self.__vmnics(missing)
+        return breaking
+
+    def __vmnics(self, bitset):
+        return [vmnic for idx, vmnic in enumerate(self.vmnics) if bitset >> idx & 1]
+
+    @staticmethod
+    def __and(bitsets):
+        common = ~0 if bitsets else 0
+        for bitset in bitsets:
+            common &= bitset
+        return common
+
+
+def vmnic_key(vmnic):
+    return vmnic['name'], vmnic.get('linkSpeedMB'), bool(vmnic.get('isActive'))
+
+
+def format_vmnic(vmnic):
+    return '{}-{}MB-{}'.format(vmnic['name'], vmnic.get('linkSpeedMB'), 'Active' if vmnic.get('isActive') else 'Inactive')
@@ -4,19 +4,18 @@
 __author__ = 'jradhakrishna'
 
 from Utils.utils import Utils
-import time
 
 
 
 class DomainsAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None):
+        self.utils = utils if utils is not None else Utils(args)
         self.hostname = args[0]
         self.utils.printGreen('Initializing Domains Automator')
 
     def create_workload_domain(self, payload):
         # validations
-        validations_url = 'https://' + self.hostname + '/v1/domains/validations/creations'
+        validations_url = self.utils.url('/v1/domains/validations/creations')
         print ('Validating the input....')
         response = self.utils.post_request(payload, validations_url)
         if (response['resultStatus'] != 'SUCCEEDED'):
@@ -24,49 +23,62 @@ class DomainsAutomator:
             exit(1)
 
         # Domain Creation
-        domain_creation_url = self.hostname + '/v1/domains'
+        domain_creation_url = self.utils.url('/v1/domains')
         response = self.utils.post_request(payload, domain_creation_url)
         print ('Creating Domain...')
 
-        task_url = 'https://' + self.hostname + '/v1/tasks/' + response['id']
+        task_url = self.utils.url('/v1/tasks/' + response['id'])
         print ("Domain creation task completed with status:  " + self.utils.poll_on_id(task_url, True))
 
-    def update_workload_domain(self, payload, domain_id):
+    def update_workload_domain(self, payload, domain_id, confirm=True):
+        validation_id = self.validate_workload_domain_update(payload, domain_id)
+        if confirm:
+            input("\033[1m Enter to import cluster..\033[0m")
+        return {"validationId": validation_id, "taskId": self.patch_workload_domain(payload, domain_id)}
+
+    def validate_workload_domain_update(self, payload, domain_id):
         # validations
-        validations_url = 'https://' + self.hostname + '/v1/domains/' + domain_id + '/validations '
+        validations_url = self.utils.url('/v1/domains/' + domain_id + '/validations ')
         self.utils.printGreen('Validating the input....')
         response = self.utils.post_request(payload, validations_url)
         self.utils.printGreen(
             'Validation started for import cluster operation. The validation id is: ' + response['id'])
-        validate_poll_url = 'https://' + self.hostname + '/v1/domains/validations/' + response['id']
+        validation_id = response['id']
+        validate_poll_url = self.utils.url('/v1/domains/validations/' + validation_id)
         self.utils.printGreen('Polling on validation api ' + validate_poll_url)
-        time.sleep(10)
-        validation_status = self.utils.poll_on_id(validate_poll_url, False)
+        validation_response = self.utils.poll_validation(validate_poll_url)
+        validation_status = validation_response['resultStatus']
         self.utils.printGreen('Validate domain ended with status: ' + validation_status)
         if validation_status != 'SUCCEEDED':
             self.utils.printRed('Validation Failed.')
-            self.utils.print_validation_errors(validate_poll_url)
+            self.utils.print_validation_errors(validate_poll_url, validation_response)
             exit(1)
+        return validation_id
 
+    def patch_workload_domain(self, payload, domain_id):
         # Domain Update
-        input("\033[1m Enter to import cluster..\033[0m")
-        domain_creation_url = 'https://' + self.hostname + '/v1/domains/' + domain_id
+        domain_creation_url = self.utils.url('/v1/domains/' + domain_id)
         response = self.utils.patch_request(payload, domain_creation_url)
         self.utils.printGreen(
             'Importing cluster, monitor the status of the task(task-id:' + response['id'] + ') from sddc-manager ui')
         # task_url = 'https://' + self.hostname + '/v1/tasks/' + response['id']
         # print ("Domain creation task completed with status:  " + self.utils.poll_on_id(task_url, True))
+        return response['id']
+
+    def wait_for_task(self, task_id):
+        task_url = self.utils.url('/v1/tasks/' + task_id)
+        return self.utils.poll_on_id(task_url, True)
 
     def get_domains(self):
         # get domains
-        domains_url = 'https://' + self.hostname + '/v1/domains'
+        domains_url = self.utils.url('/v1/domains')
         self.utils.printGreen('Getting the domains..')
         response = self.utils.get_request(domains_url)
         return response
 
     def get_domains_details(self, id):
         # get domains
-        domains_details_url = 'http://' + self.hostname + '/inventory/domains/' + id + '/inventory'
+        domains_details_url = self.utils.url('/inventory/domains/' + id + '/inventory', secure=False)
         self.utils.printGreen('Getting the domains details ..')
         response = self.utils.get_request(domains_details_url)
         return response
@@ -2,18 +2,25 @@
 
 __author__ = 'jradhakrishna'
 
+import asyncio
 import getpass
 from Utils.utils import Utils
+from clusters.uplinksolver import host_vmnics
+from hosts.thumbprintstore import ThumbprintStore, KNOWN, UNCHANGED, CHANGED
 
 ESXI_TYPE = 'ESXi'
 VXRAIL_MANAGER_TYPE = 'VIRTUAL_MACHINE'
+# Hosts per fingerprint request, and fingerprint requests running at the same time
+FINGERPRINT_CHUNK_SIZE = 16
+MAX_CONCURRENT_CHUNKS = 4
 
 class HostsAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None, thumbprint_store=None):
+        self.utils = utils if utils is not None else Utils(args)
+        self.thumbprint_store = thumbprint_store if thumbprint_store is not None else ThumbprintStore()
         self.password_map = {}
 
-    def main_func(self, hosts_fqdn):
+    def main_func(self, hosts_fqdn, answers=None):
         three_line_separator = ['', '', '']
         self.utils.printCyan("Below hosts are discovered. Enter the password for them:")
         hostls = []
@@ -22,6 +29,11 @@ class HostsAutomator:
             hostls.append(element['hostName'])
 
         print(*three_line_separator, sep='\n')
+        if answers:
+            hostls = self.__apply_answers(hostls, answers)
+            if not hostls:
+                return
+            self.utils.printYellow("** No password in the answer file for: {}".format(', '.join(hostls)))
 
         self.utils.printCyan("Please choose password option:")
         self.utils.printBold("1) Input one password that is applicable to all the hosts (default)")
@@ -49,6 +61,17 @@ class HostsAutomator:
             print(*three_line_separator, sep='\n')
 
 
+    def __apply_answers(self, hostls, answers):
+        # Per host password wins over the common one, returns the hosts that are still missing a password
+        missing = []
+        for hnm in hostls:
+            pwd = answers.secret('passwords', hnm) or answers.secret('password')
+            if pwd:
+                self.password_map[hnm] = pwd
+            else:
+                missing.append(hnm)
+        return missing
+
     def __valid_option(self, inputstr, choices):
         choice = str(inputstr).strip().lower()
         if choice in choices:
@@ -65,44 +88,80 @@ class HostsAutomator:
             else:
                 return thepwd
 
-    def get_ssh_thumbprints(self, hostsSpec, domain_id, vxrm_fqdn, vxrm_admin_username, vxrm_admin_password):
-        post_url = 'http://localhost/domainmanager/vxrail/hosts/unmananged/fingerprint'
-        payload = {
-            "sshFingerprints": [],
-            "domainId": domain_id
-        }
+    def get_ssh_thumbprints(self, hostsSpec, domain_id, vxrm_fqdn, vxrm_admin_username, vxrm_admin_password,
+                            accept_thumbprints=False, refresh=False):
+        entries = []
         for host in hostsSpec:
-            payload['sshFingerprints'].append(
+            entries.append(
                 {'fqdn': host['hostName'], 'userName': 'root', 'password': self.password_map[host['hostName']],
                  'type': ESXI_TYPE})
-
-        payload['sshFingerprints'].append(
+        entries.append(
             {'fqdn': vxrm_fqdn, 'userName': vxrm_admin_username, 'password': vxrm_admin_password,
              'type': VXRAIL_MANAGER_TYPE})
+        types = {entry['fqdn']: entry['type'] for entry in entries}
 
-        response = self.utils.post_request(payload, post_url)
-
-        get_url = 'http://localhost/domainmanager/vxrail/hosts/requests/' + response['id']
-        thumbprints_response = self.utils.get_poll_request(get_url, 'COMPLETED')
+        # Fingerprints confirmed in an earlier run are not fetched again, unless refresh asks to compare them
+        known = {} if refresh else {entry['fqdn']: self.thumbprint_store.get(entry['fqdn']) for entry in entries
+                                    if self.thumbprint_store.get(entry['fqdn'])}
+        fetched = self.fetch_thumbprints([entry for entry in entries if entry['fqdn'] not in known], domain_id)
+        statuses = dict({fqdn: KNOWN for fqdn in known}, **self.thumbprint_store.classify(fetched))
 
         fqdn_to_thumbprint_dict = {}
-        for thumbprint_response in thumbprints_response['sshFingerprints']:
-            fqdn_to_thumbprint_dict[thumbprint_response['id']] = thumbprint_response['fingerPrint']
+        for entry in entries:
+            fqdn_to_thumbprint_dict[entry['fqdn']] = known.get(entry['fqdn']) or fetched.get(entry['fqdn'])
 
-        self.display_and_confirm_ssh_thumbprints(fqdn_to_thumbprint_dict, vxrm_fqdn)
+        self.display_and_confirm_ssh_thumbprints(fqdn_to_thumbprint_dict, types, statuses, accept_thumbprints)
+        self.thumbprint_store.trust(fetched, types)
 
         return fqdn_to_thumbprint_dict
 
-    def display_and_confirm_ssh_thumbprints(self, fqdn_to_thumbprint_dict, vxrm_fqdn):
+    def fetch_thumbprints(self, entries, domain_id):
+        # One fingerprint request per chunk of hosts, MAX_CONCURRENT_CHUNKS of them in flight at a time
+        if not entries:
+            return {}
+        chunks = [entries[idx:idx + FINGERPRINT_CHUNK_SIZE] for idx in range(0, len(entries), FINGERPRINT_CHUNK_SIZE)]
+        responses = self.utils.run(self.__fetch_chunks(chunks, domain_id))
+        fqdn_to_thumbprint_dict = {}
+        for thumbprints_response in responses:
+            for thumbprint_response in thumbprints_response['sshFingerprints']:
+                fqdn_to_thumbprint_dict[thumbprint_response['id']] = thumbprint_response['fingerPrint']
+        return fqdn_to_thumbprint_dict
+
+    async def __fetch_chunks(self, chunks, domain_id):
+        post_url = self.utils.url('/domainmanager/vxrail/hosts/unmananged/fingerprint', secure=False)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+        async def fetch(chunk):
+            async with semaphore:
+                response = await self.utils.client.post({"sshFingerprints": chunk, "domainId": domain_id}, post_url)
+                get_url = self.utils.url('/domainmanager/vxrail/hosts/requests/' + response['id'], secure=False)
+                return await self.utils.client.get_poll_request(get_url, 'COMPLETED')
+        return await asyncio.gather(*[fetch(chunk) for chunk in chunks])
+
+    def display_and_confirm_ssh_thumbprints(self, fqdn_to_thumbprint_dict, types, statuses, accept_thumbprints=False):
+        # Only new and changed fingerprints are listed, the ones confirmed before are counted
+        trusted = [fqdn for fqdn in fqdn_to_thumbprint_dict if statuses.get(fqdn) in [KNOWN, UNCHANGED]]
+        if trusted:
+            self.utils.printGreen('{} fingerprints match the ones confirmed before'.format(len(trusted)))
+        unconfirmed = [fqdn for fqdn in fqdn_to_thumbprint_dict if fqdn not in trusted]
+        if not unconfirmed:
+            return
+        changed = [fqdn for fqdn in unconfirmed if statuses.get(fqdn) == CHANGED]
         self.utils.printCyan('Please confirm SSH Thumbprint of Hosts and VxRail Manager:')
         self.utils.printBold('-----------FQDN--------------------------Fingerprint------------------------------Type------------')
         self.utils.printBold('--------------------------------------------------------------------------------------------------')
-        for fqdn_to_thumbprint in fqdn_to_thumbprint_dict:
-            if fqdn_to_thumbprint == vxrm_fqdn:
-                type = VXRAIL_MANAGER_TYPE
+        for fqdn in unconfirmed:
+            line = '{} : {} : {}'.format(fqdn, fqdn_to_thumbprint_dict[fqdn], types[fqdn])
+            if fqdn in changed:
+                self.utils.printRed('{} : CHANGED, was {}'.format(line, self.thumbprint_store.get(fqdn)))
             else:
-                type = ESXI_TYPE
-            self.utils.printBold('{} : {} : {}'.format(fqdn_to_thumbprint, fqdn_to_thumbprint_dict[fqdn_to_thumbprint], type))
+                self.utils.printBold(line)
+        if accept_thumbprints and not changed:
+            self.utils.printGreen('Fingerprints accepted by the answer file')
+            return
+        if changed:
+            self.utils.printRed('** Fingerprints of {} changed since they were confirmed, the answer file can\'t '
+                                'accept them'.format(', '.join(changed)))
         selected_option = input("\033[1m Enter your choice ('yes' or 'no') : \033[0m")
         if selected_option.lower() == 'no':
             self.utils.printRed('Fingerprints are not confirmed so exiting...')
@@ -125,7 +184,7 @@ class HostsAutomator:
             hostSpec['sshThumbprint'] = fqdn_to_thumbprint_dict.get(element['hostName'])
             if not isExistingDvs:
                 hostSpec['hostNetworkSpec']= {
-                    "vmNics": vmNics
+                    "vmNics": host_vmnics(vmNics, element['hostName'])
                 }
             temp_hosts_spec.append(hostSpec)
         return temp_hosts_spec
\ No newline at end of file
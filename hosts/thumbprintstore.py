@@ -0,0 +1,67 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Known SSH fingerprints of the hosts and VxRail Managers, confirmed by the operator in earlier runs
+
+__author__ = 'jradhakrishna'
+
+import json
+import os
+import threading
+import time
+from Utils.journal import write_atomically
+
+DEFAULT_THUMBPRINTS_FILE = os.path.join(os.path.expanduser('~'), '.vxrail-workload-automator',
+                                        'known_thumbprints.json')
+STORE_VERSION = 1
+KNOWN, UNCHANGED, NEW, CHANGED = 'known', 'unchanged', 'new', 'changed'
+
+# Imports of a batch share the file, their saves must not interleave
+save_lock = threading.Lock()
+
+
+class ThumbprintStore:
+    # {fqdn: {"fingerPrint": ..., "type": ..., "confirmed": ...}}, a store without a path remembers nothing
+    def __init__(self, path=None):
+        self.path = path
+        self.thumbprints = self.__read() if path else {}
+
+    def get(self, fqdn):
+        entry = self.thumbprints.get(fqdn)
+        return entry['fingerPrint'] if entry else None
+
+    def classify(self, fetched):
+        # {fqdn: status} of freshly fetched fingerprints compared to the known ones
+        statuses = {}
+        for fqdn, thumbprint in fetched.items():
+            known = self.get(fqdn)
+            statuses[fqdn] = NEW if known is None else UNCHANGED if known == thumbprint else CHANGED
+        return statuses
+
+    def trust(self, thumbprints, types):
+        # Remembers confirmed fingerprints, merged with what other runs saved in the meantime
+        confirmed = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        entries = {fqdn: {"fingerPrint": thumbprint, "type": types.get(fqdn), "confirmed": confirmed}
+                   for fqdn, thumbprint in thumbprints.items()}
+        self.thumbprints.update(entries)
+        if not self.path:
+            return
+        with save_lock:
+            stored = self.__read()
+            stored.update(entries)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+                write_atomically(self.path, {"version": STORE_VERSION, "thumbprints": stored}, 0o600)
+            except OSError as e:
+                print('\033[93m Unable to save the known thumbprints to {}: {}\033[00m'.format(self.path, e))
+
+    def __read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as store_file:
+                store = json.load(store_file)
+        except (OSError, ValueError) as e:
+            print('\033[93m Ignoring unreadable known thumbprints {}: {}\033[00m'.format(self.path, e))
+            return {}
+        if store.get('version') != STORE_VERSION:
+            return {}
+        return store.get('thumbprints', {})
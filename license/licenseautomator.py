@@ -3,14 +3,16 @@
 __author__ = 'jradhakrishna'
 
 from Utils.utils import Utils
+from answers.answerfile import AnswerFile
 
 class LicenseAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None):
+        self.utils = utils if utils is not None else Utils(args)
         self.description = "Select license"
         self.hostname = args[0]
 
-    def main_func(self, ignoreVsanLicense):
+    def main_func(self, ignoreVsanLicense, answers=None):
+        answers = answers if answers is not None else AnswerFile()
         lcs = self.__get_licenses()
         selected = {}
         three_line_separator = ['', '', '']
@@ -19,6 +21,12 @@ class LicenseAutomator:
             if k == "VSAN" and ignoreVsanLicense :
                 continue
             lcsls = lcs[k]
+            answered = answers.get(k)
+            if answered is not None:
+                if answered in [onelcs["key"] for onelcs in lcsls]:
+                    selected[k] = answered
+                    continue
+                self.utils.printYellow("** {} license from the answer file is not available".format(k))
             self.utils.printCyan("Please choose a {} license:".format(k))
             ct = 0
             lcsmap = {}
@@ -33,10 +41,15 @@ class LicenseAutomator:
     def __output_license_info(self, licenseobj):
         return "{} ({})".format(licenseobj["key"], licenseobj["validity"])
 
+    def prefetch(self):
+        self.utils.prefetch_get(self.__licenses_url())
+
+    def __licenses_url(self):
+        return self.utils.url('/v1/license-keys?productType=VSAN,NSXT')
+
     def __get_licenses(self):
         self.utils.printGreen("Getting license information...")
-        url = 'https://'+self.hostname+'/v1/license-keys?productType=VSAN,NSXT'
-        response = self.utils.get_request(url)
+        response = self.utils.get_request(self.__licenses_url())
         vsankeys = [{"key":ele["key"], "validity":ele["licenseKeyValidity"]["licenseKeyStatus"]} for ele in response["elements"] if ele["productType"] == "VSAN"]
         nsxtkeys = [{"key":ele["key"], "validity":ele["licenseKeyValidity"]["licenseKeyStatus"]} for ele in response["elements"] if ele["productType"] == "NSXT"]
         return {"VSAN":vsankeys, "NSX-T": nsxtkeys}
@@ -0,0 +1,111 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Checks the subnets of a new static IP pool against each other and the existing pools
+
+__author__ = 'jradhakrishna'
+
+import bisect
+import ipaddress
+
+
+class IpPoolPlanner:
+    # Subnets are kept as a sorted index of disjoint [first, last] address intervals. Existing pools are merged
+    # into it up front, every accepted subnet is inserted, so checking a new subnet is a binary search.
+    def __init__(self, existing_pools=(), required_ips=0):
+        self.required_ips = required_ips
+        self.starts = []
+        self.intervals = []
+        self.subnets = []
+        intervals = []
+        for pool in existing_pools:
+            for kind in ['staticSubnets', 'blockSubnets']:
+                for subnet in pool.get(kind) or []:
+                    network = ipaddress.IPv4Network(subnet['cidr'], strict=False)
+                    intervals.append([int(network[0]), int(network[-1]),
+                                      ['{} of pool {}'.format(network, pool.get('name'))]])
+        for interval in sorted(intervals):
+            if self.intervals and interval[0] <= self.intervals[-1][1]:
+                self.intervals[-1][1] = max(self.intervals[-1][1], interval[1])
+                self.intervals[-1][2].extend(interval[2])
+            else:
+                self.starts.append(interval[0])
+                self.intervals.append(interval)
+
+    def check_subnet(self, cidr, gateway, ip_ranges):
+        # Problems of the subnet, ip_ranges as [(start, end)], an empty list means it can be added
+        errors = []
+        try:
+            network = ipaddress.IPv4Network(cidr, strict=False)
+            gateway_ip = ipaddress.IPv4Address(gateway)
+            ranges = [(ipaddress.IPv4Address(start.strip()), ipaddress.IPv4Address(end.strip()))
+                      for start, end in ip_ranges]
+        except ValueError as e:
+            return [str(e)]
+        if str(network) != cidr.strip():
+            errors.append('CIDR {} has host bits set, did you mean {}?'.format(cidr, network))
+        first, last = int(network[0]), int(network[-1])
+        for label in self.__conflicts(first, last):
+            errors.append('Subnet {} overlaps {}'.format(network, label))
+        # Network and broadcast addresses are not usable on subnets that have them
+        usable = (first + 1, last - 1) if network.prefixlen < 31 else (first, last)
+        if not usable[0] <= int(gateway_ip) <= usable[1]:
+            errors.append('Gateway {} is not a usable address of {}'.format(gateway_ip, network))
+        previous = None
+        for start, end in sorted(ranges):
+            if start > end:
+                errors.append('IP range {}-{} starts after it ends'.format(start, end))
+                continue
+            if not (usable[0] <= int(start) and int(end) <= usable[1]):
+                errors.append('IP range {}-{} is not within the usable addresses of {}'.format(start, end, network))
+            if start <= gateway_ip <= end:
+                errors.append('IP range {}-{} contains the gateway {}'.format(start, end, gateway_ip))
+            if previous is not None and start <= previous[1]:
+                errors.append('IP range {}-{} overlaps {}-{}'.format(start, end, previous[0], previous[1]))
+            previous = (start, end) if previous is None or end > previous[1] else previous
+        return errors
+
+    def add_subnet(self, cidr, gateway, ip_ranges):
+        # Adds the subnet when it has no problems, returns the problems
+        errors = self.check_subnet(cidr, gateway, ip_ranges)
+        if errors:
+            return errors
+        network = ipaddress.IPv4Network(cidr, strict=False)
+        idx = bisect.bisect_left(self.starts, int(network[0]))
+        self.starts.insert(idx, int(network[0]))
+        self.intervals.insert(idx, [int(network[0]), int(network[-1]), ['new subnet {}'.format(network)]])
+        self.subnets.append({
+            "ipAddressPoolRanges": [{"start": start.strip(), "end": end.strip()} for start, end in ip_ranges],
+            "cidr": str(network),
+            "gateway": gateway
+        })
+        return []
+
+    def capacity(self):
+        return sum(int(ipaddress.IPv4Address(one_range['end'])) - int(ipaddress.IPv4Address(one_range['start'])) + 1
+                   for subnet in self.subnets for one_range in subnet['ipAddressPoolRanges'])
+
+    def check_capacity(self):
+        if self.capacity() < self.required_ips:
+            return ['The pool has {} addresses, {} TEP IPs are needed'.format(self.capacity(), self.required_ips)]
+        return []
+
+    def __conflicts(self, first, last):
+        # Intervals are disjoint, so walking back from the last one starting before `last` stops at the first
+        # interval that ends before `first`
+        idx = bisect.bisect_right(self.starts, last) - 1
+        labels = []
+        while idx >= 0 and self.intervals[idx][1] >= first:
+            labels = self.intervals[idx][2] + labels
+            idx -= 1
+        return labels
+
+
+def parse_ip_ranges(inputstr):
+    # "a-b, c-d" or a list of "a-b" into [(a, b), (c, d)]
+    items = inputstr.split(',') if isinstance(inputstr, str) else inputstr
+    ranges = []
+    for item in items:
+        parts = item.strip().split('-')
+        if len(parts) != 2:
+            raise ValueError('IP range {} is not in the form start-end'.format(item.strip()))
+        ranges.append((parts[0].strip(), parts[1].strip()))
+    return ranges
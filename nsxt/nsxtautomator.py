@@ -2,24 +2,28 @@
 
 __author__ = 'jradhakrishna'
 
-import ipaddress
 import time
 import re
 from Utils.utils import Utils
-import subprocess
+from answers.answerfile import AnswerFile
+from validation.payloadvalidator import GENEVE_VLAN_MIN, GENEVE_VLAN_MAX
+from nsxt.ippoolplanner import IpPoolPlanner, parse_ip_ranges
+from nsxt.tepallocator import rank_pools
 import sys
 import getpass
 
 
 class NSXTAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None):
+        self.utils = utils if utils is not None else Utils(args)
         self.description = "NSX-T instance deployment"
         self.hostname = args[0]
 
     # If current handling domain is management domain, is_primary must be False
-    def main_func(self, selected_domain_id, is_primary=True, is_3x_4x_migration_env=False):
+    def main_func(self, selected_domain_id, is_primary=True, is_3x_4x_migration_env=False, answers=None,
+                  tep_ip_count=0, tep_ip_count_exact=True):
         three_line_separator = ['', '', '']
+        answers = answers if answers is not None else AnswerFile()
         nsxt_instances = self.__get_nsxt_instances(selected_domain_id, is_primary)
         if is_primary:
             if len(nsxt_instances) > 0:
@@ -27,7 +31,8 @@ class NSXTAutomator:
                 self.utils.printBold("1) Create new NSX-T instance (default)")
                 self.utils.printBold("2) Use existing NSX-T instance")
                 theoption = self.utils.valid_input("\033[1m Enter your choice(number): \033[0m", "1",
-                                                   self.__valid_option, ["1", "2"])
+                                                   self.__valid_option, ["1", "2"],
+                                                   answer={"new": "1", "existing": "2"}.get(answers.get('mode')))
             else:
                 self.utils.printYellow("** No shared NSX-T instance was found, you need to create a new one")
                 theoption = "1"
@@ -43,9 +48,10 @@ class NSXTAutomator:
         print(*three_line_separator, sep='\n')
 
         if theoption == "1":
-            return self.option1_new_nsxt_instance(is_3x_4x_migration_env)
+            return self.option1_new_nsxt_instance(is_3x_4x_migration_env, answers, tep_ip_count, tep_ip_count_exact)
 
-        return self.option2_existing_nsxt(nsxt_instances, is_3x_4x_migration_env)
+        return self.option2_existing_nsxt(nsxt_instances, is_3x_4x_migration_env, answers, tep_ip_count,
+                                          tep_ip_count_exact)
 
     """
         In case of secondary cluster, the NSX-T cluster has to be the same as that of the primary cluster.
@@ -57,9 +63,19 @@ class NSXTAutomator:
         The management NSX-T cluster is dedicated to management domain and will have the isShareable property set to FALSE.
     """
 
+    def prefetch(self):
+        self.utils.prefetch_get(self.utils.url('/v1/nsxt-clusters'), self.__prefetch_static_ip_pools)
+
+    def __prefetch_static_ip_pools(self, response):
+        for oneins in response["elements"]:
+            self.utils.prefetch_get(self.__static_ip_pool_url(oneins["id"]))
+
+    def __static_ip_pool_url(self, nsxt_cluster_id):
+        return self.utils.url('/v1/nsxt-clusters/' + nsxt_cluster_id + '/ip-address-pools')
+
     def __get_nsxt_instances(self, selected_domain_id, is_primary=True):
         self.utils.printGreen("Getting shared NSX-T cluster information...")
-        url = 'https://' + self.hostname + '/v1/nsxt-clusters'
+        url = self.utils.url('/v1/nsxt-clusters')
         response = self.utils.get_request(url)
         nsxinstances = []
         for oneins in response["elements"]:
@@ -73,85 +89,107 @@ class NSXTAutomator:
 
     def __get_static_ip_pool(self, nsxt_cluster_id):
         self.utils.printGreen("Getting Static IP Pool information...")
-        url = 'https://' + self.hostname + '/v1/nsxt-clusters/' + nsxt_cluster_id + '/ip-address-pools'
+        url = self.__static_ip_pool_url(nsxt_cluster_id)
         response = self.utils.get_request(url)
         ip_address_pools = []
         for element in response['elements']:
             ip_address_pools.append(element)
         return ip_address_pools
 
-    def __generate_ip_address_pool_ranges(self, inputstr):
-        ip_ranges = [x.strip() for x in inputstr.split(',')]
-        res = []
-        for ip_range in ip_ranges:
-            ips = ip_range.split('-')
-            res.append({"start": ips[0], "end": ips[1]})
-        return res
-
-    def check_overlap_subnets(self, cidrs, input_cidr):
-        if cidrs:
-            for c in cidrs:
-                if ipaddress.IPv4Network(input_cidr).overlaps(ipaddress.IPv4Network(c)):
-                    self.utils.printRed(
-                        'Overlapping subnet {} with {}. Please enter valid subnet details...'.format(input_cidr, c))
-                    return True
-        return False
-
-    def input_subnet(self, subnets, cidrs, count):
+    def input_subnets(self, planner):
         three_line_separator = ['', '', '']
-        print(*three_line_separator, sep='\n')
-        self.utils.printCyan("Subnet #{}".format(count))
-        cidr = self.utils.valid_input("\033[1m Enter CIDR: \033[0m", None, self.__valid_cidr)
-        self.utils.printYellow("** Multiple IP Ranges are supported by comma separated")
-        ip_ranges = self.utils.valid_input("\033[1m Enter IP Range: \033[0m", None, self.__valid_ip_ranges)
-        gateway_ip = self.utils.valid_input("\033[1m Enter Gateway IP: \033[0m", None, self.__valid_ip)
-
-        if self.check_overlap_subnets(cidrs, cidr):
-            self.input_subnet(subnets, cidrs, count)
-        else:
-            cidrs.append(cidr)
-            subnet = {
-                "ipAddressPoolRanges": self.__generate_ip_address_pool_ranges(ip_ranges),
-                "cidr": cidr,
-                "gateway": gateway_ip
-            }
-            subnets.append(subnet)
+        count = 1
+        while True:
+            print(*three_line_separator, sep='\n')
+            self.utils.printCyan("Subnet #{}".format(count))
+            cidr = self.utils.valid_input("\033[1m Enter CIDR: \033[0m", None, self.__valid_cidr)
+            self.utils.printYellow("** Multiple IP Ranges are supported by comma separated")
+            ip_ranges = self.utils.valid_input("\033[1m Enter IP Range: \033[0m", None, self.__valid_ip_ranges)
+            gateway_ip = self.utils.valid_input("\033[1m Enter Gateway IP: \033[0m", None, self.__valid_ip)
+
+            errors = planner.add_subnet(cidr, gateway_ip, parse_ip_ranges(ip_ranges))
+            if errors:
+                for error in errors:
+                    self.utils.printRed(error)
+                self.utils.printRed('Please enter valid subnet details...')
+                continue
+            count += 1
             print(*three_line_separator, sep='\n')
+            shortfall = planner.check_capacity()
+            if shortfall:
+                self.utils.printYellow('** {}, please add another subnet'.format(shortfall[0]))
+                continue
             select_option = input("\033[1m Do you want to add another subnet ? (Enter 'yes' or 'no'): \033[0m")
-            if select_option.lower() == 'yes':
-                self.input_subnet(subnets, cidrs, count + 1)
-            return subnets
+            if select_option.lower() != 'yes':
+                return planner.subnets
 
-    def create_static_ip_pool(self):
+    def create_static_ip_pool(self, answers=None, existing_pools=(), tep_ip_count=0, tep_ip_count_exact=True):
+        answers = answers if answers is not None else AnswerFile()
         self.utils.printCyan("Create New Static IP Pool")
+        if not tep_ip_count_exact:
+            # The size of the pool is only checked against a TEP count that is known
+            self.utils.printYellow("** About {} TEP IPs are needed, an estimate as the uplinks of the overlay port "
+                                   "group are not known".format(tep_ip_count))
+            tep_ip_count = 0
+        pool_name = answers.get('name')
         while True:
-            pool_name = input("\033[1m Enter Pool Name: \033[0m")
+            if pool_name is None:
+                pool_name = input("\033[1m Enter Pool Name: \033[0m")
             reg = "^[a-zA-Z0-9-_]+$"
             match_re = re.compile(reg)
             result = re.search(match_re, pool_name)
             if not result:
                 self.utils.printRed("Invalid IP pool address name. The IP address pool name should contain only "
                                     "alphanumeric characters along with '-' or '_' without spaces")
+                pool_name = None
             else:
                 break
-        description = input("\033[1m Enter Description(Optional): \033[0m")
+        description = answers.get('description')
+        if description is None and not answers:
+            description = input("\033[1m Enter Description(Optional): \033[0m")
+        # New subnets must not overlap the subnets of the existing pools and must have a TEP IP for every uplink
+        subnets = self.__answered_subnets(answers.get('subnets'), IpPoolPlanner(existing_pools, tep_ip_count))
         ip_address_pool_spec = {
             "name": pool_name,
-            "subnets": self.input_subnet([], [], count=1)
+            "subnets": subnets if subnets else self.input_subnets(IpPoolPlanner(existing_pools, tep_ip_count))
         }
         if description:
             ip_address_pool_spec.update({"description": description})
         return ip_address_pool_spec
 
+    def __answered_subnets(self, answered, planner):
+        # Subnets of a new pool given by the answer file, None when missing or not valid
+        if not answered:
+            return None
+        errors = []
+        for onesubnet in answered:
+            ip_ranges = ', '.join(onesubnet.get('ipRanges', []))
+            if not (self.__valid_cidr(onesubnet.get('cidr', '')) and self.__valid_ip_ranges(ip_ranges)
+                    and self.__valid_ip(onesubnet.get('gateway', ''))):
+                self.utils.printRed("Static IP pool subnets from the answer file are not valid")
+                return None
+            errors.extend(planner.add_subnet(onesubnet['cidr'], onesubnet['gateway'], parse_ip_ranges(ip_ranges)))
+        if not errors:
+            errors.extend(planner.check_capacity())
+        if errors:
+            self.utils.printRed("Static IP pool subnets from the answer file are not valid:")
+            for error in errors:
+                self.utils.printRed("  " + error)
+            return None
+        return planner.subnets
+
     def __prepare_ip_address_pool(self, ip_address_pool):
         ip_address_pool_spec = {
             "name": ip_address_pool['name']
         }
         return ip_address_pool_spec
 
-    def option2_existing_nsxt(self, nsxt_instances, is_3x_4x_migration_env=False):
+    def option2_existing_nsxt(self, nsxt_instances, is_3x_4x_migration_env=False, answers=None, tep_ip_count=0,
+                              tep_ip_count_exact=True):
         three_line_separator = ['', '', '']
-        geneve_vlan = self.utils.valid_input("\033[1m Enter Geneve vLAN ID (0-4096): \033[0m ", None, self.__valid_vlan)
+        answers = answers if answers is not None else AnswerFile()
+        geneve_vlan = self.utils.valid_input("\033[1m Enter Geneve vLAN ID (0-4094): \033[0m ", None, self.__valid_vlan,
+                                             answer=answers.get('geneveVlanId'))
         print(*three_line_separator, sep='\n')
 
         self.utils.printCyan("Please select one NSX-T instance")
@@ -163,8 +201,9 @@ class NSXTAutomator:
             nsxt_map[idx] = nsxt_inst
             self.utils.printBold("{0}) NSX-T vip: {1}".format(idx, nsxt_inst["vipFqdn"]))
 
+        answered_idx = [idx for idx in nsxt_map if nsxt_map[idx]["vipFqdn"] == answers.get('vipFqdn')]
         choiceidx = self.utils.valid_input("\033[1m Enter your choice(number): \033[0m", None, self.__valid_option,
-                                           nsxt_map.keys())
+                                           nsxt_map.keys(), answer=answered_idx[0] if answered_idx else None)
         selected_ins = nsxt_map[choiceidx]
 
         print(*three_line_separator, sep='\n')
@@ -174,7 +213,8 @@ class NSXTAutomator:
             self.utils.printBold("1) DHCP (default)")
             self.utils.printBold("2) Static IP Pool")
             selected_option = self.utils.valid_input("\033[1m Enter your choice(number): \033[0m", "1", self.__valid_option,
-                                                    ["1", "2"])
+                                                    ["1", "2"],
+                                                    answer={"dhcp": "1", "static": "2"}.get(answers.get('tepIpAllocation')))
         print(*three_line_separator, sep='\n')
 
         ip_address_pool_spec = None
@@ -182,13 +222,18 @@ class NSXTAutomator:
             self.utils.printCyan("Select the option for Static IP Pool:")
             self.utils.printBold("1) Create New Static IP Pool(default)")
             self.utils.printBold("2) Re-use an Existing Static Pool")
+            pool_answers = answers.section('ipAddressPool')
             static_ip_pool_option = self.utils.valid_input("\033[1m Enter your choice(number): \033[0m", "1",
                                                            self.__valid_option,
-                                                           ["1", "2"])
+                                                           ["1", "2"],
+                                                           answer=("1" if pool_answers.get('subnets') else "2")
+                                                           if pool_answers else None)
             print(*three_line_separator, sep='\n')
 
             if static_ip_pool_option == "1":
-                ip_address_pool_spec = self.create_static_ip_pool()
+                ip_address_pool_spec = self.create_static_ip_pool(pool_answers,
+                                                                  self.__get_static_ip_pool(selected_ins["id"]),
+                                                                  tep_ip_count, tep_ip_count_exact)
             elif static_ip_pool_option == "2":
                 ip_address_pools = self.__get_static_ip_pool(selected_ins["id"])
                 print(*three_line_separator, sep='\n')
@@ -196,12 +241,15 @@ class NSXTAutomator:
                     self.utils.printRed("No existing Static IP Pools are getting discovered...")
                     input("\033[1m Enter to exit ...\033[0m")
                     sys.exit(1)
-                self.utils.printCyan("Please select one static ip pool:")
+                self.utils.printCyan("Please select one static ip pool, best fit for {} TEP IPs first:".format(tep_ip_count)
+                                     if tep_ip_count else "Please select one static ip pool:")
                 self.utils.printBold("-----Pool Name-------------------Subnets---------------------------Available IPs--")
                 self.utils.printBold("----------------------------------------------------------------------------------")
                 count = 0
                 ip_pool_map = {}
-                for ip_address_pool in ip_address_pools:
+                allocator_map = {}
+                for allocator in rank_pools(ip_address_pools, tep_ip_count):
+                    ip_address_pool = allocator.pool
                     count += 1
                     pool_name = '{}) {} : '.format(count, ip_address_pool['name'])
                     self.utils.printBold(
@@ -221,11 +269,29 @@ class NSXTAutomator:
                         for block_subnet in ip_address_pool['blockSubnets']:
                             print("\033[36m  {} {} : {}".format(len(pool_name) * ' ', block_subnet['cidr'],
                                                                      block_subnet['size']))
+                    for line in allocator.describe(tep_ip_count):
+                        print("\033[36m  {} {}\033[00m".format(len(pool_name) * ' ', line))
                     ip_pool_map[str(count)] = self.__prepare_ip_address_pool(ip_address_pool)
+                    allocator_map[str(count)] = allocator
                     print('\n')
-                choice = self.utils.valid_input("\033[0;1m Enter your choice(number): \033[0m", None,
-                                                self.__valid_option,
-                                                ip_pool_map.keys())
+                if not allocator_map["1"].fits(tep_ip_count) and tep_ip_count_exact:
+                    self.utils.printRed("None of the existing Static IP Pools has {} free TEP IPs, the largest is short "
+                                        "by {}, create a new one or extend a pool"
+                                        .format(tep_ip_count, tep_ip_count - allocator_map["1"].free))
+                    if not answers:
+                        input("\033[1m Enter to exit ...\033[0m")
+                    sys.exit(1)
+                elif not allocator_map["1"].fits(tep_ip_count):
+                    self.utils.printYellow("** None of the existing Static IP Pools has the estimated {} free TEP IPs"
+                                           .format(tep_ip_count))
+                answered_idx = [idx for idx in ip_pool_map if ip_pool_map[idx]["name"] == pool_answers.get('name')]
+                if answered_idx and not self.__pool_fits(allocator_map[answered_idx[0]], tep_ip_count,
+                                                         tep_ip_count_exact, False):
+                    # Running headless, the answered pool is too small
+                    sys.exit(1)
+                choice = self.utils.valid_input("\033[0;1m Enter your choice(number, default 1): \033[0m", "1",
+                                                self.__valid_pool, (allocator_map, tep_ip_count, tep_ip_count_exact),
+                                                answer=answered_idx[0] if answered_idx else None)
                 ip_address_pool_spec = ip_pool_map[choice]
             print(*three_line_separator, sep='\n')
         nsxTSpec = {
@@ -250,30 +316,37 @@ class NSXTAutomator:
 
         return {"nsxTSpec": nsxTSpec, "geneve_vlan": geneve_vlan}
 
-    def option1_new_nsxt_instance(self, is_3x_4x_migration_env=False):
+    def option1_new_nsxt_instance(self, is_3x_4x_migration_env=False, answers=None, tep_ip_count=0,
+                                  tep_ip_count_exact=True):
         three_line_separator = ['', '', '']
-        geneve_vlan = self.utils.valid_input("\033[1m Enter Geneve vLAN ID (0-4096): \033[0m", None, self.__valid_vlan)
-        admin_password = self.__handle_password_input()
+        answers = answers if answers is not None else AnswerFile()
+        managers = answers.get('managers', default=[]) + [None] * 3
+        # Resolve the answered FQDNs together, validating them below only hits the resolver cache
+        self.utils.resolver.resolve_all([answers.get('vipFqdn')] + managers[:3])
+        geneve_vlan = self.utils.valid_input("\033[1m Enter Geneve vLAN ID (0-4094): \033[0m", None, self.__valid_vlan,
+                                             answer=answers.get('geneveVlanId'))
+        admin_password = answers.secret('adminPassword') or self.__handle_password_input()
         print(*three_line_separator, sep='\n')
 
         self.utils.printCyan("Please Enter NSX-T VIP details")
         nsxt_vip_fqdn = self.utils.valid_input("\033[1m FQDN (IP address will be fetched from DNS): \033[0m", None,
-                                               self.__valid_fqdn)
-        nsxt_gateway = self.utils.valid_input("\033[1m Gateway IP address: \033[0m", None, self.__valid_ip)
+                                               self.__valid_fqdn, answer=answers.get('vipFqdn'))
+        nsxt_gateway = self.utils.valid_input("\033[1m Gateway IP address: \033[0m", None, self.__valid_ip,
+                                              answer=answers.get('gateway'))
         nsxt_netmask = self.utils.valid_input("\033[1m Subnet mask (255.255.255.0): \033[0m", "255.255.255.0",
-                                              self.__valid_ip)
+                                              self.__valid_ip, answer=answers.get('netmask'))
         print(*three_line_separator, sep='\n')
 
         nsxt_1_fqdn = self.utils.valid_input("\033[1m Enter FQDN for 1st NSX-T Manager: \033[0m",
-                                             None, self.__valid_fqdn)
+                                             None, self.__valid_fqdn, answer=managers[0])
         print(*three_line_separator, sep='\n')
 
         nsxt_2_fqdn = self.utils.valid_input("\033[1m Enter FQDN for 2nd NSX-T Manager: \033[0m",
-                                             None, self.__valid_fqdn)
+                                             None, self.__valid_fqdn, answer=managers[1])
         print(*three_line_separator, sep='\n')
 
         nsxt_3_fqdn = self.utils.valid_input("\033[1m Enter FQDN for 3rd NSX-T Manager: \033[0m",
-                                             None, self.__valid_fqdn)
+                                             None, self.__valid_fqdn, answer=managers[2])
         print(*three_line_separator, sep='\n')
         selected_option = "1"
         if not is_3x_4x_migration_env:
@@ -281,21 +354,24 @@ class NSXTAutomator:
             self.utils.printBold("1) DHCP (default)")
             self.utils.printBold("2) Static IP Pool")
             selected_option = self.utils.valid_input("\033[1m Enter your choice(number): \033[0m", "1", self.__valid_option,
-                                                    ["1", "2"])
+                                                    ["1", "2"],
+                                                    answer={"dhcp": "1", "static": "2"}.get(answers.get('tepIpAllocation')))
 
         ip_address_pool_spec = None
         if selected_option == "2":
             print(*three_line_separator, sep='\n')
-            ip_address_pool_spec = self.create_static_ip_pool()
+            ip_address_pool_spec = self.create_static_ip_pool(answers.section('ipAddressPool'), (), tep_ip_count,
+                                                              tep_ip_count_exact)
         print(*three_line_separator, sep='\n')
 
+        addresses = self.utils.resolver.resolve_all([nsxt_vip_fqdn, nsxt_1_fqdn, nsxt_2_fqdn, nsxt_3_fqdn])
         nsxTSpec = {
             "nsxManagerSpecs": [
-                self.__to_nsx_manager_obj(nsxt_1_fqdn, nsxt_gateway, nsxt_netmask),
-                self.__to_nsx_manager_obj(nsxt_2_fqdn, nsxt_gateway, nsxt_netmask),
-                self.__to_nsx_manager_obj(nsxt_3_fqdn, nsxt_gateway, nsxt_netmask)
+                self.__to_nsx_manager_obj(nsxt_1_fqdn, addresses[nsxt_1_fqdn], nsxt_gateway, nsxt_netmask),
+                self.__to_nsx_manager_obj(nsxt_2_fqdn, addresses[nsxt_2_fqdn], nsxt_gateway, nsxt_netmask),
+                self.__to_nsx_manager_obj(nsxt_3_fqdn, addresses[nsxt_3_fqdn], nsxt_gateway, nsxt_netmask)
             ],
-            "vip": self.__nslookup_ip_from_dns(nsxt_vip_fqdn),
+            "vip": addresses[nsxt_vip_fqdn],
             "vipFqdn": nsxt_vip_fqdn,
             "nsxManagerAdminPassword": admin_password
         }
@@ -305,8 +381,7 @@ class NSXTAutomator:
 
         return {"nsxTSpec": nsxTSpec, "geneve_vlan": geneve_vlan}
 
-    def __to_nsx_manager_obj(self, fqdn, gateway, netmask):
-        ip = self.__nslookup_ip_from_dns(fqdn)
+    def __to_nsx_manager_obj(self, fqdn, ip, gateway, netmask):
         return {
             "name": fqdn.split('.')[0],
             "networkDetailsSpec": {
@@ -324,16 +399,34 @@ class NSXTAutomator:
         self.utils.printYellow("**Use first choice by default")
         return list(choices)[0]
 
+    def __valid_pool(self, inputstr, ext_args):
+        allocator_map, tep_ip_count, tep_ip_count_exact = ext_args
+        allocator = allocator_map.get(str(inputstr).strip())
+        if allocator is None:
+            return False
+        return self.__pool_fits(allocator, tep_ip_count, tep_ip_count_exact, True)
+
+    def __pool_fits(self, allocator, tep_ip_count, tep_ip_count_exact, confirm):
+        # A pool too small for a known TEP count is rejected, for an estimated count the operator decides
+        if allocator.fits(tep_ip_count):
+            return True
+        if tep_ip_count_exact:
+            self.utils.printRed("Static IP Pool {} has {} free addresses, {} TEP IPs are needed, {} short"
+                                .format(allocator.name, allocator.free, tep_ip_count, tep_ip_count - allocator.free))
+            return False
+        self.utils.printYellow("** Static IP Pool {} has {} free addresses, about {} TEP IPs are needed (estimated)"
+                               .format(allocator.name, allocator.free, tep_ip_count))
+        if not confirm:
+            return True
+        return input("\033[1m Enter 'yes' to use it anyway: \033[0m").strip().lower() == 'yes'
+
     def __valid_password(self, inputstr):
         return self.utils.password_check(inputstr)
 
     def __valid_vlan(self, inputstr):
-        res = True
-        if not str(inputstr).isdigit():
-            res = False
-        res = (int(inputstr) >= 0 and int(inputstr) <= 4096)
+        res = str(inputstr).strip().isdigit() and GENEVE_VLAN_MIN <= int(inputstr) <= GENEVE_VLAN_MAX
         if not res:
-            self.utils.printRed("VLAN must be a number in between 0-4096")
+            self.utils.printRed("VLAN must be a number in between {}-{}".format(GENEVE_VLAN_MIN, GENEVE_VLAN_MAX))
         return res
 
     def __valid_fqdn(self, inputstr):
@@ -351,7 +444,7 @@ class NSXTAutomator:
             self.utils.printRed("FQDN format is not correct")
         else:
             self.utils.printGreen("Resolving IP from DNS...")
-            theip = self.__nslookup_ip_from_dns(inputstr)
+            theip = self.utils.resolver.resolve(inputstr)
             if theip is not None:
                 self.utils.printGreen("Resolved IP address: {}".format(theip))
             else:
@@ -390,27 +483,6 @@ class NSXTAutomator:
                 return res
         return True
 
-    def __nslookup_ip_from_dns(self, fqdn):
-        cmd = "nslookup {}".format(fqdn)
-        sub_popen = subprocess.Popen(cmd,
-                                     shell=True,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-        output, err = sub_popen.communicate()
-        if sub_popen.returncode > 0:
-            return None
-
-        thenext = False
-        # byte feature only supported in python 3
-        for aline in output.decode('utf8').split("\n"):
-            if thenext and str(aline).lower().startswith("address:"):
-                return aline.split(":")[-1].strip()
-            if str(aline).lower().startswith("name:"):
-                tail = aline.split(":")[-1].strip()
-                if tail == fqdn:
-                    thenext = True
-        return None
-
     def __handle_password_input(self):
         while (True):
             thepwd = getpass.getpass("\033[1m Enter Admin password: \033[0m")
@@ -0,0 +1,111 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Free address runs of the existing static IP pools and the TEP IPs an import would take from them
+
+__author__ = 'jradhakrishna'
+
+import ipaddress
+
+
+class TepAllocator:
+    # The ranges of a pool are kept as sorted, merged [first, last] runs, so a /16 costs a handful of integers.
+    # The API only reports how many addresses are available, not which ones. The free count and whether the
+    # TEPs fit come from that number; which addresses are free is an estimate assuming NSX-T hands out the
+    # lowest free address first, with the used addresses taken from the static ranges before the block subnets.
+    def __init__(self, pool):
+        self.pool = pool
+        self.name = pool.get('name')
+        runs = []
+        for subnet in pool.get('staticSubnets') or []:
+            for ip_range in subnet.get('ipAddressPoolRanges') or []:
+                runs.append([int(ipaddress.IPv4Address(ip_range['start'])),
+                             int(ipaddress.IPv4Address(ip_range['end']))])
+        self.runs = []
+        for run in sorted(runs):
+            if self.runs and run[0] <= self.runs[-1][1] + 1:
+                self.runs[-1][1] = max(self.runs[-1][1], run[1])
+            else:
+                self.runs.append(run)
+        static_total = sum(last - first + 1 for first, last in self.runs)
+        block_total = sum(int(subnet.get('size') or 0) for subnet in pool.get('blockSubnets') or [])
+        self.total = static_total + block_total
+        available = pool.get('availableIpAddresses')
+        self.free = min(int(available), self.total) if available is not None else self.total
+        self.used = self.total - self.free
+        self.free_runs = self.__skip(self.runs, min(self.used, static_total))
+        self.block_free = self.free - sum(last - first + 1 for first, last in self.free_runs)
+
+    @property
+    def largest_block(self):
+        return max([last - first + 1 for first, last in self.free_runs] or [0])
+
+    @property
+    def fragmentation(self):
+        # Estimated over the static ranges: 0 when their free addresses are one block, approaching 1 as they
+        # are spread over many small ones
+        static_free = self.free - self.block_free
+        return 1 - self.largest_block / static_free if static_free else 0
+
+    def fits(self, count):
+        return count <= self.free
+
+    def allocate(self, count):
+        # Estimated runs of the static addresses the next `count` TEPs would get and how many of them would come
+        # from the block subnets, None when the pool is too small
+        if not self.fits(count):
+            return None
+        allocated = []
+        for first, last in self.free_runs:
+            if count <= 0:
+                break
+            take = min(count, last - first + 1)
+            allocated.append([first, first + take - 1])
+            count -= take
+        return allocated, count
+
+    def describe(self, count):
+        # Utilisation and, when it fits, the estimated addresses taken by `count` TEPs as printable lines
+        lines = ['Utilisation: {}/{} used, {} free'.format(self.used, self.total, self.free)]
+        if self.free:
+            lines.append('Estimated, assuming lowest-free-first allocation: {} free block(s) in the static ranges, '
+                         'largest {}, fragmentation {:.0%}'.format(len(self.free_runs), self.largest_block,
+                                                                   self.fragmentation))
+        if not count:
+            return lines
+        allocated = self.allocate(count)
+        if allocated is None:
+            lines.append('Too small: {} TEP IPs are needed'.format(count))
+            return lines
+        runs, from_blocks = allocated
+        taken = [format_run(run) for run in runs]
+        if from_blocks:
+            taken.append('{} from the block subnets'.format(from_blocks))
+        lines.append('Fits {} TEP IPs, estimated to take: {}'.format(count, ', '.join(taken)))
+        return lines
+
+    @staticmethod
+    def __skip(runs, count):
+        free_runs = []
+        for first, last in runs:
+            if count > last - first:
+                count -= last - first + 1
+                continue
+            free_runs.append([first + count, last])
+            count = 0
+        return free_runs
+
+
+def rank_pools(pools, count):
+    # Allocators of the pools, best fit first: pools that fit by the fewest addresses left over, then the pools
+    # that don't fit by the most free addresses
+    allocators = [TepAllocator(pool) for pool in pools]
+
+    def key(allocator):
+        if allocator.fits(count):
+            return 0, allocator.free - count, allocator.name or ''
+        return 1, -allocator.free, allocator.name or ''
+    return sorted(allocators, key=key)
+
+
+def format_run(run):
+    first, last = str(ipaddress.IPv4Address(run[0])), str(ipaddress.IPv4Address(run[1]))
+    return first if first == last else '{}-{}'.format(first, last)
@@ -0,0 +1,110 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Stand-in DNS server for the DNS check, answering A and PTR queries over UDP from a fixed zone
+
+__author__ = 'jradhakrishna'
+
+import argparse
+import socket
+import struct
+import threading
+from Utils.dnsresolver import TYPE_A, TYPE_PTR, CLASS_IN, RCODE_NXDOMAIN, encode_name, read_name
+
+DEFAULT_PORT = 5353
+TTL = 60
+
+"""
+    Usage: python3 -m standin.dnsstandin --port 5353 --record esxi-1.vrack.local=10.0.0.10 \
+                                         --a esxi-2.vrack.local=10.0.0.11 --ptr 10.0.0.11=esxi-9.vrack.local
+           python3 vxrailworkloadautomator.py --nameserver 127.0.0.1:5353 ...
+
+    A --record is an A record with the PTR record pointing back to it, --a and --ptr add only one direction, so
+    mismatches can be set up on purpose. Names and addresses without a record get NXDOMAIN.
+"""
+
+
+class DnsStandin:
+    def __init__(self, port=0, records=None, a_records=None, ptr_records=None):
+        self.port = port
+        # {fqdn: address} and {address: fqdn}
+        self.a_records = {}
+        self.ptr_records = {}
+        for fqdn, address in dict(records or {}).items():
+            self.a_records[fqdn.lower()] = address
+            self.ptr_records[address] = fqdn
+        self.a_records.update({fqdn.lower(): address for fqdn, address in dict(a_records or {}).items()})
+        self.ptr_records.update(ptr_records or {})
+        self.queries = []
+        self.sock = None
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', self.port))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.__serve, daemon=True).start()
+        return self.port
+
+    def stop(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def answer(self, query):
+        ident, _, qdcount = struct.unpack('>HHH', query[:6])
+        name, offset = read_name(query, 12)
+        qtype, _ = struct.unpack('>HH', query[offset:offset + 4])
+        question = query[12:offset + 4]
+        self.queries.append((name, qtype))
+        rdata = None
+        if qtype == TYPE_A and name.lower() in self.a_records:
+            rdata = socket.inet_aton(self.a_records[name.lower()])
+        elif qtype == TYPE_PTR and name.endswith('.in-addr.arpa'):
+            address = '.'.join(reversed(name[:-len('.in-addr.arpa')].split('.')))
+            if address in self.ptr_records:
+                rdata = encode_name(self.ptr_records[address])
+        # QR and RD set, RA set, NXDOMAIN when there is no record
+        flags = 0x8180 if rdata is not None else 0x8180 | RCODE_NXDOMAIN
+        response = struct.pack('>HHHHHH', ident, flags, qdcount, 1 if rdata is not None else 0, 0, 0) + question
+        if rdata is not None:
+            # The answer's name points back at the question
+            response += struct.pack('>HHHIH', 0xc00c, qtype, CLASS_IN, TTL, len(rdata)) + rdata
+        return response
+
+    def __serve(self):
+        while self.sock is not None:
+            try:
+                query, client = self.sock.recvfrom(512)
+            except OSError:
+                return
+            try:
+                self.sock.sendto(self.answer(query), client)
+            except (IndexError, UnicodeDecodeError, struct.error):
+                continue
+
+
+def parse_pair(value):
+    # NAME=VALUE
+    try:
+        name, target = value.split('=', 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected NAME=VALUE, got {}'.format(value))
+    return name, target
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description='Stand-in DNS server for the DNS check')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--record', type=parse_pair, action='append', default=[],
+                        help='FQDN=IP, an A record and the PTR record pointing back to it; repeat for more')
+    parser.add_argument('--a', type=parse_pair, action='append', default=[], help='FQDN=IP, an A record only')
+    parser.add_argument('--ptr', type=parse_pair, action='append', default=[], help='IP=FQDN, a PTR record only')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    options = parse_options()
+    standin = DnsStandin(options.port, dict(options.record), dict(options.a), dict(options.ptr))
+    print('Stand-in DNS server listening on 127.0.0.1:{}'.format(standin.start()))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
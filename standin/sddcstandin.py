@@ -0,0 +1,381 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Stand-in SDDC Manager serving a synthetic inventory, for running the workflow without an appliance
+
+__author__ = 'jradhakrishna'
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, unquote
+
+DEFAULT_PORT = 8080
+# Polls a query, validation or task answers in progress before it completes
+DEFAULT_PROGRESS_POLLS = 1
+VCF_VERSION = '4.5.0.0-20612863'
+
+"""
+    Usage: python3 -m standin.sddcstandin --domains 2 --clusters 2 --hosts 4 --vmnics 4 --latency 0.05
+
+    and point the workflow at it with --sddc-url http://127.0.0.1:8080. Domain vi-1 has no cluster yet, so its
+    import is a primary one, the others take secondary imports. Unmanaged clusters are c1..cM of every domain with
+    hosts esxi-<n>.<cluster>.<domain>.vrack.local, vmnic0..vmnicK-1 and the system DVS sys-dvs.
+"""
+
+
+class Inventory:
+    def __init__(self, domains=2, clusters=2, hosts=4, vmnics=4, dvs=1, loopback=False):
+        self.domains = [{"id": 'd{}'.format(idx + 1), "name": 'vi-{}'.format(idx + 1),
+                         "clusters": [] if idx == 0 else [{"id": 'managed-{}'.format(idx + 1)}]}
+                        for idx in range(domains)]
+        self.clusters = ['c{}'.format(idx + 1) for idx in range(clusters)]
+        self.hosts = hosts
+        self.vmnics = vmnics
+        self.dvs = dvs
+        # Hosts on 127.0.0.0/8 and the VxRail Manager on localhost, so the SSH stand-in can play them
+        self.loopback = loopback
+
+    def domain(self, domain_id):
+        return next((domain for domain in self.domains if domain['id'] == domain_id), None)
+
+    def fqdn(self, domain_id, cluster, name):
+        return '{}.{}.{}.vrack.local'.format(name, cluster, self.domain(domain_id)['name'])
+
+    def cluster(self, domain_id, cluster):
+        hosts = [{"fqdn": self.fqdn(domain_id, cluster, 'esxi-{}'.format(idx)),
+                  "ipAddress": '{}.0.{}.{}'.format(127 if self.loopback else 10, idx // 200, 10 + idx % 200),
+                  "vmNics": [{"name": 'vmnic{}'.format(nic), "linkSpeedMB": 25000 if nic % 4 < 2 else 10000,
+                              "isActive": True} for nic in range(self.vmnics)]}
+                 for idx in range(self.hosts)]
+        # The management port group comes without uplinks, like some vCenters report it
+        system_pgs = [{"name": name, "transportType": name.upper(),
+                       "activeUplinks": None if name == 'management' else ["uplink1", "uplink2"]}
+                      for name in ['management', 'vsan', 'vmotion']]
+        vds_specs = [{"name": 'sys-dvs', "portGroupSpecs": system_pgs, "niocBandwidthAllocationSpecs": []}]
+        vds_specs += [{"name": 'dvs-{}'.format(idx + 1), "portGroupSpecs": [
+            {"name": 'pg-{}'.format(idx + 1), "transportType": 'VM_MANAGEMENT', "activeUplinks": None}]}
+                      for idx in range(self.dvs - 1)]
+        return {"name": cluster, "primaryDatastoreName": '{}-vsan'.format(cluster), "primaryDatastoreType": 'VSAN',
+                "hosts": hosts, "vdsSpecs": vds_specs}
+
+    def vxrm_fqdn(self, domain_id, cluster):
+        return 'localhost' if self.loopback else self.fqdn(domain_id, cluster, 'vxrm')
+
+    def nsxt_clusters(self):
+        return [{"id": 'nsx-{}'.format(domain['id']), "vip": '10.0.250.{}'.format(idx * 4 + 1),
+                 "vipFqdn": 'nsx-{}.vrack.local'.format(domain['name']), "isShareable": True,
+                 "domains": [{"id": domain['id']}],
+                 "nodes": [{"name": 'nsx-{}-{}'.format(domain['name'], node), "ipAddress": '10.0.250.{}'.format(
+                     idx * 4 + 2 + node), "fqdn": 'nsx-{}-{}.vrack.local'.format(domain['name'], node)}
+                     for node in range(3)]}
+                for idx, domain in enumerate(self.domains)]
+
+    def ip_pools(self):
+        return [{"name": 'tep-pool', "availableIpAddresses": 1000, "staticSubnets": [
+            {"cidr": '10.1.0.0/16', "gateway": '10.1.0.1',
+             "ipAddressPoolRanges": [{"start": '10.1.0.10', "end": '10.1.3.241'}]}]}]
+
+    def license_keys(self):
+        return [{"key": key, "productType": product, "licenseKeyValidity": {"licenseKeyStatus": 'ACTIVE'}}
+                for product, key in [('VSAN', 'VSAN-KEY'), ('NSXT', 'NSX-KEY')]]
+
+
+class StandinState:
+    # Queries, validations, tasks and domainmanager requests are answered in progress for the first polls
+    def __init__(self, progress_polls=DEFAULT_PROGRESS_POLLS):
+        self.progress_polls = progress_polls
+        self.resources = {}
+        self.lock = threading.Lock()
+
+    def create(self, kind, result):
+        resource_id = str(uuid.uuid4())
+        with self.lock:
+            self.resources[resource_id] = {"kind": kind, "result": result, "polls": 0}
+        return resource_id
+
+    def poll(self, resource_id):
+        with self.lock:
+            resource = self.resources.get(resource_id)
+            if resource is None:
+                return None, None
+            resource['polls'] += 1
+            return resource['kind'], (resource['result'], resource['polls'] <= self.progress_polls)
+
+
+class SddcStandin:
+    def __init__(self, inventory=None, port=0, latency=0.0, jitter=0.0, error_rate=0.0, busy_rate=0.0,
+                 progress_polls=DEFAULT_PROGRESS_POLLS, fail_validation=False, fail_task=False, seed=None):
+        self.inventory = inventory if inventory is not None else Inventory()
+        self.port = port
+        # Seconds every request takes, give or take jitter
+        self.latency = latency
+        self.jitter = jitter
+        # Share of the requests answered 500, and of the cluster queries answered 409 busy
+        self.error_rate = error_rate
+        self.busy_rate = busy_rate
+        self.fail_validation = fail_validation
+        self.fail_task = fail_task
+        self.random = random.Random(seed)
+        self.state = StandinState(progress_polls)
+        self.calls = []
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.calls_lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def start(self):
+        standin = self
+
+        class Handler(StandinHandler):
+            pass
+        Handler.standin = standin
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def record(self, method, path, size):
+        with self.calls_lock:
+            self.calls.append((method, path))
+            self.bytes_received += size
+
+    def record_sent(self, size):
+        with self.calls_lock:
+            self.bytes_sent += size
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0))
+
+    def inject_error(self):
+        return self.error_rate and self.random.random() < self.error_rate
+
+    def inject_busy(self):
+        return self.busy_rate and self.random.random() < self.busy_rate
+
+    def access_token(self):
+        claims = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + 3600}).encode()).decode().rstrip('=')
+        return 'standin.{}.signature'.format(claims)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    standin = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.__dispatch('GET')
+
+    def do_POST(self):
+        self.__dispatch('POST')
+
+    def do_PATCH(self):
+        self.__dispatch('PATCH')
+
+    def __dispatch(self, method):
+        path = unquote(urlparse(self.path).path).rstrip()
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        body = json.loads(raw) if raw else None
+        self.standin.record(method, path, len(raw))
+        self.standin.delay()
+        if self.standin.inject_error():
+            return self.__reply(500, {"message": 'Injected failure'})
+        for route_method, pattern, handler in ROUTES:
+            match = re.match(pattern + '$', path)
+            if route_method == method and match:
+                return handler(self, body, *match.groups())
+        self.__reply(404, {"message": 'No stand-in for {} {}'.format(method, path)})
+
+    def __reply(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.standin.record_sent(len(data))
+
+    def __inventory(self):
+        return self.standin.inventory
+
+    def token(self, body):
+        self.__reply(200, {"accessToken": self.standin.access_token(), "refreshToken": {"id": str(uuid.uuid4())}})
+
+    def sddc_managers(self, body):
+        self.__reply(200, {"elements": [{"id": 'sddc-manager', "version": VCF_VERSION}]})
+
+    def domains(self, body):
+        self.__reply(200, {"elements": self.__inventory().domains})
+
+    def domain_inventory(self, body, domain_id):
+        if self.__inventory().domain(domain_id) is None:
+            return self.__reply(404, {"message": 'No domain {}'.format(domain_id)})
+        self.__reply(200, {"vcenters": [{"version": '7.0.3'}], "domain": {"status": 'ACTIVE'}})
+
+    def clusters_query(self, body, domain_id):
+        if self.standin.inject_busy():
+            return self.__reply(409, {"message": 'Another query is running on the vCenter'})
+        result = {"elements": [{"name": name} for name in self.__inventory().clusters]}
+        query_id = self.standin.state.create('query', result)
+        self.__reply(202, {}, {'Location': '/v1/domains/{}/clusters/queries/{}'.format(domain_id, query_id)})
+
+    def cluster_query(self, body, domain_id, cluster):
+        if self.standin.inject_busy():
+            return self.__reply(409, {"message": 'Another query is running on the vCenter'})
+        result = {"elements": [self.__inventory().cluster(domain_id, cluster)]}
+        query_id = self.standin.state.create('query', result)
+        self.__reply(202, {}, {'Location': '/v1/domains/{}/clusters/{}/queries/{}'.format(domain_id, cluster,
+                                                                                             query_id)})
+
+    def query_result(self, body, *ids):
+        kind, value = self.standin.state.poll(ids[-1])
+        if kind != 'query':
+            return self.__reply(404, {"message": 'No query {}'.format(ids[-1])})
+        result, in_progress = value
+        self.__reply(200, {"queryInfo": {"status": 'IN_PROGRESS' if in_progress else 'COMPLETED'}, "result": result})
+
+    def vxrail_cluster_query(self, body, domain_id):
+        cluster = body.get('clusterName')
+        result = {"status": 'MARKED_FOR_EVICTION', "vxRailClustersSpec": [
+            {"clusterName": cluster, "vxrmFqdn": self.__inventory().vxrm_fqdn(domain_id, cluster)}]}
+        self.__reply(200, {"id": self.standin.state.create('request', result)})
+
+    def fingerprints(self, body):
+        result = {"status": 'COMPLETED', "sshFingerprints": [
+            {"id": host['fqdn'], "fingerPrint": 'SHA256:' + base64.b64encode(host['fqdn'].encode()).decode()}
+            for host in body.get('sshFingerprints') or []]}
+        self.__reply(200, {"id": self.standin.state.create('request', result)})
+
+    def request_result(self, body, request_id):
+        kind, value = self.standin.state.poll(request_id)
+        if kind != 'request':
+            return self.__reply(404, {"message": 'No request {}'.format(request_id)})
+        result, in_progress = value
+        self.__reply(200, dict(result, status='IN_PROGRESS') if in_progress else result)
+
+    def nsxt_clusters(self, body):
+        self.__reply(200, {"elements": self.__inventory().nsxt_clusters()})
+
+    def ip_pools(self, body, nsxt_cluster_id):
+        self.__reply(200, {"elements": self.__inventory().ip_pools()})
+
+    def license_keys(self, body):
+        self.__reply(200, {"elements": self.__inventory().license_keys()})
+
+    def validate(self, body, domain_id=None):
+        result = {"executionStatus": 'COMPLETED',
+                  "resultStatus": 'FAILED' if self.standin.fail_validation else 'SUCCEEDED',
+                  "validationChecks": [{"description": 'Stand-in validation', "resultStatus": 'FAILED',
+                                        "errorResponse": {"message": 'Injected validation failure'}}]
+                  if self.standin.fail_validation else []}
+        validation_id = self.standin.state.create('validation', result)
+        result['id'] = validation_id
+        self.__reply(202, {"id": validation_id, "executionStatus": 'IN_PROGRESS'})
+
+    def validation_result(self, body, validation_id):
+        kind, value = self.standin.state.poll(validation_id)
+        if kind != 'validation':
+            return self.__reply(404, {"message": 'No validation {}'.format(validation_id)})
+        result, in_progress = value
+        self.__reply(200, dict(result, executionStatus='IN_PROGRESS') if in_progress else result)
+
+    def start_task(self, body, domain_id=None):
+        result = {"status": 'FAILED' if self.standin.fail_task else 'SUCCESSFUL'}
+        task_id = self.standin.state.create('task', result)
+        result['id'] = task_id
+        self.__reply(202, {"id": task_id, "status": 'IN_PROGRESS'})
+
+    def task_result(self, body, task_id):
+        kind, value = self.standin.state.poll(task_id)
+        if kind != 'task':
+            return self.__reply(404, {"message": 'No task {}'.format(task_id)})
+        result, in_progress = value
+        self.__reply(200, dict(result, status='IN_PROGRESS') if in_progress else result)
+
+
+ROUTES = [
+    ('POST', r'/v1/tokens', StandinHandler.token),
+    ('GET', r'/v1/sddc-managers', StandinHandler.sddc_managers),
+    ('GET', r'/v1/domains', StandinHandler.domains),
+    ('GET', r'/inventory/domains/([^/]+)/inventory', StandinHandler.domain_inventory),
+    ('POST', r'/v1/domains/([^/]+)/clusters/queries', StandinHandler.clusters_query),
+    ('GET', r'/v1/domains/([^/]+)/clusters/queries/([^/]+)', StandinHandler.query_result),
+    ('POST', r'/v1/domains/([^/]+)/clusters/([^/]+)/queries', StandinHandler.cluster_query),
+    ('GET', r'/v1/domains/([^/]+)/clusters/([^/]+)/queries/([^/]+)', StandinHandler.query_result),
+    ('POST', r'/domainmanager/vxrail/vidomains/([^/]+)/cluster/queries', StandinHandler.vxrail_cluster_query),
+    ('GET', r'/domainmanager/vxrail/vidomains/requests/([^/]+)', StandinHandler.request_result),
+    ('POST', r'/domainmanager/vxrail/hosts/unmananged/fingerprint', StandinHandler.fingerprints),
+    ('GET', r'/domainmanager/vxrail/hosts/requests/([^/]+)', StandinHandler.request_result),
+    ('GET', r'/v1/nsxt-clusters', StandinHandler.nsxt_clusters),
+    ('GET', r'/v1/nsxt-clusters/([^/]+)/ip-address-pools', StandinHandler.ip_pools),
+    ('GET', r'/v1/license-keys', StandinHandler.license_keys),
+    ('POST', r'/v1/domains/validations/creations', StandinHandler.validate),
+    ('POST', r'/v1/domains/([^/]+)/validations', StandinHandler.validate),
+    ('GET', r'/v1/domains/validations/([^/]+)', StandinHandler.validation_result),
+    ('POST', r'/v1/clusters/validations', StandinHandler.validate),
+    ('GET', r'/v1/clusters/validations/([^/]+)', StandinHandler.validation_result),
+    ('PATCH', r'/v1/domains/([^/]+)', StandinHandler.start_task),
+    ('POST', r'/v1/clusters', StandinHandler.start_task),
+    ('POST', r'/v1/domains', StandinHandler.start_task),
+    ('GET', r'/v1/tasks/([^/]+)', StandinHandler.task_result),
+]
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description='Stand-in SDDC Manager with a synthetic inventory')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--domains', type=int, default=2, help='Workload domains, vi-1 has no cluster yet')
+    parser.add_argument('--clusters', type=int, default=2, help='Unmanaged clusters of every domain')
+    parser.add_argument('--hosts', type=int, default=4, help='Hosts of every unmanaged cluster')
+    parser.add_argument('--vmnics', type=int, default=4, help='vmnics of every host')
+    parser.add_argument('--dvs', type=int, default=1, help='DVSes of every unmanaged cluster, sys-dvs included')
+    parser.add_argument('--loopback', action='store_true',
+                        help='Hosts on 127.0.0.0/8 and VxRail Manager on localhost, for the SSH stand-in')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every request takes')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Seconds the latency varies by')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 500')
+    parser.add_argument('--busy-rate', type=float, default=0.0,
+                        help='Share of cluster queries answered 409 busy')
+    parser.add_argument('--progress-polls', type=int, default=DEFAULT_PROGRESS_POLLS,
+                        help='Polls a query, validation or task stays in progress')
+    parser.add_argument('--fail-validation', action='store_true', help='Validations end FAILED')
+    parser.add_argument('--fail-task', action='store_true', help='Import tasks end FAILED')
+    parser.add_argument('--seed', type=int, help='Seed of the injected latency and failures')
+    return parser.parse_args(argv)
+
+
+def standin_from_options(options):
+    inventory = Inventory(options.domains, options.clusters, options.hosts, options.vmnics, options.dvs,
+                          options.loopback)
+    return SddcStandin(inventory, options.port, options.latency, options.jitter, options.error_rate,
+                       options.busy_rate, options.progress_polls, options.fail_validation, options.fail_task,
+                       options.seed)
+
+
+if __name__ == '__main__':
+    standin = standin_from_options(parse_options())
+    print('Stand-in SDDC Manager listening on {}'.format(standin.start()))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
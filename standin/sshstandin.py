@@ -0,0 +1,154 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Stand-in SSH server for the credential check, every loopback address plays one host
+
+__author__ = 'jradhakrishna'
+
+import argparse
+import socket
+import threading
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+DEFAULT_PORT = 2222
+DEFAULT_PASSWORD = 'VMware123!'
+
+"""
+    Usage: python3 -m standin.sddcstandin --loopback ...
+           python3 -m standin.sshstandin --port 2222 --password VMware123! --account 127.0.0.12:root=Wrong123!
+           python3 vxrailworkloadautomator.py --sddc-url http://127.0.0.1:8080 --ssh-port 2222 ...
+
+    With --loopback the SDDC Manager stand-in gives the hosts 127.0.0.0/8 addresses and the VxRail Manager the
+    FQDN localhost. This server listens on all of them and tells the hosts apart by the address a connection came
+    in on. Every user of every address has the --password unless an --account sets another one for it. The root
+    password of an address is also what 'su -c true root' asks for.
+"""
+
+
+class SshStandin:
+    def __init__(self, port=0, password=DEFAULT_PASSWORD, accounts=None):
+        if paramiko is None:
+            print('\033[91m The SSH stand-in needs paramiko, pip install paramiko\033[00m')
+            exit(1)
+        self.port = port
+        self.password = password
+        # {(address, username): password}
+        self.accounts = dict(accounts or {})
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.logins = []
+        self.lock = threading.Lock()
+        self.sock = None
+
+    def password_of(self, address, username):
+        return self.accounts.get((address, username), self.password)
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('0.0.0.0', self.port))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.__accept, daemon=True).start()
+        return self.port
+
+    def stop(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __accept(self):
+        while self.sock is not None:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.__serve, args=(client,), daemon=True).start()
+
+    def __serve(self, client):
+        address = client.getsockname()[0]
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        server = StandinServer(self, address)
+        try:
+            transport.start_server(server=server)
+            channel = transport.accept(30)
+            if channel is None:
+                return
+            server.command_event.wait(30)
+            if server.command == 'su -c true root':
+                channel.sendall(b'Password: ')
+                typed = b''
+                while not typed.endswith((b'\n', b'\r')):
+                    data = channel.recv(1024)
+                    if not data:
+                        break
+                    typed += data
+                accepted = typed.strip().decode('utf-8') == self.password_of(address, 'root')
+                channel.sendall(b'\r\n' if accepted else b'\r\nsu: Authentication failure\r\n')
+                channel.send_exit_status(0 if accepted else 1)
+            else:
+                channel.send_exit_status(0)
+            channel.close()
+        except (paramiko.SSHException, EOFError, OSError):
+            pass
+        finally:
+            transport.close()
+
+
+class StandinServer(paramiko.ServerInterface if paramiko is not None else object):
+    def __init__(self, standin, address):
+        self.standin = standin
+        self.address = address
+        self.command = None
+        self.command_event = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        accepted = password == self.standin.password_of(self.address, username)
+        with self.standin.lock:
+            self.standin.logins.append((self.address, username, accepted))
+        return paramiko.AUTH_SUCCESSFUL if accepted else paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == 'session' else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self.command = command.decode('utf-8')
+        self.command_event.set()
+        return True
+
+
+def parse_account(value):
+    # ADDRESS:USER=PASSWORD
+    try:
+        target, password = value.split('=', 1)
+        address, username = target.split(':', 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected ADDRESS:USER=PASSWORD, got {}'.format(value))
+    return (address, username), password
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description='Stand-in SSH server for the credential check')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of every user of every address')
+    parser.add_argument('--account', type=parse_account, action='append', default=[],
+                        help='ADDRESS:USER=PASSWORD, another password for one user of one address; repeat for more')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    options = parse_options()
+    standin = SshStandin(options.port, options.password, dict(options.account))
+    print('Stand-in SSH server listening on port {}'.format(standin.start()))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
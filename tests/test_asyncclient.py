@@ -0,0 +1,105 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the token handling of the asyncio SDDC Manager client
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import base64
+import json
+import time
+import unittest
+from unittest import mock
+
+try:
+    from Utils import asyncclient
+    from Utils.asyncclient import AsyncSddcClient, SddcRequestError, TOKEN_REFRESH_MARGIN
+    from Utils.transport import HttpResponse
+except ImportError:
+    asyncclient = None
+
+TASK_URL = 'https://sddc-manager/v1/tasks/t1'
+
+
+def jwt(exp):
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode('utf-8')).decode('ascii').rstrip('=')
+    return 'header.{}.signature'.format(claims)
+
+
+class Clock:
+    # time.time of the client under the test's control, monotonic stays real
+    def __init__(self):
+        self.now = 1000000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return time.monotonic()
+
+
+class ScriptedTransport:
+    # Answers token requests with the next token status, other requests with the next request status
+    def __init__(self, clock, token_statuses, request_statuses, lifetime=3600):
+        self.clock = clock
+        self.token_statuses = list(token_statuses)
+        self.request_statuses = list(request_statuses)
+        self.lifetime = lifetime
+        self.calls = []
+
+    async def request(self, method, url, headers=None, payload=None):
+        self.calls.append((method, url, (headers or {}).get('Authorization')))
+        if url.endswith('/v1/tokens'):
+            status = self.token_statuses.pop(0)
+            body = {"accessToken": jwt(self.clock.now + self.lifetime)} if status == 200 else {"message": 'denied'}
+            return HttpResponse(status, json.dumps(body), {})
+        return HttpResponse(self.request_statuses.pop(0), '{"status": "SUCCESSFUL"}', {})
+
+    async def close(self):
+        pass
+
+
+@unittest.skipIf(asyncclient is None, 'requests is not installed')
+class AsyncSddcClientTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(asyncclient, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def client(self, transport):
+        return AsyncSddcClient('sddc-manager', 'admin', 'secret', transport)
+
+    def logins(self, transport):
+        return len([call for call in transport.calls if call[1].endswith('/v1/tokens')])
+
+    def test_token_is_reused_until_shortly_before_it_expires(self):
+        transport = ScriptedTransport(self.clock, [200, 200], [200, 200, 200])
+        client = self.client(transport)
+        asyncio.run(client.get(TASK_URL))
+        self.clock.now += 3600 - TOKEN_REFRESH_MARGIN - 1
+        asyncio.run(client.get(TASK_URL))
+        self.assertEqual(self.logins(transport), 1)
+        self.clock.now += 1
+        asyncio.run(client.get(TASK_URL))
+        self.assertEqual(self.logins(transport), 2)
+
+    def test_unauthorized_request_logs_in_again_and_is_retried_once(self):
+        transport = ScriptedTransport(self.clock, [200, 200], [401, 200])
+        self.assertEqual(asyncio.run(self.client(transport).get(TASK_URL)), {"status": 'SUCCESSFUL'})
+        self.assertEqual([call[0] for call in transport.calls], ['POST', 'GET', 'POST', 'GET'])
+
+    def test_unauthorized_retry_is_not_repeated(self):
+        transport = ScriptedTransport(self.clock, [200, 200], [401, 401])
+        with self.assertRaises(SddcRequestError):
+            asyncio.run(self.client(transport).get(TASK_URL))
+        self.assertEqual(len(transport.calls), 4)
+
+    def test_rejected_login_after_unauthorized_is_an_error(self):
+        transport = ScriptedTransport(self.clock, [200, 401], [401])
+        with self.assertRaises(SddcRequestError):
+            asyncio.run(self.client(transport).get(TASK_URL))
+        self.assertEqual(len(transport.calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
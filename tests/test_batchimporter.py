@@ -0,0 +1,110 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the batch import scheduler with stub automators
+
+__author__ = 'jradhakrishna'
+
+import threading
+import time
+import unittest
+from batch.batchimporter import BatchImporter
+
+
+class Recorder:
+    # Events of every stub automator in order, and the most imports and prepares running at once
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+        self.running = {'prepare': 0, 'import': 0}
+        self.peak = {'prepare': 0, 'import': 0}
+
+    def event(self, *event):
+        with self.lock:
+            self.events.append(event)
+
+    def enter(self, kind):
+        with self.lock:
+            self.running[kind] += 1
+            self.peak[kind] = max(self.peak[kind], self.running[kind])
+
+    def leave(self, kind):
+        with self.lock:
+            self.running[kind] -= 1
+
+    def index(self, *event):
+        return self.events.index(event)
+
+
+class StubAutomator:
+    def __init__(self, answers, recorder, delay):
+        self.cluster = answers.get('cluster')
+        self.domain = answers.get('domain')
+        self.is_primary = bool(answers.get('primary'))
+        self.fail = answers.get('fail')
+        self.recorder = recorder
+        self.delay = delay
+        self.domains = self
+
+    def build_import(self):
+        self.recorder.event('prepare', self.cluster)
+        if self.fail == 'exit':
+            exit(1)
+        if self.fail == 'eof':
+            raise EOFError()
+        if self.fail == 'error':
+            raise RuntimeError('no vmnics')
+        return {"domain": self.domain, "cluster": self.cluster, "isPrimary": self.is_primary}
+
+    def validate_import(self, plan):
+        self.recorder.enter('prepare')
+        time.sleep(self.delay)
+        self.recorder.leave('prepare')
+        return 'validation-' + self.cluster
+
+    def start_import(self, plan):
+        self.recorder.enter('import')
+        self.recorder.event('import', self.cluster)
+        return 'task-' + self.cluster
+
+    def wait_for_task(self, task_id):
+        time.sleep(self.delay)
+        self.recorder.event('imported', self.cluster)
+        self.recorder.leave('import')
+        return 'SUCCESSFUL'
+
+
+class BatchImporterTest(unittest.TestCase):
+    def run_batch(self, imports, concurrency=2, delay=0.05):
+        self.recorder = Recorder()
+        importer = BatchImporter({"imports": imports},
+                                 lambda answers: StubAutomator(answers, self.recorder, delay), concurrency)
+        return importer.run()
+
+    def test_next_cluster_of_a_domain_is_prepared_after_its_primary_import(self):
+        self.run_batch([{"domain": 'vi-1', "cluster": 'c1', "answers": {"primary": True}},
+                        {"domain": 'vi-1', "cluster": 'c2'}, {"domain": 'vi-1', "cluster": 'c3'}])
+        self.assertLess(self.recorder.index('imported', 'c1'), self.recorder.index('prepare', 'c2'))
+
+    def test_next_cluster_is_prepared_while_a_secondary_import_runs(self):
+        self.run_batch([{"domain": 'vi-1', "cluster": 'c2'}, {"domain": 'vi-1', "cluster": 'c3'}])
+        self.assertLess(self.recorder.index('prepare', 'c3'), self.recorder.index('imported', 'c2'))
+
+    def test_a_failure_fails_only_its_own_import(self):
+        results = self.run_batch([{"domain": 'vi-1', "cluster": 'c1', "answers": {"fail": 'exit'}},
+                                  {"domain": 'vi-1', "cluster": 'c2', "answers": {"fail": 'eof'}},
+                                  {"domain": 'vi-2', "cluster": 'c3', "answers": {"fail": 'error'}},
+                                  {"domain": 'vi-2', "cluster": 'c4'}])
+        self.assertEqual([(result['cluster'], result['status'], result['stage']) for result in results],
+                         [('c1', 'FAILED', 'prepare'), ('c2', 'FAILED', 'prepare'), ('c3', 'FAILED', 'prepare'),
+                          ('c4', 'SUCCEEDED', 'import')])
+        self.assertEqual(results[2]['error'], 'RuntimeError: no vmnics')
+
+    def test_concurrency_bounds_prepares_and_imports(self):
+        results = self.run_batch([{"domain": 'vi-{}'.format(idx), "cluster": 'c{}'.format(idx)} for idx in range(4)],
+                                 concurrency=2, delay=0.1)
+        self.assertEqual([result['status'] for result in results], ['SUCCEEDED'] * 4)
+        self.assertLessEqual(self.recorder.peak['prepare'], 2)
+        self.assertLessEqual(self.recorder.peak['import'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
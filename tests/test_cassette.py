@@ -0,0 +1,59 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of recording SDDC Manager traffic to a cassette and replaying it
+
+__author__ = 'jradhakrishna'
+
+import os
+import tempfile
+import unittest
+
+try:
+    from Utils.cassette import Cassette, open_cassette
+    from Utils.transport import HttpResponse, TransportError
+except ImportError:
+    Cassette = None
+
+BASE_URL = 'https://sddc-manager.vrack.local'
+
+
+@unittest.skipIf(Cassette is None, 'requests is not installed')
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.json.gz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def recorded(self, interactions):
+        cassette = Cassette(self.path)
+        for method, url, payload, status, body in interactions:
+            cassette.record(method, url, payload, HttpResponse(status, body, {"Location": '/v1/tasks/t1'}))
+        cassette.save()
+        return Cassette(self.path, replay=True)
+
+    def test_polls_replay_in_order_and_repeat_the_last_response(self):
+        cassette = self.recorded([('GET', BASE_URL + '/v1/tasks/t1', None, 200, '{"status": "IN_PROGRESS"}'),
+                                  ('GET', BASE_URL + '/v1/tasks/t1', None, 200, '{"status": "SUCCESSFUL"}')])
+        bodies = [cassette.play('GET', BASE_URL + '/v1/tasks/t1', None).text for _ in range(3)]
+        self.assertEqual(bodies, ['{"status": "IN_PROGRESS"}', '{"status": "SUCCESSFUL"}',
+                                  '{"status": "SUCCESSFUL"}'])
+
+    def test_requests_are_told_apart_by_their_masked_body(self):
+        cassette = self.recorded([('POST', BASE_URL + '/v1/clusters', {"name": 'c1', "password": 'a'}, 202, '{}'),
+                                  ('POST', BASE_URL + '/v1/clusters', {"name": 'c2', "password": 'a'}, 400, '{}')])
+        self.assertEqual(cassette.play('POST', BASE_URL + '/v1/clusters', {"name": 'c2', "password": 'b'})
+                         .status_code, 400)
+        with self.assertRaises(TransportError):
+            cassette.play('POST', BASE_URL + '/v1/clusters', {"name": 'c3'})
+
+    def test_secrets_are_not_recorded(self):
+        cassette = self.recorded([('POST', BASE_URL + '/v1/tokens', {"password": 'VMware123!'}, 200,
+                                   '{"accessToken": "abc.def"}')])
+        self.assertNotIn('abc.def', cassette.play('POST', BASE_URL + '/v1/tokens', {"password": 'x'}).text)
+        with open_cassette(self.path, 'rt') as cassette_file:
+            self.assertNotIn('VMware123!', cassette_file.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the SSH credential check against the stand-in SSH server
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from standin.sshstandin import SshStandin
+from validation.credentialcheck import CredentialCheck
+
+PASSWORD = 'VMware123!'
+
+
+@unittest.skipIf(not CredentialCheck().available, 'paramiko is not installed')
+class CredentialCheckTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.standin = SshStandin(password=PASSWORD)
+        cls.port = cls.standin.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.standin.stop()
+
+    def setUp(self):
+        self.standin.logins.clear()
+        self.check = CredentialCheck(workers=4, timeout=5, port=self.port)
+        self.credentials = [{"role": "ESXi", "fqdn": 'esxi-{}.vrack.local'.format(idx),
+                             "address": '127.0.0.{}'.format(10 + idx), "username": 'root', "password": PASSWORD}
+                            for idx in range(3)]
+        self.credentials.append({"role": "VxRail Manager", "fqdn": 'localhost', "address": '127.0.0.1',
+                                 "username": 'mystic', "password": PASSWORD, "suPassword": PASSWORD})
+
+    def test_accepted_credentials(self):
+        self.assertEqual(self.check.check(self.credentials), [])
+
+    def test_wrong_host_root_password(self):
+        self.credentials[1]['password'] = 'Wrong123!'
+        failures = self.check.check(self.credentials)
+        self.assertEqual([(failure['credential']['fqdn'], failure['field']) for failure in failures],
+                         [('esxi-1.vrack.local', 'password')])
+        self.assertIn('esxi-1.vrack.local', CredentialCheck.format_table(failures)[2])
+
+    def test_wrong_vxrail_manager_admin_password(self):
+        self.credentials[-1]['password'] = 'Wrong123!'
+        failures = self.check.check(self.credentials)
+        self.assertEqual([(failure['credential']['fqdn'], failure['field']) for failure in failures],
+                         [('localhost', 'password')])
+
+    def test_wrong_vxrail_manager_root_password(self):
+        self.credentials[-1]['suPassword'] = 'Wrong123!'
+        failures = self.check.check(self.credentials)
+        self.assertEqual([(failure['credential']['fqdn'], failure['field']) for failure in failures],
+                         [('localhost', 'suPassword')])
+
+    def test_only_failed_entries_are_entered_again(self):
+        self.credentials[0]['password'] = 'Wrong123!'
+        self.credentials[-1]['password'] = 'Wrong123!'
+        corrected = []
+
+        def correct(failures):
+            for failure in failures:
+                corrected.append(failure['credential']['fqdn'])
+                failure['credential'][failure['field']] = PASSWORD
+            self.standin.logins.clear()
+            return failures
+
+        self.check.check_until_accepted(self.credentials, correct)
+        self.assertEqual(corrected, ['esxi-0.vrack.local', 'localhost'])
+        self.assertEqual(sorted(self.standin.logins), [('127.0.0.1', 'mystic', True), ('127.0.0.10', 'root', True)])
+        self.assertEqual(self.credentials[0]['password'], PASSWORD)
+
+
+if __name__ == '__main__':
+    unittest.main()
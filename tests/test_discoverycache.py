@@ -0,0 +1,41 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the on-disk cache of cluster discovery results
+
+__author__ = 'jradhakrishna'
+
+import os
+import tempfile
+import unittest
+from Utils.discoverycache import DiscoveryCache
+
+
+class DiscoveryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DiscoveryCache(os.path.join(self.directory.name, 'discovery.db'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_results_are_reused_until_invalidated(self):
+        calls = []
+        key = ('sddc-manager', 'domain-1', '', 'UNMANAGED_CLUSTERS_IN_VCENTER')
+        self.assertEqual(self.cache.cached(key, lambda: calls.append(1) or ['cluster-a']), ['cluster-a'])
+        self.assertEqual(self.cache.cached(key, lambda: calls.append(1) or ['cluster-b']), ['cluster-a'])
+        self.cache.invalidate('sddc-manager')
+        self.assertEqual(self.cache.cached(key, lambda: calls.append(1) or ['cluster-b']), ['cluster-b'])
+        self.assertEqual(len(calls), 2)
+
+    def test_invalidating_a_domain_keeps_the_other_domains(self):
+        self.cache.put('sddc-manager', 'domain-1', '', 'UNMANAGED_CLUSTERS_IN_VCENTER', ['cluster-a'])
+        self.cache.put('sddc-manager', 'domain-1', 'cluster-a', 'UNMANAGED_CLUSTER_IN_VCENTER', {"elements": []})
+        self.cache.put('sddc-manager', 'domain-2', '', 'UNMANAGED_CLUSTERS_IN_VCENTER', ['cluster-b'])
+        self.cache.invalidate('sddc-manager', 'domain-1')
+        self.assertIsNone(self.cache.get('sddc-manager', 'domain-1', '', 'UNMANAGED_CLUSTERS_IN_VCENTER'))
+        self.assertIsNone(self.cache.get('sddc-manager', 'domain-1', 'cluster-a', 'UNMANAGED_CLUSTER_IN_VCENTER'))
+        self.assertEqual(self.cache.get('sddc-manager', 'domain-2', '', 'UNMANAGED_CLUSTERS_IN_VCENTER'),
+                         ['cluster-b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the DNS forward and reverse consistency check against the stand-in DNS server
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from Utils.dnsresolver import DnsResolver
+from standin.dnsstandin import DnsStandin
+from validation.dnscheck import DnsConsistencyCheck
+
+
+class DnsConsistencyCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.standin = DnsStandin(records={'esxi-1.vrack.local': '10.0.0.10', 'vxrm.vrack.local': '10.0.0.20'},
+                                  a_records={'esxi-2.vrack.local': '10.0.0.11', 'esxi-3.vrack.local': '10.0.0.99'},
+                                  ptr_records={'10.0.0.11': 'esxi-9.vrack.local', '10.0.0.12': 'esxi-3.vrack.local'})
+        port = self.standin.start()
+        self.resolver = DnsResolver(['127.0.0.1:{}'.format(port)], timeout=1)
+
+    def tearDown(self):
+        self.standin.stop()
+
+    def test_only_mismatches_are_reported(self):
+        records = [{"role": "ESXi", "fqdn": 'esxi-1.vrack.local', "ipAddress": '10.0.0.10'},
+                   {"role": "ESXi", "fqdn": 'esxi-2.vrack.local', "ipAddress": '10.0.0.11'},
+                   {"role": "ESXi", "fqdn": 'esxi-3.vrack.local', "ipAddress": '10.0.0.12'},
+                   {"role": "ESXi", "fqdn": 'esxi-4.vrack.local', "ipAddress": '10.0.0.13'},
+                   {"role": "VxRail Manager", "fqdn": 'vxrm.vrack.local', "ipAddress": None}]
+        mismatches = DnsConsistencyCheck(self.resolver).check(records)
+        self.assertEqual([[row[1], row[5]] for row in mismatches], [
+            ['esxi-2.vrack.local', 'PTR record points elsewhere'],
+            ['esxi-3.vrack.local', 'A record is not the discovered IP'],
+            ['esxi-4.vrack.local', 'no A record, no PTR record']])
+        self.assertEqual(mismatches[0][4], 'esxi-9.vrack.local')
+
+    def test_answers_are_cached(self):
+        self.resolver.resolve('esxi-1.vrack.local')
+        self.resolver.resolve('ESXI-1.vrack.local')
+        self.assertEqual(len(self.standin.queries), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
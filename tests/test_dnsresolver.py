@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the in-process DNS resolver against misbehaving nameservers
+
+__author__ = 'jradhakrishna'
+
+import socket
+import struct
+import threading
+import time
+import unittest
+from Utils.dnsresolver import DnsResolver, parse_answers, read_name
+from standin.dnsstandin import DnsStandin
+
+
+class RawNameserver:
+    # Answers every query with whatever reply(query) returns, a list of datagrams
+    def __init__(self, reply):
+        self.reply = reply
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        threading.Thread(target=self.__serve, daemon=True).start()
+
+    @property
+    def address(self):
+        return '127.0.0.1:{}'.format(self.sock.getsockname()[1])
+
+    def stop(self):
+        self.sock.close()
+
+    def __serve(self):
+        while True:
+            try:
+                query, client = self.sock.recvfrom(512)
+                for datagram in self.reply(query):
+                    self.sock.sendto(datagram, client)
+            except OSError:
+                return
+
+
+def answer_header(query, ancount=1):
+    # Header and question of a NOERROR reply to the query
+    return query[:2] + struct.pack('>HHHHH', 0x8180, 1, ancount, 0, 0) + query[12:]
+
+
+class DnsResolverTest(unittest.TestCase):
+    def test_malformed_replies_are_a_failed_lookup(self):
+        # The answer record is cut off in the middle of its fixed fields
+        nameserver = RawNameserver(lambda query: [answer_header(query) + b'\xc0\x0c\x00\x01'])
+        try:
+            resolver = DnsResolver([nameserver.address], timeout=1, retries=0)
+            self.assertIsNone(resolver.resolve('esxi-1.vrack.local'))
+            self.assertEqual(resolver.cache, {})
+        finally:
+            nameserver.stop()
+
+    def test_stray_datagrams_do_not_extend_the_timeout(self):
+        def flood(query):
+            # Replies to another query keep arriving well past the timeout
+            stray = struct.pack('>H', (struct.unpack('>H', query[:2])[0] + 1) & 0xffff) + answer_header(query)[2:]
+            for _ in range(100):
+                time.sleep(0.01)
+                yield stray
+        nameserver = RawNameserver(flood)
+        try:
+            resolver = DnsResolver([nameserver.address], timeout=0.2, retries=0)
+            start = time.monotonic()
+            self.assertIsNone(resolver.resolve('esxi-1.vrack.local'))
+            self.assertLess(time.monotonic() - start, 0.6)
+        finally:
+            nameserver.stop()
+
+    def test_failing_nameserver_is_skipped(self):
+        # SERVFAIL from the first nameserver, the second one knows the name
+        failing = RawNameserver(lambda query: [query[:2] + struct.pack('>HHHHH', 0x8182, 1, 0, 0, 0) + query[12:]])
+        standin = DnsStandin(records={'esxi-1.vrack.local': '10.0.0.10'})
+        try:
+            resolver = DnsResolver([failing.address, '127.0.0.1:{}'.format(standin.start())], timeout=1, retries=0)
+            self.assertEqual(resolver.resolve('esxi-1.vrack.local'), '10.0.0.10')
+        finally:
+            failing.stop()
+            standin.stop()
+
+    def test_name_pointers_must_point_backwards(self):
+        with self.assertRaises(ValueError):
+            read_name(b'\x00' * 12 + b'\xc0\x0c', 12)
+
+    def test_truncated_answers_raise_a_parse_error(self):
+        response = struct.pack('>HHHHHH', 1, 0x8180, 0, 1, 0, 0) + b'\x03esx'
+        with self.assertRaises(IndexError):
+            parse_answers(response, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
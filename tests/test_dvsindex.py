@@ -0,0 +1,78 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the system DVS selection and port group clean up on multi DVS discoveries
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from clusters.dvsindex import DvsIndex
+
+
+def port_group(name, transport_type=None, **fields):
+    pg = dict({"name": name}, **fields)
+    if transport_type:
+        pg['transportType'] = transport_type
+    return pg
+
+
+def multi_dvs_discovery():
+    # Management and vMotion on a first DVS, the vSAN traffic only on the second one, the third carries it all
+    return [
+        {"name": 'dvs-mgmt', "portGroupSpecs": [
+            port_group('pg-mgmt', 'MANAGEMENT', activeUplinks=['uplink1', 'uplink2']),
+            port_group('pg-vmotion', 'VMOTION', activeUplinks=None)]},
+        {"name": 'dvs-vsan', "portGroupSpecs": [port_group('pg-vsan', 'VSAN', activeUplinks=None)]},
+        {"name": 'dvs-system', "niocBandwidthAllocationSpecs": [], "portGroupSpecs": [
+            port_group('pg-sys-mgmt', 'MANAGEMENT', activeUplinks=None),
+            port_group('pg-sys-vsan', 'VSAN', activeUplinks=['uplink1']),
+            port_group('pg-sys-vmotion', 'VMOTION'),
+            port_group('pg-vm')]},
+        {"name": 'dvs-empty', "portGroupSpecs": None}
+    ]
+
+
+class DvsIndexTest(unittest.TestCase):
+    def test_vsan_system_dvs_is_the_first_carrying_all_the_traffic(self):
+        specs = multi_dvs_discovery()
+        self.assertIs(DvsIndex(specs).system_dvs('VSAN'), specs[2])
+
+    def test_fc_system_dvs_does_not_need_vsan_traffic(self):
+        specs = multi_dvs_discovery()
+        self.assertIs(DvsIndex(specs).system_dvs('FC'), specs[0])
+
+    def test_discovery_order_decides_between_candidates(self):
+        specs = multi_dvs_discovery()
+        specs.insert(0, specs.pop(2))
+        self.assertEqual(DvsIndex(specs).system_dvs('FC')['name'], 'dvs-system')
+
+    def test_no_system_dvs(self):
+        specs = multi_dvs_discovery()[:2]
+        self.assertIsNone(DvsIndex(specs).system_dvs('VSAN'))
+        self.assertIsNone(DvsIndex(multi_dvs_discovery()).system_dvs('NFS'))
+        self.assertIsNone(DvsIndex(None).system_dvs('VSAN'))
+
+    def test_lookups(self):
+        index = DvsIndex(multi_dvs_discovery())
+        self.assertEqual(index.names(), ['dvs-mgmt', 'dvs-vsan', 'dvs-system', 'dvs-empty'])
+        self.assertEqual(index.port_group_names('dvs-system'), ['pg-sys-mgmt', 'pg-sys-vsan', 'pg-sys-vmotion', 'pg-vm'])
+        self.assertEqual(index.port_group_names('dvs-empty'), [])
+        self.assertEqual(index.port_group('dvs-vsan', 'pg-vsan')['transportType'], 'VSAN')
+        self.assertIsNone(index.port_group('dvs-mgmt', 'pg-vsan'))
+        self.assertIsNone(index.dvs('dvs-missing'))
+
+    def test_strip_null_uplinks_on_every_dvs(self):
+        specs = multi_dvs_discovery()
+        index = DvsIndex(specs)
+        index.strip_null_uplinks()
+        uplinks = {pg['name']: pg.get('activeUplinks', 'removed') for dvs in specs
+                   for pg in dvs['portGroupSpecs'] or []}
+        self.assertEqual(uplinks, {'pg-mgmt': ['uplink1', 'uplink2'], 'pg-vmotion': 'removed', 'pg-vsan': 'removed',
+                                   'pg-sys-mgmt': 'removed', 'pg-sys-vsan': ['uplink1'],
+                                   'pg-sys-vmotion': 'removed', 'pg-vm': 'removed'})
+        # The index is over the same spec objects, a second pass has nothing left to do
+        self.assertIs(index.port_group('dvs-vsan', 'pg-vsan'), specs[1]['portGroupSpecs'][0])
+        index.strip_null_uplinks()
+        self.assertEqual(specs[0]['portGroupSpecs'][0]['activeUplinks'], ['uplink1', 'uplink2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
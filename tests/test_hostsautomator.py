@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of fetching the SSH fingerprints of the hosts in chunks and remembering confirmed ones
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from hosts.hostsautomator import HostsAutomator, FINGERPRINT_CHUNK_SIZE
+    from hosts.thumbprintstore import ThumbprintStore
+except ImportError:
+    HostsAutomator = None
+
+
+class StubClient:
+    # Fingerprint requests answered with a fingerprint per host, the chunks are recorded
+    def __init__(self, fingerprints):
+        self.fingerprints = fingerprints
+        self.chunks = {}
+
+    async def post(self, payload, url):
+        request_id = str(len(self.chunks))
+        self.chunks[request_id] = payload['sshFingerprints']
+        return {"id": request_id}
+
+    async def get_poll_request(self, url, expected_status):
+        chunk = self.chunks[url.rsplit('/', 1)[1]]
+        return {"status": expected_status, "sshFingerprints": [{"id": entry['fqdn'], "fingerPrint":
+                                                                self.fingerprints[entry['fqdn']]} for entry in chunk]}
+
+
+class StubUtils:
+    def __init__(self, client):
+        self.client = client
+        self.lines = []
+
+    def url(self, path, secure=True):
+        return 'http://sddc-manager' + path
+
+    def run(self, coro):
+        return asyncio.run(coro)
+
+    def __getattr__(self, name):
+        # printGreen, printRed and the others
+        return self.lines.append
+
+
+@unittest.skipIf(HostsAutomator is None, 'requests is not installed')
+class HostsAutomatorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'known_thumbprints.json')
+        self.hosts = [{"hostName": 'esxi-{}'.format(idx)} for idx in range(FINGERPRINT_CHUNK_SIZE * 2 + 1)]
+        self.fingerprints = {host['hostName']: 'FP-' + host['hostName'] for host in self.hosts}
+        self.fingerprints['vxrm'] = 'FP-vxrm'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def automator(self, fingerprints):
+        self.client = StubClient(fingerprints)
+        automator = HostsAutomator(['sddc-manager'], StubUtils(self.client), ThumbprintStore(self.path))
+        automator.password_map = {host['hostName']: 'secret' for host in self.hosts}
+        return automator
+
+    def thumbprints(self, automator, refresh=False):
+        return automator.get_ssh_thumbprints(self.hosts, 'domain-1', 'vxrm', 'mystic', 'secret', True, refresh)
+
+    def test_fingerprints_are_fetched_in_chunks(self):
+        thumbprints = self.thumbprints(self.automator(self.fingerprints))
+        self.assertEqual(thumbprints, self.fingerprints)
+        self.assertEqual([len(chunk) for chunk in self.client.chunks.values()],
+                         [FINGERPRINT_CHUNK_SIZE, FINGERPRINT_CHUNK_SIZE, 2])
+
+    def test_confirmed_fingerprints_are_not_fetched_again(self):
+        self.thumbprints(self.automator(self.fingerprints))
+        self.assertEqual(self.thumbprints(self.automator(self.fingerprints)), self.fingerprints)
+        self.assertEqual(self.client.chunks, {})
+
+    def test_changed_fingerprints_need_the_operator(self):
+        self.thumbprints(self.automator(self.fingerprints))
+        changed = dict(self.fingerprints, vxrm='FP-other')
+        automator = self.automator(changed)
+        with mock.patch('builtins.input', return_value='no'), self.assertRaises(SystemExit):
+            self.thumbprints(automator, refresh=True)
+        self.assertIn('vxrm : FP-other : VIRTUAL_MACHINE : CHANGED, was FP-vxrm', automator.utils.lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the subnet checks of a new static IP pool
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from nsxt.ippoolplanner import IpPoolPlanner, parse_ip_ranges
+
+EXISTING_POOLS = [{"name": 'tep-pool', "staticSubnets": [{"cidr": '10.0.0.0/24'}],
+                   "blockSubnets": [{"cidr": '10.0.4.0/22'}]}]
+
+
+class IpPoolPlannerTest(unittest.TestCase):
+    def test_subnet_overlapping_an_existing_pool_is_rejected(self):
+        planner = IpPoolPlanner(EXISTING_POOLS)
+        self.assertEqual(planner.add_subnet('10.0.6.0/24', '10.0.6.1', [('10.0.6.10', '10.0.6.20')]),
+                         ['Subnet 10.0.6.0/24 overlaps 10.0.4.0/22 of pool tep-pool'])
+        self.assertEqual(planner.subnets, [])
+
+    def test_accepted_subnets_are_checked_against_each_other(self):
+        planner = IpPoolPlanner(EXISTING_POOLS)
+        self.assertEqual(planner.add_subnet('10.0.1.0/24', '10.0.1.1', [('10.0.1.10', '10.0.1.20')]), [])
+        self.assertEqual(planner.check_subnet('10.0.1.128/25', '10.0.1.129', [('10.0.1.130', '10.0.1.140')]),
+                         ['Subnet 10.0.1.128/25 overlaps new subnet 10.0.1.0/24'])
+
+    def test_gateway_and_ranges_must_be_usable(self):
+        errors = IpPoolPlanner().check_subnet('10.0.2.0/24', '10.0.2.5', [('10.0.2.0', '10.0.2.10')])
+        self.assertEqual(errors, ['IP range 10.0.2.0-10.0.2.10 is not within the usable addresses of 10.0.2.0/24',
+                                  'IP range 10.0.2.0-10.0.2.10 contains the gateway 10.0.2.5'])
+
+    def test_capacity_must_hold_every_tep_ip(self):
+        planner = IpPoolPlanner(required_ips=16)
+        planner.add_subnet('10.0.2.0/24', '10.0.2.1', parse_ip_ranges('10.0.2.10-10.0.2.19, 10.0.2.30-10.0.2.34'))
+        self.assertEqual(planner.check_capacity(), ['The pool has 15 addresses, 16 TEP IPs are needed'])
+        planner.add_subnet('10.0.3.0/24', '10.0.3.1', parse_ip_ranges('10.0.3.10-10.0.3.10'))
+        self.assertEqual(planner.check_capacity(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the journal of completed import stages
+
+__author__ = 'jradhakrishna'
+
+import json
+import os
+import tempfile
+import unittest
+from Utils.journal import StageJournal, SECRET_PLACEHOLDER
+
+
+class StageJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal.json')
+        self.calls = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def journal(self):
+        return StageJournal(self.path, 'sddc-manager', secret_keys=['password'])
+
+    def run_stage(self, journal, name, value, secret=False):
+        return journal.stage(name, lambda: self.calls.append(name) or value, secret=secret)
+
+    def test_completed_stages_are_reused(self):
+        journal = self.journal()
+        journal.start()
+        self.run_stage(journal, 'discovery', {"cluster": 'cluster-1'})
+        resumed = self.journal()
+        resumed.resume()
+        self.assertEqual(self.run_stage(resumed, 'discovery', None), {"cluster": 'cluster-1'})
+        self.assertEqual(self.calls, ['discovery'])
+
+    def test_secrets_are_not_written_and_their_stages_run_again(self):
+        journal = self.journal()
+        journal.start()
+        self.run_stage(journal, 'discovery', {"cluster": 'cluster-1'})
+        self.run_stage(journal, 'hosts', {"esxi-1": 'VMware123!'}, secret=True)
+        self.run_stage(journal, 'vxrailManager', {"rootCredentials": {"username": 'root', "password": 'VMware123!'}})
+        self.run_stage(journal, 'credentials', [], secret=True)
+        for name in os.listdir(self.directory.name):
+            with open(os.path.join(self.directory.name, name)) as journal_file:
+                self.assertNotIn('VMware123!', journal_file.read())
+        self.assertEqual(journal.result('vxrailManager')['rootCredentials']['password'], SECRET_PLACEHOLDER)
+        resumed = self.journal()
+        resumed.resume()
+        self.assertEqual([name for name in ['discovery', 'hosts', 'vxrailManager', 'credentials']
+                          if resumed.completed(name)], ['discovery'])
+
+    def test_redoing_a_stage_forgets_the_stages_derived_from_it(self):
+        journal = self.journal()
+        journal.start()
+        for name in ['discovery', 'dvs', 'nsxt', 'vxrailManager']:
+            self.run_stage(journal, name, {"stage": name})
+        resumed = self.journal()
+        resumed.resume('dvs')
+        self.assertEqual([name for name in ['discovery', 'dvs', 'nsxt', 'vxrailManager'] if resumed.completed(name)],
+                         ['discovery', 'vxrailManager'])
+
+    def test_journal_of_another_sddc_manager_is_refused(self):
+        self.journal().start()
+        with open(self.path) as journal_file:
+            self.assertEqual(json.load(journal_file)['host'], 'sddc-manager')
+        with self.assertRaises(SystemExit):
+            StageJournal(self.path, 'other-sddc-manager').resume()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the streaming JSON writer that masks secret values
+
+__author__ = 'jradhakrishna'
+
+import io
+import json
+import random
+import unittest
+from Utils import maskedjson
+
+MASKED_KEYS = ['password', 'licenseKey']
+
+
+def masked_copy(value, masked=False):
+    # What the streaming writer must print, built the slow way
+    if isinstance(value, dict):
+        return {key: masked_copy(item, masked or key in MASKED_KEYS) for key, item in value.items()}
+    if isinstance(value, list):
+        return [masked_copy(item, masked) for item in value]
+    return maskedjson.MASK if masked and value is not None else value
+
+
+def random_document(rng, depth=0):
+    kind = rng.randrange(8 if depth < 4 else 5)
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.randint(-10 ** 6, 10 ** 6)
+    if kind == 2:
+        return rng.uniform(-1000, 1000)
+    if kind in (3, 4):
+        return ''.join(rng.choice('ab"\\\né中') for _ in range(rng.randrange(6)))
+    if kind == 5:
+        return [random_document(rng, depth + 1) for _ in range(rng.randrange(4))]
+    keys = ['name', 'password', 'licenseKey', 'hostSpecs', 'vmNics', 'Zeta', 'alpha']
+    return {rng.choice(keys): random_document(rng, depth + 1) for _ in range(rng.randrange(5))}
+
+
+class MaskedJsonTest(unittest.TestCase):
+    def test_payload_is_printed_as_json_dumps_prints_it_masked(self):
+        payload = {"domainId": 'd1', "computeSpec": {"clusterSpecs": [{
+            "name": 'cluster-1', "hostSpecs": [{"hostName": 'esxi-1', "password": 'VMware123!', "vmNics": []}],
+            "vxRailDetails": {"rootCredentials": {"username": 'root', "password": 'VMware123!'}, "nicProfile": None},
+            "datastoreSpec": {"vsanDatastoreSpec": {"licenseKey": ['K1', {"part": 'K2'}], "datastoreName": 'vsan'}},
+            "geneveVlanId": 0, "ratio": 1.5, "enabled": True, "tags": {}}]}}
+        expected = json.dumps(masked_copy(payload), indent=2, sort_keys=True)
+        self.assertEqual(maskedjson.dumps(payload, MASKED_KEYS), expected)
+        self.assertNotIn('VMware123!', expected)
+        stream = io.StringIO()
+        maskedjson.dump(payload, stream, MASKED_KEYS)
+        self.assertEqual(stream.getvalue(), expected)
+
+    def test_random_documents_match_json_dumps(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            document = random_document(rng)
+            for indent, sort_keys in [(2, True), (None, True), (4, False)]:
+                self.assertEqual(maskedjson.dumps(document, MASKED_KEYS, indent=indent, sort_keys=sort_keys),
+                                 json.dumps(masked_copy(document), indent=indent, sort_keys=sort_keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the endpoint templates keying the request metrics, cassettes and benchmarks
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from Utils.metrics import endpoint_template, RequestMetrics
+
+UUID = '8c2d45e1-6f7a-4b3e-9d10-2a5b6c7d8e9f'
+
+
+class EndpointTemplateTest(unittest.TestCase):
+    def test_member_ids_are_templated(self):
+        self.assertEqual(endpoint_template('/v1/tasks/t1'), '/v1/tasks/{id}')
+        self.assertEqual(endpoint_template('/v1/domains/d1'), '/v1/domains/{id}')
+        self.assertEqual(endpoint_template('/v1/nsxt-clusters/n1/ip-address-pools'),
+                         '/v1/nsxt-clusters/{id}/ip-address-pools')
+        self.assertEqual(endpoint_template('/v1/domains/d1/clusters/c1/queries/q1'),
+                         '/v1/domains/{id}/clusters/{id}/queries/{id}')
+        self.assertEqual(endpoint_template('/domainmanager/vxrail/vidomains/d1'), '/domainmanager/vxrail/vidomains/{id}')
+
+    def test_sub_collections_are_kept(self):
+        self.assertEqual(endpoint_template('/v1/domains/d1/clusters/queries'), '/v1/domains/{id}/clusters/queries')
+        self.assertEqual(endpoint_template('/v1/domains/d1/clusters/queries/q1'),
+                         '/v1/domains/{id}/clusters/queries/{id}')
+        self.assertEqual(endpoint_template('/v1/domains/validations/creations'), '/v1/domains/validations/creations')
+        self.assertEqual(endpoint_template('/v1/clusters/validations/v1'), '/v1/clusters/validations/{id}')
+        self.assertEqual(endpoint_template('/domainmanager/vxrail/vidomains/requests/r1'),
+                         '/domainmanager/vxrail/vidomains/requests/{id}')
+        self.assertEqual(endpoint_template('/domainmanager/vxrail/hosts/requests/r1'),
+                         '/domainmanager/vxrail/hosts/requests/{id}')
+
+    def test_collections_without_id_are_kept(self):
+        self.assertEqual(endpoint_template('/v1/clusters'), '/v1/clusters')
+        self.assertEqual(endpoint_template('/v1/sddc-managers'), '/v1/sddc-managers')
+        self.assertEqual(endpoint_template('/domainmanager/vxrail/hosts/unmananged/fingerprint'),
+                         '/domainmanager/vxrail/hosts/unmananged/fingerprint')
+
+    def test_uuid_segments_are_templated_anywhere(self):
+        self.assertEqual(endpoint_template('/v1/license-keys/' + UUID), '/v1/license-keys/{id}')
+        self.assertEqual(endpoint_template('/v1/{}/status'.format(UUID.upper())), '/v1/{id}/status')
+
+    def test_host_query_string_and_trailing_space_are_dropped(self):
+        self.assertEqual(endpoint_template('https://sddc.vrack.vsphere.local/v1/domains?type=VI'), '/v1/domains')
+        self.assertEqual(endpoint_template('https://sddc.vrack.vsphere.local/v1/tasks/t1 '), '/v1/tasks/{id}')
+        self.assertEqual(endpoint_template('/v1/domains/d1/clusters/c1/queries '),
+                         '/v1/domains/{id}/clusters/{id}/queries')
+
+    def test_requests_to_different_members_share_one_entry(self):
+        metrics = RequestMetrics()
+        metrics.record_request('GET', 'https://sddc/v1/tasks/t1', 200, 10, 0.1)
+        metrics.record_request('GET', 'https://sddc/v1/tasks/' + UUID, 200, 20, 0.3)
+        requests = metrics.summary()['requests']
+        self.assertEqual(len(requests), 1)
+        self.assertEqual((requests[0]['endpoint'], requests[0]['count'], requests[0]['bytes']),
+                         ('/v1/tasks/{id}', 2, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
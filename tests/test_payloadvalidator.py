@@ -0,0 +1,45 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the local checks of the import payload
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from validation.payloadvalidator import PayloadValidator
+
+
+def payload(vmnic_names):
+    return {
+        "domainId": 'domain-1',
+        "computeSpec": {"clusterSpecs": [{
+            "name": 'cluster-1',
+            "vxRailDetails": {"dnsName": 'vxrm.vrack.local'},
+            "datastoreSpec": {"vsanDatastoreSpec": {"datastoreName": 'vsan-1', "licenseKey": 'XXXXX'}},
+            "networkSpec": {"vdsSpecs": [{"name": 'vds-1', "isUsedByNsxt": True}],
+                            "nsxClusterSpec": {"nsxTClusterSpec": {"geneveVlanId": 0}}},
+            "hostSpecs": [{"hostName": 'h1', "ipAddress": '10.0.0.10', "username": 'root', "password": 'secret',
+                           "hostNetworkSpec": {"vmNics": [{"id": name, "vdsName": 'vds-1'}
+                                                          for name in vmnic_names]}}]}]}}
+
+
+class PayloadValidatorTest(unittest.TestCase):
+    def test_valid_payload_has_no_errors(self):
+        hosts = [{"hostName": 'h1', "vmNics": [{"name": 'vmnic2'}, {"name": 'vmnic3'}]}]
+        self.assertEqual(PayloadValidator('VSAN', hosts).validate(payload(['vmnic2', 'vmnic3']), False), [])
+
+    def test_vmnics_not_on_the_host_are_reported(self):
+        hosts = [{"hostName": 'h1', "vmNics": [{"name": 'vmnic0'}, {"name": 'vmnic1'}]}]
+        self.assertEqual(PayloadValidator('VSAN', hosts).validate(payload(['vmnic2', 'vmnic3']), False),
+                         ["hostSpecs[h1]: vmnics ['vmnic2', 'vmnic3'] are not found on the host"])
+
+    def test_vmnics_of_hosts_discovered_without_pnics_are_not_checked(self):
+        hosts = [{"hostName": 'h1', "vmNics": None}]
+        self.assertEqual(PayloadValidator('VSAN', hosts).validate(payload(['vmnic2', 'vmnic3']), False), [])
+
+    def test_ha_needs_two_vmnics(self):
+        hosts = [{"hostName": 'h1', "vmNics": None}]
+        self.assertEqual(PayloadValidator('VSAN', hosts).validate(payload(['vmnic2']), False),
+                         ['hostSpecs[h1]: VMware High Availability (HA) requires a minimum of 2 vmnics, got 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
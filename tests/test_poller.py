@@ -0,0 +1,77 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the backoff schedule of the shared polling loop
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import unittest
+from Utils.poller import Poller, PollTimeout
+
+
+class Response:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+
+def responses(*items):
+    # fetch returning the given responses in turn
+    items = iter(items)
+    return lambda: next(items)
+
+
+def is_done(response):
+    return response.status == 'SUCCESSFUL'
+
+
+class PollerTest(unittest.TestCase):
+    def setUp(self):
+        self.waits = []
+
+    def poller(self, **kwargs):
+        kwargs.setdefault('jitter', 0)
+        return Poller(sleep=self.waits.append, **kwargs)
+
+    def test_first_probe_is_immediate_and_the_result_is_returned(self):
+        done = Response('SUCCESSFUL')
+        self.assertIs(self.poller().poll(responses(done), is_done), done)
+        self.assertEqual(self.waits, [])
+
+    def test_waits_back_off_up_to_the_max_delay(self):
+        fetch = responses(*[Response('IN_PROGRESS')] * 6 + [Response('SUCCESSFUL')])
+        self.poller(initial_delay=1, factor=2, max_delay=10).poll(fetch, is_done)
+        self.assertEqual(self.waits, [1, 2, 4, 8, 10, 10])
+
+    def test_jitter_stays_within_its_bounds(self):
+        fetch = responses(*[Response('IN_PROGRESS')] * 200 + [Response('SUCCESSFUL')])
+        self.poller(initial_delay=10, factor=1, jitter=0.2).poll(fetch, is_done)
+        self.assertTrue(all(8 <= wait <= 12 for wait in self.waits))
+        self.assertGreater(len(set(self.waits)), 1)
+
+    def test_retry_after_replaces_the_backoff_and_is_clamped(self):
+        fetch = responses(Response('IN_PROGRESS', {'Retry-After': '3'}), Response('IN_PROGRESS', {'Retry-After': '90'}),
+                          Response('IN_PROGRESS', {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}),
+                          Response('SUCCESSFUL'))
+        self.poller(initial_delay=1, factor=2, max_delay=30).poll(fetch, is_done)
+        self.assertEqual(self.waits, [3, 30, 4])
+
+    def test_polling_stops_when_the_next_wait_passes_the_timeout(self):
+        fetch = responses(*[Response('IN_PROGRESS')] * 10)
+        with self.assertRaises(PollTimeout):
+            self.poller(initial_delay=1, factor=2, timeout=5).poll(fetch, is_done)
+        self.assertEqual(self.waits, [1, 2, 4])
+
+    def test_apoll_follows_the_same_schedule(self):
+        async def asleep(seconds):
+            self.waits.append(seconds)
+        items = iter([Response('IN_PROGRESS')] * 3 + [Response('SUCCESSFUL')])
+
+        async def fetch():
+            return next(items)
+        poller = Poller(initial_delay=1, factor=3, max_delay=5, jitter=0, asleep=asleep)
+        self.assertEqual(asyncio.run(poller.apoll(fetch, is_done)).status, 'SUCCESSFUL')
+        self.assertEqual(self.waits, [1, 3, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the TEP address estimates and the ranking of the existing static IP pools
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from nsxt.tepallocator import TepAllocator, rank_pools
+
+
+def pool(name, ranges, available, block_size=None):
+    return {"name": name, "availableIpAddresses": available,
+            "staticSubnets": [{"cidr": '10.0.0.0/24',
+                               "ipAddressPoolRanges": [{"start": start, "end": end} for start, end in ranges]}],
+            "blockSubnets": [{"cidr": '10.0.1.0/24', "size": block_size}] if block_size else []}
+
+
+class TepAllocatorTest(unittest.TestCase):
+    def test_free_count_comes_from_the_available_addresses(self):
+        allocator = TepAllocator(pool('p1', [('10.0.0.10', '10.0.0.19'), ('10.0.0.15', '10.0.0.29')], 12))
+        self.assertEqual((allocator.total, allocator.used, allocator.free), (20, 8, 12))
+        self.assertTrue(allocator.fits(12))
+        self.assertFalse(allocator.fits(13))
+
+    def test_tep_ips_are_estimated_lowest_free_first(self):
+        allocator = TepAllocator(pool('p1', [('10.0.0.10', '10.0.0.13'), ('10.0.0.20', '10.0.0.29')], 12, 4))
+        runs, from_blocks = allocator.allocate(10)
+        self.assertEqual(runs, [[0x0A000016, 0x0A00001D]])
+        self.assertEqual(from_blocks, 2)
+        self.assertIsNone(allocator.allocate(13))
+
+    def test_too_small_pool_is_described_as_such(self):
+        lines = TepAllocator(pool('p1', [('10.0.0.10', '10.0.0.13')], 4)).describe(6)
+        self.assertEqual(lines[-1], 'Too small: 6 TEP IPs are needed')
+
+    def test_pools_that_fit_come_first_by_fewest_left_over(self):
+        pools = [pool('big', [('10.0.0.1', '10.0.0.100')], 100), pool('small', [('10.0.0.1', '10.0.0.4')], 4),
+                 pool('snug', [('10.0.0.1', '10.0.0.10')], 8), pool('tiny', [('10.0.0.1', '10.0.0.2')], 2)]
+        self.assertEqual([allocator.name for allocator in rank_pools(pools, 6)], ['snug', 'big', 'small', 'tiny'])
+
+
+if __name__ == '__main__':
+    unittest.main()
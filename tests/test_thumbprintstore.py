@@ -0,0 +1,52 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the store of SSH fingerprints confirmed in earlier runs
+
+__author__ = 'jradhakrishna'
+
+import os
+import tempfile
+import threading
+import unittest
+from hosts.thumbprintstore import ThumbprintStore, UNCHANGED, NEW, CHANGED
+
+
+class ThumbprintStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'known_thumbprints.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fetched_fingerprints_are_classified_against_the_confirmed_ones(self):
+        ThumbprintStore(self.path).trust({'esxi-1': 'AA', 'esxi-2': 'BB'}, {'esxi-1': 'ESXi', 'esxi-2': 'ESXi'})
+        statuses = ThumbprintStore(self.path).classify({'esxi-1': 'AA', 'esxi-2': 'CC', 'esxi-3': 'DD'})
+        self.assertEqual(statuses, {'esxi-1': UNCHANGED, 'esxi-2': CHANGED, 'esxi-3': NEW})
+
+    def test_saves_of_concurrent_imports_are_merged(self):
+        # Every store was read before any of the others saved
+        stores = [ThumbprintStore(self.path) for _ in range(8)]
+        threads = [threading.Thread(target=store.trust, args=({'esxi-{}'.format(idx): str(idx)}, {}))
+                   for idx, store in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store = ThumbprintStore(self.path)
+        self.assertEqual({fqdn: store.get(fqdn) for fqdn in store.thumbprints},
+                         {'esxi-{}'.format(idx): str(idx) for idx in range(8)})
+
+    def test_store_without_a_path_remembers_only_this_run(self):
+        store = ThumbprintStore()
+        store.trust({'esxi-1': 'AA'}, {})
+        self.assertEqual(store.get('esxi-1'), 'AA')
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_unreadable_store_is_ignored(self):
+        with open(self.path, 'w') as store_file:
+            store_file.write('{not json')
+        self.assertEqual(ThumbprintStore(self.path).thumbprints, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
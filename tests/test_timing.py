@@ -0,0 +1,59 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the run time accounting with overlapping waits
+
+__author__ = 'jradhakrishna'
+
+import asyncio
+import threading
+import time
+import unittest
+from Utils.timing import RunTimer
+
+WAIT = 0.2
+
+
+class RunTimerTest(unittest.TestCase):
+    def test_concurrent_thread_waits_count_once(self):
+        timer = RunTimer()
+        threads = [threading.Thread(target=timer.sleep, args=(WAIT,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        summary = timer.summary()
+        self.assertGreaterEqual(summary['waiting'], WAIT)
+        self.assertLess(summary['waiting'], 2 * WAIT)
+        self.assertLessEqual(summary['waiting'], summary['total'])
+
+    def test_concurrent_coroutine_waits_count_once(self):
+        timer = RunTimer()
+
+        async def run():
+            await asyncio.gather(*[timer.asleep(WAIT) for _ in range(4)])
+        asyncio.new_event_loop().run_until_complete(run())
+        summary = timer.summary()
+        self.assertGreaterEqual(summary['waiting'], WAIT)
+        self.assertLess(summary['waiting'], 2 * WAIT)
+        self.assertLessEqual(summary['waiting'], summary['total'])
+
+    def test_sequential_waits_add_up(self):
+        timer = RunTimer()
+        timer.sleep(WAIT / 2)
+        time.sleep(WAIT / 2)
+        timer.sleep(WAIT / 2)
+        summary = timer.summary()
+        self.assertGreaterEqual(summary['waiting'], WAIT)
+        self.assertLess(summary['waiting'], summary['total'])
+        self.assertGreaterEqual(summary['other'], WAIT / 2 - 0.05)
+
+    def test_wait_in_progress_is_counted(self):
+        timer = RunTimer()
+        thread = threading.Thread(target=timer.sleep, args=(WAIT,))
+        thread.start()
+        time.sleep(WAIT / 2)
+        self.assertGreater(timer.summary()['waiting'], 0)
+        thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of the policy driven uplink solver
+
+__author__ = 'jradhakrishna'
+
+import time
+import unittest
+from clusters.uplinksolver import UplinkSolver
+
+SPEEDS = [1000, 10000, 25000, 40000]
+
+
+def vmnics(count, speeds=SPEEDS):
+    return [{"name": 'vmnic{}'.format(idx), "linkSpeedMB": speeds[idx % len(speeds)], "isActive": True}
+            for idx in range(count)]
+
+
+def dvs_speeds(alternative):
+    return [sum(key[0] * count for key, count in counts.items()) for counts in alternative]
+
+
+class UplinkSolverTest(unittest.TestCase):
+    def test_fastest_gives_the_overlay_dvs_the_fastest_active_pnics(self):
+        nics = vmnics(4) + [{"name": 'vmnic4', "linkSpeedMB": 100000, "isActive": False}]
+        solver = UplinkSolver(['overlay', 'vds-2'])
+        assignment = solver.apply(solver.alternatives(nics)[0], nics)
+        self.assertEqual(assignment, [{'id': 'vmnic3', 'vdsName': 'overlay'}, {'id': 'vmnic2', 'vdsName': 'overlay'}])
+
+    def test_balance_evens_out_the_link_speed(self):
+        nics = vmnics(4, [10000, 10000, 25000, 25000])
+        alternative = UplinkSolver(['overlay', 'vds-2'], 'balance').alternatives(nics)[0]
+        self.assertEqual(dvs_speeds(alternative), [35000, 35000])
+
+    def test_balance_gives_every_dvs_its_uplinks(self):
+        for alternative in UplinkSolver(['overlay', 'vds-2', 'vds-3'], 'balance').alternatives(vmnics(6)):
+            self.assertTrue(all(sum(counts.values()) >= 2 for counts in alternative))
+
+    def test_balance_of_many_pnics_and_dvses_is_instant(self):
+        solver = UplinkSolver(['overlay', 'vds-2', 'vds-3', 'vds-4', 'vds-5'], 'balance')
+        start = time.monotonic()
+        alternatives = solver.alternatives(vmnics(16))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(len(alternatives), 5)
+
+    def test_hosts_lacking_the_alternative_fall_back_to_their_own(self):
+        solver = UplinkSolver(['overlay', 'vds-2'])
+        hosts = [{"hostName": 'h1', "vmNics": vmnics(4)}, {"hostName": 'h2', "vmNics": vmnics(2)}]
+        assignments = solver.assign(hosts, solver.alternatives(hosts[0]['vmNics'])[0])
+        self.assertEqual(solver.fallbacks, ['h2'])
+        self.assertEqual([nic['id'] for nic in assignments['h2']], ['vmnic1', 'vmnic0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of deriving the vmnics common to all hosts from the cluster discovery
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from clusters.vmniccompatibility import VmnicCompatibility
+
+
+def vmnic(name, speed=10000, active=True, vds_name=None):
+    return {"name": name, "linkSpeedMB": speed, "isActive": active, "vdsName": vds_name}
+
+
+class VmnicCompatibilityTest(unittest.TestCase):
+    def test_common_vmnics_match_by_name_speed_and_state(self):
+        hosts = [{"hostName": 'h1', "vmNics": [vmnic('vmnic0', vds_name='vds-1'), vmnic('vmnic2'), vmnic('vmnic3')]},
+                 {"hostName": 'h2', "vmNics": [vmnic('vmnic2'), vmnic('vmnic3', 25000)]}]
+        self.assertEqual([nic['name'] for nic in VmnicCompatibility(hosts).common()], ['vmnic2'])
+
+    def test_hosts_lacking_what_all_the_others_have_are_named(self):
+        hosts = [{"hostName": 'h1', "vmNics": [vmnic('vmnic2'), vmnic('vmnic3')]},
+                 {"hostName": 'h2', "vmNics": [vmnic('vmnic2')]},
+                 {"hostName": 'h3', "vmNics": [vmnic('vmnic2'), vmnic('vmnic3')]}]
+        breaking = VmnicCompatibility(hosts).breaking_hosts()
+        self.assertEqual({host: [nic['name'] for nic in nics] for host, nics in breaking.items()}, {'h2': ['vmnic3']})
+
+    def test_discovery_without_vmnics_is_not_used(self):
+        compatibility = VmnicCompatibility([{"hostName": 'h1', "vmNics": None}])
+        self.assertFalse(compatibility.discovered)
+        self.assertEqual(compatibility.common(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
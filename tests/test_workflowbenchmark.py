@@ -0,0 +1,33 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Tests of comparing benchmark runs
+
+__author__ = 'jradhakrishna'
+
+import unittest
+from benchmark.workflowbenchmark import COMPARED_METRICS, compare, failed_scenarios, peak_rss_kb
+
+
+def scenario(name, value, exit_code=0):
+    result = {metric: value for metric in COMPARED_METRICS}
+    result.update({"name": name, "exitCode": exit_code, "failed": exit_code != 0})
+    return result
+
+
+class WorkflowBenchmarkTest(unittest.TestCase):
+    def test_regressions_above_the_threshold_are_reported(self):
+        regressions = compare({"scenarios": [scenario('a', 100)]}, {"scenarios": [scenario('a', 120)]}, 10.0)
+        self.assertEqual(sorted(metric for _, metric, _ in regressions), sorted(COMPARED_METRICS))
+
+    def test_failed_scenarios_are_not_compared(self):
+        baseline = {"scenarios": [scenario('a', 100), scenario('b', 1, exit_code=1)]}
+        current = {"scenarios": [scenario('a', 1, exit_code=1), scenario('b', 100)]}
+        self.assertEqual(compare(baseline, current, 10.0), [])
+        self.assertEqual(failed_scenarios(current), ['a'])
+
+    def test_peak_rss_is_in_kilobytes_on_every_platform(self):
+        self.assertEqual(peak_rss_kb(2048, 'linux'), 2048)
+        self.assertEqual(peak_rss_kb(2048 * 1024, 'darwin'), 2048)
+
+
+if __name__ == '__main__':
+    unittest.main()
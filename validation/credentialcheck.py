@@ -0,0 +1,93 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: SSH login check of the host and VxRail Manager credentials, run before they go into the import
+
+__author__ = 'jradhakrishna'
+
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from validation.tableformat import format_table
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+DEFAULT_SSH_PORT = 22
+DEFAULT_SSH_TIMEOUT = 10
+DEFAULT_SSH_WORKERS = 8
+# Command run over the admin session to check the root password of the VxRail Manager, root can't log in directly
+SU_COMMAND = 'su -c true root'
+TABLE_COLUMNS = ['Role', 'FQDN', 'Username', 'Problem']
+
+
+class CredentialCheck:
+    def __init__(self, workers=DEFAULT_SSH_WORKERS, timeout=DEFAULT_SSH_TIMEOUT, port=DEFAULT_SSH_PORT):
+        self.workers = workers
+        self.timeout = timeout
+        self.port = port
+        if paramiko is not None:
+            # Failed logins are reported in one table, not logged one by one
+            logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+
+    @property
+    def available(self):
+        return paramiko is not None
+
+    def check(self, credentials):
+        # credentials are {"role", "fqdn", "address", "username", "password"}, with "suPassword" when the root
+        # password is checked through su. Returns {"credential", "field", "problem"} of every one that failed,
+        # field is the rejected password, None when the host couldn't be reached.
+        if not credentials:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(credentials))) as pool:
+            results = list(pool.map(self.check_one, credentials))
+        return [{"credential": credential, "field": field, "problem": problem}
+                for credential, (field, problem) in zip(credentials, results) if problem]
+
+    def check_until_accepted(self, credentials, correct):
+        # Checks the credentials, then only the failed ones again after correct(failures) has updated them, until
+        # none fails. correct returns the failures to check again.
+        failures = self.check(credentials)
+        while failures:
+            failures = self.check([failure['credential'] for failure in correct(failures)])
+
+    def check_one(self, credential):
+        client = paramiko.SSHClient()
+        # The host keys are only fetched and confirmed in the next stage
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(credential['address'], self.port, credential['username'], credential['password'],
+                           timeout=self.timeout, auth_timeout=self.timeout, banner_timeout=self.timeout,
+                           look_for_keys=False, allow_agent=False)
+            if credential.get('suPassword') is not None and not self.__su(client, credential['suPassword']):
+                return 'suPassword', 'root password rejected'
+            return None, None
+        except paramiko.AuthenticationException:
+            return 'password', 'password rejected'
+        except (socket.timeout, paramiko.SSHException, OSError) as e:
+            return None, 'unreachable: {}'.format(e or type(e).__name__)
+        finally:
+            client.close()
+
+    def __su(self, client, password):
+        channel = client.get_transport().open_session(timeout=self.timeout)
+        channel.settimeout(self.timeout)
+        channel.get_pty()
+        channel.exec_command(SU_COMMAND)
+        # su flushes the terminal before it reads, the password is only sent once it prompts for it
+        output = b''
+        deadline = time.monotonic() + self.timeout
+        while b'assword' not in output and time.monotonic() < deadline and not channel.exit_status_ready():
+            output += channel.recv(1024)
+        channel.sendall(password.encode('utf-8') + b'\n')
+        if not channel.status_event.wait(max(deadline - time.monotonic(), 0)):
+            raise socket.timeout('su did not finish')
+        return channel.recv_exit_status() == 0
+
+    @staticmethod
+    def format_table(failures):
+        rows = [[failure['credential']['role'], failure['credential']['fqdn'], failure['credential']['username'],
+                 failure['problem']] for failure in failures]
+        return format_table(TABLE_COLUMNS, rows)
@@ -0,0 +1,48 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Forward and reverse DNS check of the hosts and appliances of the import
+
+__author__ = 'jradhakrishna'
+
+from validation.tableformat import format_table
+
+TABLE_COLUMNS = ['Role', 'FQDN', 'Expected IP', 'Forward', 'Reverse', 'Problem']
+
+
+class DnsConsistencyCheck:
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    def check(self, records):
+        # records are {"role", "fqdn", "ipAddress"}, ipAddress None when only DNS knows it.
+        # Returns one row per record that doesn't resolve forward and back to itself.
+        records = [record for record in records if record.get('fqdn')]
+        forward = self.resolver.resolve_all([record['fqdn'] for record in records])
+        addresses = [record.get('ipAddress') for record in records] + list(forward.values())
+        reverse = self.resolver.reverse_all(addresses)
+        mismatches = []
+        for record in records:
+            fqdn = record['fqdn']
+            expected = record.get('ipAddress')
+            address = forward.get(fqdn)
+            reverse_name = reverse.get(expected or address)
+            problems = []
+            if address is None:
+                problems.append('no A record')
+            elif expected and address != expected:
+                problems.append('A record is not the discovered IP')
+            if (expected or address) and reverse_name is None:
+                problems.append('no PTR record')
+            elif reverse_name is not None and not same_name(reverse_name, fqdn):
+                problems.append('PTR record points elsewhere')
+            if problems:
+                mismatches.append([record['role'], fqdn, expected or '-', address or '-', reverse_name or '-',
+                                   ', '.join(problems)])
+        return mismatches
+
+    @staticmethod
+    def format_table(rows):
+        return format_table(TABLE_COLUMNS, rows)
+
+
+def same_name(left, right):
+    return left.rstrip('.').lower() == right.rstrip('.').lower()
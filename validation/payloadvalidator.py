@@ -0,0 +1,119 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Local checks of the import payload, run before the remote validations API
+
+__author__ = 'jradhakrishna'
+
+GENEVE_VLAN_MIN = 0
+GENEVE_VLAN_MAX = 4094
+SUPPORTED_DATASTORE_TYPES = ['VSAN', 'FC']
+HOST_SPEC_FIELDS = ['ipAddress', 'hostName', 'username', 'password']
+
+
+class PayloadValidator:
+    def __init__(self, datastore_type, hosts, is_3x_4x_migration_env=False):
+        # hosts as discovered for the cluster, {"hostName": ..., "vmNics": [{"name": ...}, ...]}, the vmnic names
+        # of a host discovered without its pnics are not checked
+        self.datastore_type = datastore_type
+        self.host_pnics = {host['hostName']: {vmnic['name'] for vmnic in host['vmNics']} if host.get('vmNics') else None
+                           for host in hosts}
+        self.is_3x_4x_migration_env = is_3x_4x_migration_env
+
+    def validate(self, payload, is_primary):
+        # Returns the list of problems found, empty when the payload looks good
+        errors = []
+        if is_primary:
+            cluster_spec = self.__required(payload, errors, 'clusterSpec')
+            nsxt_spec = self.__required(payload, errors, 'nsxTSpec')
+            if nsxt_spec is not None and not nsxt_spec.get('licenseKey'):
+                errors.append('nsxTSpec.licenseKey: NSX-T license is missing')
+        else:
+            self.__required(payload, errors, 'domainId')
+            cluster_specs = self.__required(payload, errors, 'computeSpec', 'clusterSpecs')
+            cluster_spec = cluster_specs[0] if cluster_specs else None
+            if cluster_specs is not None and len(cluster_specs) != 1:
+                errors.append('computeSpec.clusterSpecs: exactly one cluster is imported at a time')
+        if cluster_spec is None:
+            return errors
+        for field in ['name', 'vxRailDetails', 'datastoreSpec', 'networkSpec', 'hostSpecs']:
+            self.__required(cluster_spec, errors, field)
+        self.__check_datastore(cluster_spec.get('datastoreSpec'), errors)
+        self.__check_network(cluster_spec.get('networkSpec'), errors)
+        self.__check_hosts(cluster_spec.get('hostSpecs'), cluster_spec.get('networkSpec'), errors)
+        return errors
+
+    def __required(self, node, errors, *keys):
+        for idx, key in enumerate(keys):
+            if not isinstance(node, dict) or node.get(key) in (None, '', [], {}):
+                errors.append('{}: missing'.format('.'.join(keys[:idx + 1])))
+                return None
+            node = node[key]
+        return node
+
+    def __check_datastore(self, datastore_spec, errors):
+        if datastore_spec is None:
+            return
+        if self.datastore_type not in SUPPORTED_DATASTORE_TYPES:
+            errors.append('datastoreSpec: primary datastore type {} is not supported, expected one of {}'
+                          .format(self.datastore_type, SUPPORTED_DATASTORE_TYPES))
+            return
+        vsan = datastore_spec.get('vsanDatastoreSpec')
+        vmfs = datastore_spec.get('vmfsDatastoreSpec')
+        if self.datastore_type == 'VSAN':
+            if vmfs:
+                errors.append('datastoreSpec.vmfsDatastoreSpec: not expected for a VSAN datastore')
+            if not vsan or not vsan.get('datastoreName'):
+                errors.append('datastoreSpec.vsanDatastoreSpec: VSAN datastore name is missing')
+            elif not vsan.get('licenseKey'):
+                errors.append('datastoreSpec.vsanDatastoreSpec.licenseKey: VSAN license is missing')
+        else:
+            if vsan:
+                errors.append('datastoreSpec.vsanDatastoreSpec: a VSAN license is not used by an FC datastore')
+            fc_specs = (vmfs or {}).get('fcSpec') or []
+            if not fc_specs or not all(spec.get('datastoreName') for spec in fc_specs):
+                errors.append('datastoreSpec.vmfsDatastoreSpec.fcSpec: FC datastore name is missing')
+
+    def __check_network(self, network_spec, errors):
+        if network_spec is None:
+            return
+        vds_specs = network_spec.get('vdsSpecs') or []
+        if not vds_specs:
+            errors.append('networkSpec.vdsSpecs: missing')
+        elif not any(vds.get('isUsedByNsxt') for vds in vds_specs):
+            errors.append('networkSpec.vdsSpecs: no DVS is marked for NSX-T overlay traffic')
+        vlan = self.__required(network_spec, errors, 'nsxClusterSpec', 'nsxTClusterSpec')
+        if vlan is None:
+            return
+        vlan = vlan.get('geneveVlanId')
+        if isinstance(vlan, bool) or not isinstance(vlan, int) or not GENEVE_VLAN_MIN <= vlan <= GENEVE_VLAN_MAX:
+            errors.append('networkSpec.nsxClusterSpec.nsxTClusterSpec.geneveVlanId: {} is not a VLAN id between {} and {}'
+                          .format(vlan, GENEVE_VLAN_MIN, GENEVE_VLAN_MAX))
+
+    def __check_hosts(self, host_specs, network_spec, errors):
+        if not host_specs:
+            return
+        dvs_names = {vds.get('name') for vds in (network_spec or {}).get('vdsSpecs') or []}
+        for host_spec in host_specs:
+            host = host_spec.get('hostName') or host_spec.get('ipAddress')
+            missing = [field for field in HOST_SPEC_FIELDS if not host_spec.get(field)]
+            if missing:
+                errors.append('hostSpecs[{}]: missing {}'.format(host, ', '.join(missing)))
+            if 'hostNetworkSpec' not in host_spec:
+                continue
+            vmnics = (host_spec['hostNetworkSpec'] or {}).get('vmNics') or []
+            names = [vmnic.get('id') for vmnic in vmnics]
+            if self.is_3x_4x_migration_env and len(names) != 2:
+                errors.append('hostSpecs[{}]: VMware High Availability (HA) requires 2 vmnics, got {}'
+                              .format(host, len(names)))
+            elif len(names) < 2:
+                errors.append('hostSpecs[{}]: VMware High Availability (HA) requires a minimum of 2 vmnics, got {}'
+                              .format(host, len(names)))
+            if len(set(names)) != len(names):
+                errors.append('hostSpecs[{}]: vmnics {} are assigned more than once'.format(host, names))
+            pnics = self.host_pnics.get(host_spec.get('hostName'))
+            unknown = sorted(name for name in set(names) if pnics is not None and name not in pnics)
+            if unknown:
+                errors.append('hostSpecs[{}]: vmnics {} are not found on the host'.format(host, unknown))
+            unknown_dvs = sorted({vmnic.get('vdsName') for vmnic in vmnics} - dvs_names)
+            if unknown_dvs:
+                errors.append('hostSpecs[{}]: vmnics are assigned to DVS {} not in networkSpec.vdsSpecs'
+                              .format(host, unknown_dvs))
@@ -0,0 +1,13 @@
+# Copyright 2020 VMware, Inc.  All rights reserved. -- VMware Confidential  #
+#  Description: Plain text tables of the pre-flight check findings
+
+__author__ = 'jradhakrishna'
+
+
+def format_table(columns, rows):
+    # Lines of the rows under a header, every column as wide as its widest value
+    widths = [max(len(str(row[idx])) for row in [columns] + rows) for idx in range(len(columns))]
+    lines = []
+    for row in [columns, ['-' * width for width in widths]] + rows:
+        lines.append('  '.join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip())
+    return lines
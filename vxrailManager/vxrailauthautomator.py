@@ -3,24 +3,27 @@
 __author__ = 'jradhakrishna'
 
 from Utils.utils import Utils
+from answers.answerfile import AnswerFile
 import getpass
 
 class VxRailAuthAutomator:
-    def __init__(self, args):
-        self.utils = Utils(args)
+    def __init__(self, args, utils=None):
+        self.utils = utils if utils is not None else Utils(args)
         self.description = "VxRail Manager authentication details"
 
-    def main_func(self):
+    def main_func(self, answers=None):
         three_line_separator = ['', '', '']
+        answers = answers if answers is not None else AnswerFile()
         self.utils.printCyan("Please input VxRail Manager's preconfigure root credentials")
         root_user = "root"
-        root_password =self.__handle_password_input()
+        root_password = answers.secret('rootPassword') or self.__handle_password_input()
 
         print(*three_line_separator, sep='\n')
 
         self.utils.printCyan("Please input VxRail Manager's preconfigured admin credentials")
-        admin_user =  self.utils.valid_input("\033[1m Enter username (mystic): \033[0m", "mystic")
-        admin_password = self.__handle_password_input()
+        admin_user =  self.utils.valid_input("\033[1m Enter username (mystic): \033[0m", "mystic",
+                                             answer=answers.get('adminUsername'))
+        admin_password = answers.secret('adminPassword') or self.__handle_password_input()
 
         print(*three_line_separator, sep='\n')
 
@@ -2,47 +2,106 @@
 
 __author__ = 'jradhakrishna'
 
-import time
+import atexit
 import json
-import copy
+import sys
 import getpass
-import collections.abc
+import argparse
+from urllib.parse import urlparse
 from Utils.utils import Utils
+from Utils import maskedjson, metrics
+from Utils.metrics import DEFAULT_METRICS_FILE
+from Utils.cassette import Cassette
+from Utils.discoverycache import DiscoveryCache, DEFAULT_CACHE_FILE, DEFAULT_CACHE_TTL
+from Utils.journal import StageJournal, DEFAULT_JOURNAL_FILE, STAGES
+from Utils.dnsresolver import DnsResolver, DEFAULT_DNS_TIMEOUT, parse_nameserver
+from Utils.transport import HttpTransport, DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
 from domains.domainsautomator import DomainsAutomator
 from clusters.clustersautomator import ClustersAutomator
+from clusters.vmniccompatibility import VmnicCompatibility, format_vmnic
+from clusters.dvsindex import DvsIndex
+from clusters.uplinksolver import UplinkSolver, POLICIES, DEFAULT_POLICY, host_vmnics
 from nsxt.nsxtautomator import NSXTAutomator
 from vxrailManager.vxrailauthautomator import VxRailAuthAutomator
 from license.licenseautomator import LicenseAutomator
 from hosts.hostsautomator import HostsAutomator
+from hosts.thumbprintstore import ThumbprintStore, DEFAULT_THUMBPRINTS_FILE
+from answers.answerfile import AnswerFile
+from batch.batchimporter import BatchImporter
+from validation.payloadvalidator import PayloadValidator
+from validation.dnscheck import DnsConsistencyCheck
+from validation.credentialcheck import CredentialCheck, DEFAULT_SSH_PORT, DEFAULT_SSH_TIMEOUT, DEFAULT_SSH_WORKERS
 
 MASKED_KEYS = ['password', 'nsxManagerAdminPassword']
 UNMANAGED_CLUSTERS_CRITERION = 'UNMANAGED_CLUSTERS_IN_VCENTER'
 UNMANAGED_CLUSTER_CRITERION = 'UNMANAGED_CLUSTER_IN_VCENTER'
 MATCHING_VMNIC_CRITERION = 'UNMANAGED_CLUSTER_IN_VCENTER_MATCHING_PNICS_ACROSS_HOSTS'
 REQ_VCF_VER = ['4.5']
+DVS_MODES = {'new': 'Create New DVS', 'existing': 'Use Existing DVS'}
 
 
 class VxRaiWorkloadAutomator:
-    def __init__(self):
-
-        args = []
-        args.append("localhost")
-        args.append(input("\033[1m Enter the SSO username: \033[0m"))
-        args.append(getpass.getpass("\033[1m Enter the SSO password: \033[0m"))
-        self.utils = Utils(args)
-        self.utils.printGreen('Welcome to VxRail Workload Automator')
-        self.domains = DomainsAutomator(args)
-        self.hosts = HostsAutomator(args)
-        self.clusters = ClustersAutomator(args)
-        self.nsxt = NSXTAutomator(args)
-        self.vxrailmanager = VxRailAuthAutomator(args)
-        self.licenses = LicenseAutomator(args)
+    def __init__(self, options=None, utils=None, answers=None):
+        self.options = options if options is not None else parse_options([])
+        if answers is None:
+            answers = AnswerFile.load(self.options.answers) if self.options.answers else AnswerFile()
+            if self.options.batch:
+                answers = AnswerFile(BatchImporter.load(self.options.batch).get('defaults'))
+        self.answers = answers
+        # With an answer file the workflow runs headless, prompting only for what the file leaves out
+        self.headless = bool(self.answers) or bool(self.options.batch)
+        if utils is None:
+            args = []
+            args.append(urlparse(self.options.sddc_url).netloc if self.options.sddc_url else "localhost")
+            args.append(self.answers.get('sddcManager', 'username') or
+                        input("\033[1m Enter the SSO username: \033[0m"))
+            args.append(self.answers.secret('sddcManager', 'password') or
+                        getpass.getpass("\033[1m Enter the SSO password: \033[0m"))
+            transport = HttpTransport(self.options.pool_size, self.options.connect_timeout, self.options.read_timeout)
+            cache = DiscoveryCache(self.options.cache_file, self.options.cache_ttl)
+            if self.options.refresh:
+                cache.invalidate(args[0])
+            resolver = DnsResolver(self.options.nameserver, self.options.dns_timeout)
+            cassette = None
+            if self.options.record or self.options.replay:
+                cassette = Cassette(self.options.record or self.options.replay, replay=bool(self.options.replay))
+            utils = Utils(args, transport, cache=cache, resolver=resolver, base_url=self.options.sddc_url,
+                          cassette=cassette)
+            if cassette is not None:
+                atexit.register(cassette.save)
+            atexit.register(utils.timer.report)
+            atexit.register(utils.metrics.write, self.options.metrics_file)
+            utils.printGreen('Welcome to VxRail Workload Automator')
+        else:
+            # Another import of the same batch, reuse its authenticated session
+            args = [utils.hostname, utils.username, utils.password]
+        self.utils = utils
+        # Imports of a batch report their own results, only a single import is journaled, and only when asked to
+        journal_path = self.options.journal or (DEFAULT_JOURNAL_FILE if self.options.resume or self.options.redo
+                                                else None)
+        self.journal = StageJournal(None if self.options.batch else journal_path, args[0], MASKED_KEYS)
+        if self.options.resume or self.options.redo:
+            self.journal.resume(self.options.redo)
+        elif self.journal.path:
+            self.journal.start()
+        self.domains = DomainsAutomator(args, self.utils)
+        self.hosts = HostsAutomator(args, self.utils, ThumbprintStore(self.options.known_thumbprints))
+        self.clusters = ClustersAutomator(args, self.utils)
+        self.nsxt = NSXTAutomator(args, self.utils)
+        self.vxrailmanager = VxRailAuthAutomator(args, self.utils)
+        self.licenses = LicenseAutomator(args, self.utils)
         self.hostname = args[0]
 
-    def let_user_pick(self, domain_selection_text, options):
+    def let_user_pick(self, domain_selection_text, options, answer=None):
         self.utils.printCyan(domain_selection_text)
         for idx, element in enumerate(options):
             self.utils.printBold("{}) {}".format(idx + 1, element['name']))
+        if answer is not None:
+            for idx, element in enumerate(options):
+                if element['name'] == answer:
+                    self.utils.printBold("Selected by the answer file: {}".format(answer))
+                    return idx
+            self.utils.printYellow("** '{}' from the answer file is not one of the options".format(answer))
         while (True):
             inputstr = input("\033[1m Enter your choice(number): \033[0m")
             try:
@@ -105,39 +164,29 @@ class VxRaiWorkloadAutomator:
         nsxtSpec["licenseKey"] = licenses_payload['licenseKeys']['NSX-T']
         return nsxtSpec
 
-    def maskPasswords(self, obj):
-        for k, v in obj.items():
-            if isinstance(v, collections.abc.Mapping):
-                obj[k] = self.maskPasswords(v)
-            elif isinstance(v, list):
-                for elem in v:
-                    if isinstance(elem, dict) or isinstance(elem, list):
-                        self.maskPasswords(elem)
-            elif k in MASKED_KEYS:
-                obj[k] = '*******'
-            else:
-                obj[k] = v
-        return obj
-
-    def getSystemDvs(self, dvsSpecs, dataStoreType):
-        supported_pgs_for_datastore = {
-            'VSAN': {'MANAGEMENT', 'VSAN', 'VMOTION'},
-            'FC': {'MANAGEMENT', 'VMOTION'}
-        }
-        if len(dvsSpecs) > 0 :
-            for dvs in dvsSpecs:
-                if "portGroupSpecs" in dvs and len(dvs["portGroupSpecs"]) > 0:
-                    available_pgs =set()
-                    for pg in dvs["portGroupSpecs"]:
-                        if "transportType" in pg:
-                            available_pgs.add(pg["transportType"])
-            supported_pgs = supported_pgs_for_datastore.get(dataStoreType)
-            if supported_pgs.issubset(available_pgs):
-                return dvs
-        return None
+    def answered_vmnics(self, vmnic_maps, is_3x_4x_migration_env):
+        # vmnic names from the answer file, None when missing or not acceptable for HA
+        answered = self.answers.get('dvs', 'vmnics')
+        if not answered:
+            return None
+        available = [element['name'] for element in vmnic_maps]
+        unknown = [name for name in answered if name not in available]
+        if unknown:
+            self.utils.printYellow("** vmnics {} from the answer file are not compatible".format(unknown))
+            return None
+        if (is_3x_4x_migration_env and len(answered) != 2) or len(answered) < 2:
+            self.utils.printYellow("** VMware High Availability (HA) requires {} vmnics".format(
+                "2" if is_3x_4x_migration_env else "a minimum of 2"))
+            return None
+        return answered
+
+    def print_result(self, status, **details):
+        result = {"status": status}
+        result.update(details)
+        print(json.dumps(result, indent=2, sort_keys=True))
 
     def check_sddc_manager_version(self):
-        url = 'https://' + self.hostname + '/v1/sddc-managers'
+        url = self.utils.url('/v1/sddc-managers')
         sddc_json = self.utils.get_request(url)
         sddc_ver = None
         for domain in sddc_json['elements']:
@@ -151,14 +200,64 @@ class VxRaiWorkloadAutomator:
 
     @property
     def initApp(self):
-        self.check_sddc_manager_version()
+        self.utils.set_deadline(self.options.deadline)
+        with metrics.stage('check_sddc_manager_version'):
+            self.check_sddc_manager_version()
+        plan = self.build_import()
+        result = self.submit_import(plan)
+        if self.headless:
+            self.print_result('SUBMITTED', domain=plan['domain'], cluster=plan['cluster'], isPrimary=plan['isPrimary'],
+                              **result)
+            exit(0)
+        exit(1)
+
+    def run_batch(self):
+        self.utils.set_deadline(self.options.deadline)
+        with metrics.stage('check_sddc_manager_version'):
+            self.check_sddc_manager_version()
+        importer = BatchImporter(BatchImporter.load(self.options.batch),
+                                 lambda answers: VxRaiWorkloadAutomator(self.options, self.utils, answers),
+                                 self.options.concurrency)
+        results = importer.run()
+        print(json.dumps(results, indent=2, sort_keys=True))
+        exit(0 if all(result['status'] == 'SUCCEEDED' for result in results) else 1)
+
+    def build_import(self):
+        # Runs discovery and the prompts stage by stage, returns the import payload with where it has to go.
+        # Every completed stage is journaled so that a resumed run continues after it, the payload is assembled from
+        # them again
+        discovery = self.journal.stage('discovery', self.discover)
+        if not self.options.skip_dns_check:
+            self.check_dns(self.discovery_dns_records(discovery))
+        self.hosts.password_map = self.journal.stage('hosts', self.enter_host_passwords, discovery, secret=True)
+        dvs = self.journal.stage('dvs', self.select_dvs, discovery)
+        nsxt_payload = self.journal.stage('nsxt', self.nsxt.main_func, discovery['domainId'], discovery['isPrimary'],
+                                          discovery['is3x4xMigrationEnv'], self.answers.section('nsxt'),
+                                          *self.tep_ip_count(discovery, dvs))
+        if not self.options.skip_dns_check:
+            self.check_dns(self.nsxt_dns_records(nsxt_payload))
+        vxm_payload = self.journal.stage('vxrailManager', self.vxrailmanager.main_func,
+                                         self.answers.section('vxrailManager'))
+        credentials = self.journal.stage('credentials', self.verify_credentials, discovery, vxm_payload, secret=True)
+        self.hosts.password_map = credentials['passwords']
+        vxm_payload = credentials['vxrailManager']
+        thumbprints = self.journal.stage('thumbprints', self.fetch_thumbprints, discovery, vxm_payload,
+                                         credentials['vxrmFqdn'])
+        print(*['', '', ''], sep='\n')
+        licenses_payload = self.journal.stage('licenses', self.licenses.main_func,
+                                              discovery['datastore']['type'] != 'VSAN', self.answers.section('licenses'))
+        with metrics.stage('payload'):
+            return self.assemble_import(discovery, dvs, nsxt_payload, vxm_payload, thumbprints, licenses_payload)
+
+    def discover(self):
+        # Domain and cluster selection, and the discovery of the selected cluster
         #Get domains
         domains = self.domains.get_domains()
         domains_user_selection = list(map(lambda x: {"name": x['name'], "id": x['id']}, domains["elements"]))
         three_line_separator = ['', '', '']
         print(*three_line_separator, sep='\n')
         domain_selection_text = "Please choose the domain to which cluster has to be imported:"
-        domain_index = self.let_user_pick(domain_selection_text, domains_user_selection)
+        domain_index = self.let_user_pick(domain_selection_text, domains_user_selection, self.answers.get('domain'))
 
         isPrimary = len(domains["elements"][domain_index]['clusters']) == 0
 
@@ -186,37 +285,26 @@ class VxRaiWorkloadAutomator:
 
         #Get Unmanaged Clusters
         self.utils.printGreen("Getting unmanaged clusters info...")
-        unmanagedclusterspayload = {}
-        unmanagedclusterspayload["name"] = UNMANAGED_CLUSTERS_CRITERION
-
-        clusters_response = \
-            self.clusters.get_unmanaged_clusters(
-                unmanagedclusterspayload,
-                domains_user_selection[domain_index]["id"])
-        clustersqueriesurl = 'https://' + self.hostname + clusters_response.headers['Location']
-
-        #Poll on get unmanaged clusters queries
-        clusters_query_response = self.clusters.poll_queries(clustersqueriesurl)
+        clusters_query_response = self.clusters.query_unmanaged_clusters(UNMANAGED_CLUSTERS_CRITERION,
+                                                                         domains_user_selection[domain_index]["id"])
         clusters_user_selection = list(map(lambda x: {"name": x['name']}, clusters_query_response["elements"]))
         print(*three_line_separator, sep='\n')
         clusters_selection_text = "Please choose the cluster:"
-        clusters_index = self.let_user_pick(clusters_selection_text, clusters_user_selection)
+        clusters_index = self.let_user_pick(clusters_selection_text, clusters_user_selection,
+                                            self.answers.get('cluster'))
+
+        # Everything below only depends on the selected cluster, fetch it while the operator answers prompts
+        self.clusters.prefetch_cluster(domains_user_selection[domain_index]["id"],
+                                       clusters_user_selection[clusters_index]["name"])
+        self.nsxt.prefetch()
+        self.licenses.prefetch()
         self.utils.printGreen("Getting cluster details...")
 
         # Get Unmanaged Cluster
-        unmanagedclusterpayload = {}
-        unmanagedclusterpayload["name"] = UNMANAGED_CLUSTER_CRITERION
-        cluster_response = \
-            self.clusters.get_unmanaged_cluster(
-                unmanagedclusterpayload,
-                domains_user_selection[domain_index]["id"],
-                clusters_user_selection[clusters_index]["name"])
-
-        clusterqueryurl = 'https://' + self.hostname + cluster_response.headers['Location']
-
-        # Poll on get unmanaged cluster queries
-        cluster_query_response = self.clusters.poll_queries(clusterqueryurl)
-        time.sleep(5)
+        cluster_query_response = self.clusters.query_unmanaged_cluster(
+            UNMANAGED_CLUSTER_CRITERION,
+            domains_user_selection[domain_index]["id"],
+            clusters_user_selection[clusters_index]["name"])
 
         #Primary DataStore Info
         primary_datastore_info = {
@@ -229,11 +317,29 @@ class VxRaiWorkloadAutomator:
         self.utils.printBold("Type - {}".format(primary_datastore_info['type']))
 
         #Hosts in the unmanaged cluster
-        hosts_fqdn = list(map(lambda x: {"hostName": x['fqdn'], "ipAddress": x['ipAddress'], "vmNics": x['vmNics']},
+        hosts_fqdn = list(map(lambda x: {"hostName": x['fqdn'], "ipAddress": x['ipAddress'], "vmNics": x.get('vmNics')},
                               cluster_query_response["elements"][0]["hosts"]))
+        if not VmnicCompatibility(hosts_fqdn).discovered:
+            # The matching pnics query is needed for a new DVS, run it while the host passwords are entered
+            self.clusters.prefetch_unmanaged_cluster(MATCHING_VMNIC_CRITERION,
+                                                     domains_user_selection[domain_index]["id"],
+                                                     clusters_user_selection[clusters_index]["name"])
         print(*three_line_separator, sep='\n')
 
-        self.hosts.main_func(hosts_fqdn)
+        return {
+            "domainId": domains_user_selection[domain_index]["id"],
+            "domain": domains_user_selection[domain_index]["name"],
+            "cluster": clusters_user_selection[clusters_index]["name"],
+            "isPrimary": isPrimary,
+            "is3x4xMigrationEnv": is_3x_4x_migration_env,
+            "datastore": primary_datastore_info,
+            "hosts": hosts_fqdn,
+            "vdsSpecs": cluster_query_response["elements"][0]["vdsSpecs"]
+        }
+
+    def enter_host_passwords(self, discovery):
+        hosts_fqdn = discovery['hosts']
+        self.hosts.main_func(hosts_fqdn, self.answers.section('hosts'))
         # self.utils.printCyan("Below hosts are discovered. Enter the preconfigured root passwords for all esxis :")
         # self.utils.printYellow("**Entered password is applicable for all the hosts")
         # for idx, element in enumerate(hosts_fqdn):
@@ -243,58 +349,48 @@ class VxRaiWorkloadAutomator:
         #                                                None, None, None, True)):
         #     self.utils.printRed("Passwords don't match")
         #     hosts_password = self.utils.valid_input("\033[1m Enter hosts password: \033[0m", None, None, None, True)
+        return self.hosts.password_map
 
-        existing_dvs_specs = cluster_query_response["elements"][0]["vdsSpecs"]
+    def select_dvs(self, discovery):
+        three_line_separator = ['', '', '']
+        is_3x_4x_migration_env = discovery['is3x4xMigrationEnv']
+        existing_dvs_specs = discovery['vdsSpecs']
+        dvs_index = DvsIndex(existing_dvs_specs)
         is_existing_vds = False
 
-        existing_dvs_spec = None
-        #Get the system vds if there is only one available
-        #Else leave it upto Workflow Validation to verify
-        if len(existing_dvs_specs) == 1:
-            existing_dvs_spec = self.getSystemDvs(existing_dvs_specs, primary_datastore_info['type'])
-            # Latest 4.x cluster discovery is not returning niocBandwidthAllocationSpecs in dvs spec.
-            # so adding check before deleting the entry. It is not required for the domain/cluster
-            # API input preparation
-            if 'niocBandwidthAllocationSpecs' in existing_dvs_spec:
-                del existing_dvs_spec['niocBandwidthAllocationSpecs']
+        #Get the system vds carrying the traffic of the primary datastore
+        #If there is none leave it upto Workflow Validation to verify
+        existing_dvs_spec = dvs_index.system_dvs(discovery['datastore']['type'])
+        # Latest 4.x cluster discovery is not returning niocBandwidthAllocationSpecs in dvs spec.
+        # so adding check before deleting the entry. It is not required for the domain/cluster
+        # API input preparation
+        if existing_dvs_spec is not None and 'niocBandwidthAllocationSpecs' in existing_dvs_spec:
+            del existing_dvs_spec['niocBandwidthAllocationSpecs']
 
         # Removing activeUplinks from dvsSpecs[portGroupSpecs] if it is null
-        for dvsSpec in existing_dvs_specs:
-            for pgSpec in dvsSpec['portGroupSpecs']:
-                if 'activeUplinks' in pgSpec and pgSpec['activeUplinks'] is None:
-                    del pgSpec['activeUplinks']
+        dvs_index.strip_null_uplinks()
 
         dvs_selection_text = [{"name": "Create New DVS"}, {"name" : "Use Existing DVS"} ]
-        dvs_index = 0
+        dvs_option = 0
         dvs_helper_text = ''
         print(*three_line_separator, sep='\n')
 
         if not is_3x_4x_migration_env:
             dvs_helper_text = "Select the DVS option to proceed"
-            dvs_index = self.let_user_pick(dvs_helper_text, dvs_selection_text)
+            dvs_option = self.let_user_pick(dvs_helper_text, dvs_selection_text,
+                                            DVS_MODES.get(self.answers.get('dvs', 'mode')))
 
         new_dvs_spec = []
-        vmNics = []
-        if dvs_index == 0:
+        vmNics = {}
+        overlay_pg_name = None
+        if dvs_option == 0:
             self.utils.printGreen("Getting compatible vmnic information...")
-            # Get Unmanaged Cluster
-            compatiblevmnicpayload = {}
-            compatiblevmnicpayload["name"] = MATCHING_VMNIC_CRITERION
-            compatible_host_response = \
-                self.clusters.get_unmanaged_cluster(
-                    compatiblevmnicpayload,
-                    domains_user_selection[domain_index]["id"],
-                    clusters_user_selection[clusters_index]["name"])
-            compatiblevmnicqueries = 'https://' + self.hostname + compatible_host_response.headers['Location']
-
-            # Poll on get compatible cluster queries
-            compatible_vmnic_response = self.clusters.poll_queries(compatiblevmnicqueries)
-            hosts_pnics = compatible_vmnic_response["elements"][0]["hosts"]
+            compatible_vmnics = self.compatible_vmnics(discovery)
 
-            if len(hosts_pnics) > 0 and  "vmNics" in hosts_pnics[0] and len(hosts_pnics[0]["vmNics"]) > 1:
+            if len(compatible_vmnics) > 1:
                 is_existing_vds = False
                 print(*three_line_separator, sep='\n')
-                new_vds_name = input("\033[1m Enter the New DVS name : \033[0m")
+                new_vds_name = self.answers.get('dvs', 'name') or input("\033[1m Enter the New DVS name : \033[0m")
 
                 new_dvs_spec.append({'name': new_vds_name, 'isUsedByNsxt': True})
                 for spec in existing_dvs_specs:
@@ -302,7 +398,7 @@ class VxRaiWorkloadAutomator:
 
                 vmnic_maps = list(map(lambda x: {"name": x['name'], "speed": str(x['linkSpeedMB']) + 'MB',
                                                  "active": "Active" if x['isActive'] else "Inactive"},
-                                      hosts_pnics[0]["vmNics"]))
+                                      compatible_vmnics))
 
                 print(*three_line_separator, sep='\n')
                 self.utils.printCyan("Please choose the nics for overlay traffic:")
@@ -315,102 +411,209 @@ class VxRaiWorkloadAutomator:
                                                  element['speed'],
                                                  element['active']))
 
-                is_correct_vmnic_selection = True
-                if is_3x_4x_migration_env:
-                    while (is_correct_vmnic_selection):
-                        try:
-                            vmnic_options = list(map(int, input(
-                                "\033[1m Enter your choices(only 2 numbers comma separated): \033[0m").strip().rstrip(
-                                ",").split(
-                                ',')))
-                            while (len(vmnic_options) != 2):
-                                self.utils.printRed(
-                                    'VMware High Availability (HA) requires 2 vmnics. Select only 2 vmnics')
-                                vmnic_options = list(map(int, input(
-                                    "\033[1m Enter your choices(2 numbers comma separated): \033[0m").strip().rstrip(
-                                    ",").split(
-                                    ',')))
-                            print(*three_line_separator, sep='\n')
-                            for index,elem in enumerate(vmnic_options):
-                                temp_vmnic_info = {}
-                                temp_vmnic_info['id'] = vmnic_maps[elem - 1]['name']
-                                temp_vmnic_info['vdsName'] = new_vds_name
-                                vmNics.append(temp_vmnic_info)
-                            is_correct_vmnic_selection = False
-                        except:
-                            print(*three_line_separator, sep='\n')
-                            self.utils.print_error("\033[1m Input a number between 1(included) and {0}(included)\033[0m"
-                                                .format(str(len(vmnic_maps))))
-                            is_correct_vmnic_selection = True
+                answered_vmnics = self.answered_vmnics(vmnic_maps, is_3x_4x_migration_env)
+                if answered_vmnics:
+                    vmNics = {host['hostName']: [{'id': vmnic_name, 'vdsName': new_vds_name}
+                                                 for vmnic_name in answered_vmnics] for host in discovery['hosts']}
                 else:
-                    while (is_correct_vmnic_selection):
-                        try:
-                            vmnic_options = list(map(int, input(
-                                "\033[1m Enter your choices(minimum 2 numbers comma separated): \033[0m").strip().rstrip(
-                                ",").split(
-                                ',')))
-                            while (len(vmnic_options) < 2):
-                                self.utils.printRed(
-                                    'VMware High Availability (HA) requires a minimum of 2 vmnics. Select minimum 2 vmnics')
-                                vmnic_options = list(map(int, input(
-                                    "\033[1m Enter your choices(minimum 2 numbers comma separated): \033[0m").strip().rstrip(
-                                    ",").split(
-                                    ',')))
-                            print(*three_line_separator, sep='\n')
-                            for index,elem in enumerate(vmnic_options):
-                                temp_vmnic_info = {}
-                                temp_vmnic_info['id'] = vmnic_maps[elem - 1]['name']
-                                temp_vmnic_info['vdsName'] = new_vds_name
-                                vmNics.append(temp_vmnic_info)
-                            is_correct_vmnic_selection = False
-                        except:
-                            print(*three_line_separator, sep='\n')
-                            self.utils.print_error("\033[1m Input a number between 1(included) and {0}(included)\033[0m"
-                                                .format(str(len(vmnic_maps))))
-                            is_correct_vmnic_selection = True
+                    print(*three_line_separator, sep='\n')
+                    vmNics = self.assign_uplinks(discovery, compatible_vmnics, vmnic_maps,
+                                                 [spec['name'] for spec in new_dvs_spec])
             else:
                 self.utils.printRed(
                     'VMware High Availability (HA) requires a minimum of 2 vmnics. Found 0 or 1 vmnic')
                 exit(1)
 
-        elif dvs_index == 1:
+        elif dvs_option == 1:
             is_existing_vds = True
-            dvs_names = list(map(lambda x: {"name": x['name']}, existing_dvs_specs))
+            dvs_names = dvs_index.names()
             print(*three_line_separator, sep='\n')
             existing_dvs_helper = "Please select the existing dvs to continue with workload creation: "
-            existing_dvs_index = self.let_user_pick(existing_dvs_helper, dvs_names)
-            existing_dvs_spec = existing_dvs_specs[existing_dvs_index]
+            existing_dvs_idx = self.let_user_pick(existing_dvs_helper, [{"name": name} for name in dvs_names],
+                                                  self.answers.get('dvs', 'name'))
+            existing_dvs_spec = dvs_index.dvs(dvs_names[existing_dvs_idx])
             existing_dvs_spec['isUsedByNsxt'] = True
             print(*three_line_separator, sep='\n')
             # Code to make user select PG to assign vmnics for overlay traffic
-            pg_names = list(map(lambda x: {"name": x['name']}, existing_dvs_spec['portGroupSpecs']))
+            pg_names = dvs_index.port_group_names(existing_dvs_spec['name'])
             existing_pg_helper = "Please select the existing portgroup to assign vmnics for overlay traffic: "
-            existing_pg_index = self.let_user_pick(existing_pg_helper, pg_names)
-            existing_dvs_spec['portGroupSpecs'] = [existing_dvs_spec['portGroupSpecs'][existing_pg_index]]
+            existing_pg_idx = self.let_user_pick(existing_pg_helper, [{"name": name} for name in pg_names],
+                                                 self.answers.get('dvs', 'portGroup'))
+            existing_dvs_spec['portGroupSpecs'] = [dvs_index.port_group(existing_dvs_spec['name'],
+                                                                        pg_names[existing_pg_idx])]
+            overlay_pg_name = pg_names[existing_pg_idx]
             # del existing_dvs_spec['niocBandwidthAllocationSpecs']
             print(*three_line_separator, sep='\n')
+        return {
+            "isExistingVds": is_existing_vds,
+            "existingDvsSpec": existing_dvs_spec,
+            "overlayPortGroup": overlay_pg_name,
+            "newDvsSpecs": new_dvs_spec,
+            "vmNics": vmNics
+        }
 
-        nsxt_payload = self.nsxt.main_func(domains_user_selection[domain_index]["id"], isPrimary, is_3x_4x_migration_env)
-        vxm_payload = self.vxrailmanager.main_func()
-
+    def compatible_vmnics(self, discovery):
+        # vmnics usable on every host, derived from the discovery; the matching pnics query only runs when the
+        # discovery has no vmnics for the hosts
+        compatibility = VmnicCompatibility(discovery['hosts'])
+        if not compatibility.discovered:
+            compatible_vmnic_response = self.clusters.query_unmanaged_cluster(MATCHING_VMNIC_CRITERION,
+                                                                              discovery['domainId'],
+                                                                              discovery['cluster'])
+            hosts_pnics = compatible_vmnic_response["elements"][0]["hosts"]
+            return hosts_pnics[0].get("vmNics") or [] if hosts_pnics else []
+        for host_name, vmnics in compatibility.breaking_hosts().items():
+            self.utils.printYellow("Host {} lacks {} that all the other hosts have, it can't be used for overlay "
+                                   "traffic".format(host_name, ', '.join(format_vmnic(vmnic) for vmnic in vmnics)))
+        return compatibility.common()
+
+    def assign_uplinks(self, discovery, compatible_vmnics, vmnic_maps, dvs_names):
+        # {hostName: vmNics} of the assignment suggested by a policy or picked by hand, dvs_names starts with the
+        # overlay DVS
+        is_3x_4x_migration_env = discovery['is3x4xMigrationEnv']
+        # Hosts discovered without their pnics are taken to have the compatible ones
+        hosts = [dict(host, vmNics=host.get('vmNics') or compatible_vmnics) for host in discovery['hosts']]
+        options = []
+        for policy in POLICIES:
+            if policy != DEFAULT_POLICY and (is_3x_4x_migration_env or len(dvs_names) == 1):
+                continue
+            solver = UplinkSolver(dvs_names, policy, 2, is_3x_4x_migration_env)
+            for alternative in solver.alternatives(compatible_vmnics):
+                options.append({"name": "{} - {}".format(policy, solver.describe(alternative)), "solver": solver,
+                                "alternative": alternative})
+        answer = next((option['name'] for option in options
+                       if option['solver'].policy == self.answers.get('dvs', 'policy')), None)
+        options.append({"name": "Choose the vmnics manually"})
+        choice = options[self.let_user_pick("Please choose the uplink assignment of the hosts:", options, answer)]
+        print(*['', '', ''], sep='\n')
+        if 'solver' not in choice:
+            vmnic_names = self.pick_vmnics(vmnic_maps, is_3x_4x_migration_env)
+            return {host['hostName']: [{'id': vmnic_name, 'vdsName': dvs_names[0]} for vmnic_name in vmnic_names]
+                    for host in hosts}
+        solver = choice['solver']
+        assignments = solver.assign(hosts, choice['alternative'])
+        for host_name, vmnics in assignments.items():
+            self.utils.printBold("{} : {}".format(host_name, ', '.join(
+                '{}->{}'.format(vmnic['id'], vmnic['vdsName']) for vmnic in vmnics) or 'no assignment possible'))
+        if solver.fallbacks:
+            self.utils.printYellow("** Hosts {} lack the vmnics of the chosen assignment, they got their own best one"
+                                   .format(', '.join(solver.fallbacks)))
+        return assignments
+
+    def pick_vmnics(self, vmnic_maps, is_3x_4x_migration_env):
+        # vmnic names picked by number, exactly 2 on 3.x/4.x migration environments and at least 2 otherwise
+        count_text = "only 2 numbers" if is_3x_4x_migration_env else "minimum 2 numbers"
+        while True:
+            try:
+                vmnic_options = list(map(int, input("\033[1m Enter your choices({} comma separated): \033[0m"
+                                                    .format(count_text)).strip().rstrip(",").split(',')))
+                if (is_3x_4x_migration_env and len(vmnic_options) != 2) or len(vmnic_options) < 2:
+                    self.utils.printRed('VMware High Availability (HA) requires {} vmnics. Select {} vmnics'.format(
+                        *(["2", "only 2"] if is_3x_4x_migration_env else ["a minimum of 2", "minimum 2"])))
+                    continue
+                if not all(0 < elem <= len(vmnic_maps) for elem in vmnic_options):
+                    raise ValueError(vmnic_options)
+                print(*['', '', ''], sep='\n')
+                return [vmnic_maps[elem - 1]['name'] for elem in vmnic_options]
+            except ValueError:
+                print(*['', '', ''], sep='\n')
+                self.utils.print_error("\033[1m Input a number between 1(included) and {0}(included)\033[0m"
+                                       .format(str(len(vmnic_maps))))
+
+    def tep_ip_count(self, discovery, dvs):
+        # Every host takes a TEP IP per uplink of the overlay traffic, returns the count and whether it is exact
+        if dvs['isExistingVds']:
+            # Uplinks of an existing DVS are not discovered, the active uplinks of the overlay port group tell how
+            # many there are; without them 2 per host is only a guess
+            overlay_pg = next((pg for pg in dvs['existingDvsSpec'].get('portGroupSpecs') or []
+                               if pg['name'] == dvs.get('overlayPortGroup')), {})
+            uplinks = len(overlay_pg.get('activeUplinks') or [])
+            return len(discovery['hosts']) * (uplinks or 2), bool(uplinks)
+        overlay_dvs = dvs['newDvsSpecs'][0]['name']
+        return sum(len([vmnic for vmnic in host_vmnics(dvs['vmNics'], host['hostName'])
+                        if vmnic['vdsName'] == overlay_dvs]) for host in discovery['hosts']), True
+
+    def verify_credentials(self, discovery, vxm_payload):
+        # Root passwords of the hosts and the VxRail Manager credentials are tried over SSH, all at once, before
+        # SDDC Manager gets them; rejected ones are entered again
+        vxrm_fqdn = self.populatevxrmfqdn(discovery['domainId'], discovery['cluster'])
+        result = {"passwords": self.hosts.password_map, "vxrailManager": vxm_payload, "vxrmFqdn": vxrm_fqdn}
+        if self.options.skip_credential_check:
+            return result
+        check = CredentialCheck(self.options.ssh_workers, self.options.ssh_timeout, self.options.ssh_port)
+        if not check.available:
+            self.utils.printYellow("** paramiko is not installed, the credentials are only checked by SDDC Manager "
+                                   "(pip install paramiko)")
+            return result
+        credentials = [{"role": "ESXi", "fqdn": host['hostName'], "address": host.get('ipAddress') or host['hostName'],
+                        "username": "root", "password": self.hosts.password_map[host['hostName']]}
+                       for host in discovery['hosts']]
+        credentials.append({"role": "VxRail Manager", "fqdn": vxrm_fqdn, "address": vxrm_fqdn,
+                            "username": vxm_payload['adminCredentials']['username'],
+                            "password": vxm_payload['adminCredentials']['password'],
+                            "suPassword": vxm_payload['rootCredentials']['password']})
+        self.utils.printGreen("Checking the SSH credentials of {} hosts and the VxRail Manager..."
+                              .format(len(discovery['hosts'])))
+        check.check_until_accepted(credentials, self.correct_credentials)
+        for credential in credentials[:-1]:
+            self.hosts.password_map[credential['fqdn']] = credential['password']
+        vxm_payload['adminCredentials']['password'] = credentials[-1]['password']
+        vxm_payload['rootCredentials']['password'] = credentials[-1]['suPassword']
+        return result
+
+    def correct_credentials(self, failures):
+        # Lists the failures and asks for the rejected passwords again, returns the failures to check again
+        self.utils.printRed('SSH credentials that did not work:')
+        for line in CredentialCheck.format_table(failures):
+            self.utils.printRed(line)
+        if self.headless:
+            exit(1)
+        retry = []
+        for failure in failures:
+            credential = failure['credential']
+            if failure['field'] is None:
+                answer = input("\033[1m {} can't be reached, enter 'yes' to go on without checking it: \033[0m"
+                               .format(credential['fqdn']))
+                if answer.strip().lower() != 'yes':
+                    exit(1)
+                continue
+            username = 'root' if failure['field'] == 'suPassword' else credential['username']
+            credential[failure['field']] = self.utils.valid_input(
+                "\033[1m Enter the password of {} on {}: \033[0m".format(username, credential['fqdn']), None, None,
+                None, True)
+            retry.append(failure)
+        return retry
+
+    def fetch_thumbprints(self, discovery, vxm_payload, vxrm_fqdn=None):
+        three_line_separator = ['', '', '']
+        hosts_fqdn = discovery['hosts']
         self.utils.printGreen("Getting thumbprints for Hosts and VxRail Manager...")
         print(*three_line_separator, sep='\n')
-        vxrm_fqdn = self.populatevxrmfqdn(domains_user_selection[domain_index]["id"],
-                                          clusters_user_selection[clusters_index]["name"])
-        fqdn_to_thumbprint_dict = self.hosts.get_ssh_thumbprints(hosts_fqdn, domains_user_selection[domain_index]["id"],
+        vxrm_fqdn = vxrm_fqdn or self.populatevxrmfqdn(discovery['domainId'], discovery['cluster'])
+        fqdn_to_thumbprint_dict = self.hosts.get_ssh_thumbprints(hosts_fqdn, discovery['domainId'],
                                                                  vxrm_fqdn, vxm_payload['adminCredentials']['username'],
-                                                                 vxm_payload['adminCredentials']['password'])
+                                                                 vxm_payload['adminCredentials']['password'],
+                                                                 self.answers.get('acceptThumbprints', default=False),
+                                                                 self.options.refresh_thumbprints)
+        return {"vxrmFqdn": vxrm_fqdn, "thumbprints": fqdn_to_thumbprint_dict}
+
+    def assemble_import(self, discovery, dvs, nsxt_payload, vxm_payload, thumbprints, licenses_payload):
+        isPrimary = discovery['isPrimary']
+        is_3x_4x_migration_env = discovery['is3x4xMigrationEnv']
+        primary_datastore_info = discovery['datastore']
+        hosts_fqdn = discovery['hosts']
+        is_existing_vds = dvs['isExistingVds']
+        existing_dvs_spec = dvs['existingDvsSpec']
+        new_dvs_spec = dvs['newDvsSpecs']
+        vmNics = dvs['vmNics']
+        fqdn_to_thumbprint_dict = thumbprints['thumbprints']
         # Updating SSH Thumbprint to VxRail Manager payload
-        vxm_payload['sshThumbprint'] = fqdn_to_thumbprint_dict.get(vxrm_fqdn)
-
-        print(*three_line_separator, sep='\n')
-        ignoreVsanLicense = primary_datastore_info['type'] != 'VSAN'
-        licenses_payload = self.licenses.main_func(ignoreVsanLicense)
+        vxm_payload['sshThumbprint'] = fqdn_to_thumbprint_dict.get(thumbprints['vxrmFqdn'])
 
         cluster_payload = {}
         if isPrimary:
             cluster_payload['clusterSpec'] = {}
-            cluster_payload['clusterSpec']['name'] = clusters_user_selection[clusters_index]["name"]
+            cluster_payload['clusterSpec']['name'] = discovery['cluster']
             cluster_payload['clusterSpec']['skipThumbprintValidation'] = False
             cluster_payload['clusterSpec']['vxRailDetails'] = vxm_payload
             cluster_payload['clusterSpec']['datastoreSpec'] = {
@@ -433,12 +636,6 @@ class VxRaiWorkloadAutomator:
             cluster_payload['nsxTSpec'] = self.populatensxtSpec(
                 nsxt_payload, licenses_payload)
 
-            cluster_payload_copy = copy.deepcopy(cluster_payload)
-            self.maskPasswords(cluster_payload_copy)
-            print(json.dumps(cluster_payload_copy, indent=2, sort_keys=True))
-            input("\033[1m Enter to continue ...\033[0m")
-            self.domains.update_workload_domain(cluster_payload, domains_user_selection[domain_index]["id"])
-
         else:
             cluster_payload['computeSpec'] = {}
             cluster_payload['computeSpec']['clusterSpecs'] = [{}]
@@ -457,22 +654,169 @@ class VxRaiWorkloadAutomator:
                 } if primary_datastore_info['type'] == 'FC' else None
             }
             cluster_payload['computeSpec']['clusterSpecs'][0]['skipThumbprintValidation'] = False
-            cluster_payload['computeSpec']['clusterSpecs'][0]['name'] = clusters_user_selection[clusters_index]["name"]
+            cluster_payload['computeSpec']['clusterSpecs'][0]['name'] = discovery['cluster']
             cluster_payload['computeSpec']['clusterSpecs'][0]['networkSpec'] = self.populatenetworkSpec(
                 is_existing_vds, existing_dvs_spec, new_dvs_spec, nsxt_payload, isPrimary)
             cluster_payload['computeSpec']['clusterSpecs'][0]['vxRailDetails'] = vxm_payload
 
             cluster_payload['computeSpec']['clusterSpecs'][0]['hostSpecs'] = self.hosts.populatehostSpec(
                 is_existing_vds, hosts_fqdn, vmNics, fqdn_to_thumbprint_dict)
-            cluster_payload['domainId'] = domains_user_selection[domain_index]["id"]
+            cluster_payload['domainId'] = discovery['domainId']
+
+        maskedjson.dump(cluster_payload, sys.stdout, MASKED_KEYS)
+        print()
+        if self.options.payload_file:
+            with open(self.options.payload_file, 'w') as payload_file:
+                maskedjson.dump(cluster_payload, payload_file, MASKED_KEYS)
+        # Catch what can be checked locally before any remote validation is spent on it
+        errors = PayloadValidator(primary_datastore_info['type'], hosts_fqdn,
+                                  is_3x_4x_migration_env).validate(cluster_payload, isPrimary)
+        if errors:
+            self.utils.printRed('Import payload failed local validation:')
+            for error in errors:
+                self.utils.printRed('  ' + error)
+            exit(1)
+        return {
+            "domainId": discovery['domainId'],
+            "domain": discovery['domain'],
+            "cluster": discovery['cluster'],
+            "isPrimary": isPrimary,
+            "payload": cluster_payload
+        }
 
-            cluster_payload_copy = copy.deepcopy(cluster_payload)
-            self.maskPasswords(cluster_payload_copy)
-            print (json.dumps(cluster_payload_copy, indent=2, sort_keys=True))
+    def discovery_dns_records(self, discovery):
+        records = [{"role": "ESXi", "fqdn": host['hostName'], "ipAddress": host['ipAddress']}
+                   for host in discovery['hosts']]
+        records.append({"role": "VxRail Manager",
+                        "fqdn": self.populatevxrmfqdn(discovery['domainId'], discovery['cluster']), "ipAddress": None})
+        return records
+
+    @staticmethod
+    def nsxt_dns_records(nsxt_payload):
+        nsxt_spec = nsxt_payload['nsxTSpec']
+        records = [{"role": "NSX-T VIP", "fqdn": nsxt_spec.get('vipFqdn'), "ipAddress": nsxt_spec.get('vip')}]
+        for manager in nsxt_spec.get('nsxManagerSpecs', []):
+            records.append({"role": "NSX-T Manager", "fqdn": manager['networkDetailsSpec'].get('dnsName'),
+                            "ipAddress": manager['networkDetailsSpec'].get('ipAddress')})
+        return records
+
+    def check_dns(self, records):
+        # Every name the import relies on has to resolve forward and back to the same address
+        self.utils.printGreen("Checking forward and reverse DNS of {} names...".format(len(records)))
+        mismatches = DnsConsistencyCheck(self.utils.resolver).check(records)
+        if mismatches:
+            self.utils.printRed('DNS records do not match the discovered hosts and appliances:')
+            for line in DnsConsistencyCheck.format_table(mismatches):
+                self.utils.printRed(line)
+            exit(1)
+
+    def submit_import(self, plan):
+        if not self.headless and not self.journal.completed('validation'):
             input("\033[1m Enter to continue ...\033[0m")
-            self.clusters.create_cluster(cluster_payload)
+        validation_id = self.journal.stage('validation', self.validate_import, plan)
+        task_id = self.journal.stage('submit', self.start_import, plan)
+        self.journal.finish()
+        return {"validationId": validation_id, "taskId": task_id}
+
+    def validate_import(self, plan):
+        # The first cluster of a domain goes in through the domain update API, the others as new clusters
+        if plan['isPrimary']:
+            return self.domains.validate_workload_domain_update(plan['payload'], plan['domainId'])
+        return self.clusters.validate_cluster(plan['payload'])
+
+    def start_import(self, plan):
+        if not self.headless:
+            input("\033[1m Enter to import cluster..\033[0m")
+        if plan['isPrimary']:
+            task_id = self.domains.patch_workload_domain(plan['payload'], plan['domainId'])
+        else:
+            task_id = self.clusters.import_cluster(plan['payload'])
+        # The cluster is no longer unmanaged, later runs discover its domain again
+        self.utils.cache.invalidate(self.utils.hostname, plan['domainId'])
+        return task_id
+
+def nameserver_option(value):
+    try:
+        parse_nameserver(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description='VxRail Workload Automator')
+    parser.add_argument('--sddc-url', default=None,
+                        help='Base URL of the SDDC Manager API, e.g. http://127.0.0.1:8080 for the stand-in server '
+                             'in standin/; the local appliance by default')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='Number of keep-alive connections kept to SDDC Manager')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help='Seconds to wait for a connection to SDDC Manager')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                        help='Seconds to wait for a response from SDDC Manager')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Abort the whole workflow after this many seconds')
+    parser.add_argument('--answers', default=None,
+                        help='JSON answer file that drives the workflow without prompts')
+    parser.add_argument('--batch', default=None,
+                        help='JSON batch file listing many cluster imports to run in one go')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Maximum number of imports of a batch running at the same time')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE,
+                        help='SQLite file caching cluster discovery between runs')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL,
+                        help='Seconds a cached discovery result stays valid, 0 disables the cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Drop cached discovery results and query SDDC Manager again')
+    parser.add_argument('--nameserver', action='append', default=None, type=nameserver_option,
+                        help='DNS server used to resolve the FQDNs, HOST or HOST:PORT, repeat for more; the system '
+                             'resolver is used by default')
+    parser.add_argument('--dns-timeout', type=float, default=DEFAULT_DNS_TIMEOUT,
+                        help='Seconds to wait for a DNS answer')
+    parser.add_argument('--skip-dns-check', action='store_true',
+                        help='Do not check forward and reverse DNS of the hosts and appliances before validation')
+    parser.add_argument('--skip-credential-check', action='store_true',
+                        help='Do not try the host and VxRail Manager credentials over SSH before fetching fingerprints')
+    parser.add_argument('--ssh-workers', type=int, default=DEFAULT_SSH_WORKERS,
+                        help='SSH logins of the credential check running at the same time')
+    parser.add_argument('--ssh-timeout', type=float, default=DEFAULT_SSH_TIMEOUT,
+                        help='Seconds to wait for an SSH login of the credential check')
+    parser.add_argument('--ssh-port', type=int, default=DEFAULT_SSH_PORT,
+                        help='SSH port of the hosts and VxRail Manager')
+    parser.add_argument('--known-thumbprints', default=DEFAULT_THUMBPRINTS_FILE,
+                        help='File of the SSH fingerprints confirmed in earlier runs, they are not fetched or '
+                             'confirmed again. An empty value disables it')
+    parser.add_argument('--refresh-thumbprints', action='store_true',
+                        help='Fetch every SSH fingerprint again and flag the ones that changed since confirmed')
+    parser.add_argument('--payload-file',
+                        help='Also write the import payload, with the secrets masked, to the given file')
+    parser.add_argument('--metrics-file', default=DEFAULT_METRICS_FILE,
+                        help='JSON summary of the SDDC Manager requests written at exit, the Prometheus text format '
+                             'goes next to it with a .prom extension. An empty value disables it')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='FILE',
+                                help='Record every SDDC Manager request and response, secrets masked, to a '
+                                     'cassette file (gzip compressed when it ends with .gz)')
+    cassette_group.add_argument('--replay', metavar='FILE',
+                                help='Answer the SDDC Manager requests from a recorded cassette, without polling waits')
+    parser.add_argument('--journal', nargs='?', const=DEFAULT_JOURNAL_FILE, default=None, metavar='FILE',
+                        help='Journal the completed stages of the import, passwords left out, so a failed run can be '
+                             'resumed; {} by default'.format(DEFAULT_JOURNAL_FILE))
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the previous run after its last completed stage')
+    parser.add_argument('--redo', choices=STAGES, default=None,
+                        help='Resume, but run this stage and the stages depending on it again')
+    return parser.parse_args(argv)
 
-        exit(1)
 
 if __name__ == "__main__":
-    VxRaiWorkloadAutomator().initApp()
+    options = parse_options()
+    automator = VxRaiWorkloadAutomator(options)
+    if options.batch:
+        automator.run_batch()
+    try:
+        automator.initApp()
+    except SystemExit as e:
+        if automator.headless and e.code not in (0, None):
+            automator.print_result('FAILED')
+        raise